@@ -0,0 +1,21 @@
+"""Congestion Causes — causes, impacts and proposed solutions from the surveys."""
+
+import streamlit as st
+
+import kpa_charts as charts
+from kpa_app import current_survey, show_chart
+
+survey = current_survey()
+
+st.markdown('<div class="section-title">⚠️  Causes of Traffic Congestion at KPA Gates</div>', unsafe_allow_html=True)
+
+figs = charts.causes_figures(survey)
+st.plotly_chart(figs["causes"][1], use_container_width=True)
+
+col1, col2 = st.columns(2)
+with col1:
+    show_chart(figs["impact"])
+with col2:
+    show_chart(figs["solutions"])
+
+show_chart(figs["cause_rates"])
@@ -0,0 +1,51 @@
+"""
+Demographics — who answered the surveys (follows the sidebar cohort filter),
+and each non-truck stakeholder group's own answers.
+"""
+
+import streamlit as st
+
+import kpa_charts as charts
+from kpa_app import current_dataset, current_survey, show_chart
+
+survey = current_survey()
+
+st.markdown('<div class="section-title">👥 Respondent Demographics</div>', unsafe_allow_html=True)
+
+figs = charts.demographics_figures(survey)
+col1, col2 = st.columns(2)
+with col1:
+    show_chart(figs["nationality"])
+with col2:
+    show_chart(figs["gender"])
+
+col3, col4 = st.columns(2)
+with col3:
+    show_chart(figs["experience"])
+with col4:
+    show_chart(figs["visit_frequency"])
+
+st.markdown("""
+<div class="insight-box">👤 <b>Workforce Profile:</b> 88.4% of truck drivers are Kenyan nationals. 
+45.9% have over 10 years of experience — a highly experienced but gender-imbalanced workforce (98% male).</div>
+<div class="insight-box">🌍 <b>Regional Hub:</b> 11.6% of truck drivers are from Uganda, Tanzania, DRC Congo, 
+Rwanda, Burundi & South Sudan, confirming the Port's East African gateway role.</div>
+""", unsafe_allow_html=True)
+
+# ── Non-truck stakeholder groups, from each group's typed partition ────────
+sources = current_dataset().sources
+groups = {label: src for src, label in charts.STAKEHOLDER_LABELS.items()
+          if src != "TRUCK" and sources.size(src)}
+if groups:
+    st.markdown("### 🏛️ Other Stakeholder Groups")
+    label = st.selectbox("Stakeholder group", list(groups), key="stakeholder_group")
+    source = groups[label]
+    figs = charts.stakeholder_figures(sources.frame(source), sources.schema(source), label)
+    col5, col6 = st.columns(2)
+    with col5:
+        show_chart(figs["options"])
+    with col6:
+        show_chart(figs["answers"])
+    st.caption(f"All {sources.size(source):,} {label.lower()} respondents, over the "
+               f"{len(sources.schema(source))} questions they answered. The cohort filter "
+               "does not apply here.")
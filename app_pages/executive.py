@@ -0,0 +1,41 @@
+"""Executive Dashboard — headline metrics, wait times and monthly gate volumes."""
+
+import streamlit as st
+
+import kpa_charts as charts
+from kpa_app import current_dataset, current_gate_logs, show_chart
+
+trucks = current_dataset().trucks
+
+st.markdown('<div class="section-title">📊 Executive Dashboard</div>', unsafe_allow_html=True)
+
+c1, c2, c3, c4, c5 = st.columns(5)
+metrics = [
+    ("2.005M TEUs", "2024 Container Throughput"),
+    ("14%", "YoY Cargo Growth"),
+    ("33%", "Drivers Wait >5 hrs"),
+    ("59%", "Agents: Always Congested"),
+    ("90-180 min", "Avg Truck Turnaround"),
+]
+for col, (val, lbl) in zip([c1,c2,c3,c4,c5], metrics):
+    col.markdown(f"""
+    <div class="metric-card">
+        <h2>{val}</h2>
+        <p>{lbl}</p>
+    </div>""", unsafe_allow_html=True)
+
+st.markdown("<br>", unsafe_allow_html=True)
+figs = charts.executive_figures(trucks, current_gate_logs())
+col1, col2 = st.columns(2)
+with col1:
+    show_chart(figs["wait_time"], section=True)
+with col2:
+    show_chart(figs["congestion_frequency"], section=True)
+show_chart(figs["monthly_volumes"], section=True)
+
+st.markdown("""
+<div class="warning-box">⚠️  <b>Key Finding:</b> Export trucks consistently dominate volumes (avg 28,000+/month), 
+with May 2025 reaching a peak of 33,429. June shows a partial-month dip.</div>
+<div class="insight-box">📌 <b>Target Miss:</b> Truck turnaround target is ≤30 min, but actual averages 90–180 minutes — 
+3–6× above the performance contract target.</div>
+""", unsafe_allow_html=True)
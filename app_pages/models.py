@@ -0,0 +1,155 @@
+"""
+ML Predictive Models — cross-validated model comparison per target.
+
+Training runs as a background job shared by every session on the same
+dataset; until it finishes, a fragment polls its progress and the rest of
+the dashboard stays usable. The tuning panel starts a background
+hyperparameter search the same way, and the finished search's
+configurations replace the defaults on this page and the Predict page.
+"""
+
+import pandas as pd
+import streamlit as st
+
+import kpa_charts as charts
+from kpa_app import (current_dataset, current_training_job, current_tuning_job,
+                     diagnostics_panel, fragment, show_chart, start_dataset_tuning)
+from kpa_ml import TARGETS
+from kpa_tune import load_tuned
+
+BUDGET_OPTIONS = [30, 60, 120, 300, 600]
+
+# Cached results load within this; anything slower shows the progress readout
+TRAINING_WAIT_S = 1.0
+
+
+@fragment(run_every=1)
+def training_progress(job):
+    """Live readout of the background training; a full rerun renders the results."""
+    status = job.status()
+    if status["state"] not in ("queued", "running"):
+        st.rerun()
+    if status["state"] == "queued":
+        st.progress(0.0, text=f"Queued behind {status['queued_ahead']} other training job(s)...")
+    elif status["total"]:
+        st.progress(status["done"] / status["total"],
+                    text=f"Training models — {status['done']} of {status['total']} fits, "
+                         f"{status['elapsed_s']:.0f}s")
+    else:
+        st.progress(0.0, text=f"Loading or updating models — {status['elapsed_s']:.0f}s")
+    st.caption("Training runs in the background: other pages stay usable, and the "
+               "results appear here when it finishes.")
+
+
+@fragment(run_every=2)
+def tuning_progress(job):
+    """Live readout of a running search; a full rerun picks up its results."""
+    status = job.status()
+    if not status["running"]:
+        st.rerun()
+    st.progress(min(status["elapsed_s"] / status["budget_s"], 1.0),
+                text=f"Searching — {status['evaluated']:,} of ~{status['planned']:,} trials, "
+                     f"{status['elapsed_s']:.0f}s of {status['budget_s']}s budget")
+    if status["best"]:
+        best = max(status["best"].items(), key=lambda kv: kv[1])
+        st.caption(f"Best CV ROC-AUC so far: {best[1]:.3f} ({best[0][1]}, {TARGETS[best[0][0]]})")
+    if st.button("⏹ Stop search"):
+        job.cancel()
+
+
+def tuning_panel(fingerprint):
+    job = current_tuning_job()
+    running = job is not None and job.running
+    with st.expander("⚙️ Hyperparameter Tuning", expanded=running):
+        tuned = load_tuned(fingerprint)
+        if tuned:
+            use = st.toggle("Use tuned configurations", value=st.session_state.get("use_tuned", True))
+            st.session_state["use_tuned"] = use
+            st.caption(f"Last search {tuned['finished']}: {tuned['evaluated']:,} trials in "
+                       f"{tuned['seconds']:.0f}s" + ("" if tuned["complete"] else " (stopped at its budget)")
+                       + ". Scores are 3-fold CV ROC-AUC on the training split.")
+            st.dataframe(pd.DataFrame([
+                {"Target": TARGETS[t], "Model": name, "CV ROC-AUC": best["cv_auc"],
+                 "Parameters": ", ".join(f"{k}={v}" for k, v in sorted(best["params"].items())) or "defaults"}
+                for t, families in tuned["targets"].items() for name, best in families.items()
+            ]), hide_index=True, use_container_width=True)
+        else:
+            st.caption("Models use their default hyperparameters. A successive-halving search "
+                       "runs in the background within the time budget; its best configuration "
+                       "per target is saved for this dataset.")
+        if running:
+            tuning_progress(job)
+            return
+        if job is not None and job.error:
+            st.error(f"Last search failed: {job.error}")
+        budget = st.select_slider("Time budget", BUDGET_OPTIONS, value=120,
+                                  format_func=lambda s: f"{s // 60} min" if s >= 60 else f"{s} s")
+        if st.button("🔎 Start search" if not tuned else "🔎 Search again"):
+            start_dataset_tuning(budget)
+            st.rerun()
+
+
+def show_models(trained, feature_cols):
+    tab1, tab2 = st.tabs(["🎯 Congestion Level Predictor", "⏱ Long Wait Time Predictor"])
+    for tab, (target_col, target_label) in zip([tab1, tab2], TARGETS.items()):
+        with tab:
+            show_target(trained[target_col], feature_cols, target_col, target_label)
+
+
+def show_target(summary, feature_cols, target_col, target_label):
+    results   = summary["models"]
+    best_name = summary["best_name"]
+    best      = results[best_name]
+
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Best Model", best_name)
+    col2.metric("Test Accuracy", f"{best['acc']*100:.1f}%")
+    col3.metric("ROC-AUC", f"{best['auc']:.3f}")
+    inc = summary.get("incremental") or {}
+    if inc.get("updates"):
+        st.caption(f"🔄 Updated incrementally with {inc['added_rows']:,} new responses "
+                   f"({inc['updates']} update{'s' if inc['updates'] > 1 else ''}) since the last "
+                   f"full retrain on {inc['full_rows']:,}. Hold-out scores include the new "
+                   "responses; cross-validation scores are from the full retrain.")
+
+    charts_box = st.container()
+    shown = st.selectbox("Feature importances for", list(results),
+                         index=list(results).index(best_name), key=f"importances_{target_col}")
+    figs = charts.model_figures(summary, feature_cols, target_label, shown)
+    with charts_box:
+        col_a, col_b = st.columns(2)
+        with col_a:
+            show_chart(figs["comparison"])
+        with col_b:
+            show_chart(figs["confusion"])
+
+    show_chart(figs["importances"])
+
+    # Classification report
+    with st.expander("📋 Full Classification Report"):
+        cr = summary["report"]
+        cr_df = pd.DataFrame(cr).transpose().round(3)
+        st.dataframe(cr_df, use_container_width=True)
+
+
+artifacts = current_dataset()
+
+st.markdown('<div class="section-title">🤖 Machine Learning Predictive Models</div>', unsafe_allow_html=True)
+
+tuning_panel(artifacts.ml_fingerprint)
+job = current_training_job()
+trained = job.wait(TRAINING_WAIT_S)
+if job.error is not None:
+    st.error(f"Training failed: {job.error}")
+    if st.button("🔁 Retry training"):
+        current_training_job(retry=True)
+        st.rerun()
+elif trained is None:
+    training_progress(job)
+else:
+    show_models(trained, artifacts.ml[1])
+
+# The training job ran outside this rerun, so its steps are not in the sidebar panel
+if st.session_state.get("diagnostics") and job.perf is not None:
+    with st.expander("⏱️ Training job diagnostics"):
+        diagnostics_panel(job.perf, title="Training job")
@@ -0,0 +1,248 @@
+"""
+Predict for New Driver — score one profile or a whole roster.
+
+The profile inputs sit in a form, so toggling them sends nothing until
+"Run Prediction"; the form and the roster scorer are fragments, so their
+reruns touch only their own section of the page.
+"""
+
+import tempfile
+
+import streamlit as st
+
+import kpa_charts as charts
+from kpa_app import current_prediction_service, fragment
+from kpa_data import (ROSTER_REQUIRED, ORDINAL_LEVELS, EXP_MAP, VISIT_MAP, FEATURE_LABELS,
+                      iter_roster_chunks, roster_row_count)
+
+DRIVER_TITLES = {"high_congestion": "Congestion risk", "long_wait": "Wait-time risk"}
+
+# Scored rosters past this size spill from memory to a temporary file
+ROSTER_SPOOL_BYTES = 8 << 20
+
+
+def show_drivers(drivers, input_vec, answers):
+    """
+    Signed per-feature contributions (percentage points of probability) for
+    one profile; ``answers`` gives the text shown for non-binary features.
+    """
+    for col, (target, title) in zip(st.columns(2), DRIVER_TITLES.items()):
+        with col:
+            st.markdown(f"**{title}**")
+            for feature, contrib in drivers[target]:
+                value = answers.get(feature, "yes" if input_vec[feature] else "no")
+                arrow = "🔺" if contrib > 0 else "🔻"
+                st.markdown(f"{arrow} {FEATURE_LABELS[feature]}: *{value}* — **{contrib*100:+.1f} pts**")
+
+
+@fragment
+def prediction_form():
+    """Driver profile form; the 22 inputs are sent together on submit."""
+    with st.form("driver_profile", border=False):
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            nationality = st.selectbox("Nationality", ["Kenya","Uganda","Tanzania","DRC-Congo","Rwanda","Burundi","South Sudan"])
+            gender      = st.selectbox("Gender", ["Male","Female"])
+            experience  = st.selectbox("Years of Experience", ORDINAL_LEVELS["Yearsexperience"])
+            visit_freq  = st.selectbox("Visit Frequency", ["Daily","several times a week,2-4 times",
+                                                            "Once a week","A few times a month,1-3 times",
+                                                            "Rarely less than once per month"])
+        with col2:
+            gate18 = st.checkbox("Uses Gate 18", value=True)
+            gate24 = st.checkbox("Uses Gate 24", value=True)
+            gate9  = st.checkbox("Uses Gate 9/10")
+            gate12 = st.checkbox("Uses Gate 12")
+            gate16 = st.checkbox("Uses Gate 16")
+            icd    = st.checkbox("Uses ICD Gates")
+        with col3:
+            morning   = st.checkbox("Arrives Morning (6am–10am)")
+            midday    = st.checkbox("Arrives Midday (10am–2pm)")
+            afternoon = st.checkbox("Arrives Afternoon (2pm–6pm)", value=True)
+            evening   = st.checkbox("Arrives Evening (6pm+)", value=True)
+            st.markdown("**Congestion Causes Experienced:**")
+            toomany   = st.checkbox("Too Many Trucks", value=True)
+            clearance = st.checkbox("Clearance Delays", value=True)
+            security  = st.checkbox("Security Check Delays")
+            gateproc  = st.checkbox("Slow Gate Processing", value=True)
+            gadgets   = st.checkbox("KRA Gadget Delays")
+            road      = st.checkbox("Poor Road Conditions")
+            lanes     = st.checkbox("Limited Gate Lanes")
+            sched     = st.checkbox("No Truck Scheduling")
+
+        submitted = st.form_submit_button("🔮 Run Prediction", use_container_width=True)
+
+    if submitted:
+        input_vec = {
+            "is_kenyan"       : 1 if nationality=="Kenya" else 0,
+            "is_male"         : 1 if gender=="Male" else 0,
+            "exp_encoded"     : EXP_MAP[experience],
+            "visit_encoded"   : VISIT_MAP[visit_freq],
+            "Gate18"          : int(gate18),
+            "Gate24"          : int(gate24),
+            "Gates9"          : int(gate9),
+            "Gate12"          : int(gate12),
+            "Gate16"          : int(gate16),
+            "ICDGATES"        : int(icd),
+            "Morning"         : int(morning),
+            "Midday"          : int(midday),
+            "Afternoon"       : int(afternoon),
+            "Evening"         : int(evening),
+            "Containerized"   : 1,
+            "Empty"           : 0,
+            "Bulk"            : 0,
+            "Toomanytrucks"   : int(toomany),
+            "clearance"       : int(clearance),
+            "securitychecks"  : int(security),
+            "Gateprocessing"  : int(gateproc),
+            "Trackinggadgets" : int(gadgets),
+            "Roadconditions"  : int(road),
+            "Gatelanes"       : int(lanes),
+            "Truckscheduling" : int(sched),
+        }
+
+        # Forests are fitted once per dataset and shared across clicks/sessions
+        service = current_prediction_service()
+        probs = service.score_one(input_vec)
+        cong_prob = probs["high_congestion"]
+        wait_prob = probs["long_wait"]
+        cong_pred = int(cong_prob > 0.5)
+        wait_pred = int(wait_prob > 0.5)
+
+        st.markdown("---")
+        st.markdown("### 📊 Prediction Results")
+        rc1, rc2 = st.columns(2)
+        with rc1:
+            cong_color = "#e74c3c" if cong_pred == 1 else "#2ecc71"
+            cong_label = "HIGH CONGESTION RISK" if cong_pred == 1 else "LOW/MODERATE RISK"
+            st.markdown(f"""
+            <div style="background:{cong_color}22; border:2px solid {cong_color};
+                        border-radius:12px; padding:1.2rem; text-align:center;">
+                <h2 style="color:{cong_color}; margin:0;">{cong_label}</h2>
+                <p style="font-size:1.4rem; margin:0.5rem 0;"><b>Probability: {cong_prob*100:.1f}%</b></p>
+                <p style="color:#555; font-size:0.85rem;">Likelihood of Always/Often experiencing congestion</p>
+            </div>""", unsafe_allow_html=True)
+        with rc2:
+            wait_color = "#e74c3c" if wait_pred == 1 else "#2ecc71"
+            wait_label = "HIGH WAIT TIME RISK" if wait_pred == 1 else "MANAGEABLE WAIT TIME"
+            st.markdown(f"""
+            <div style="background:{wait_color}22; border:2px solid {wait_color};
+                        border-radius:12px; padding:1.2rem; text-align:center;">
+                <h2 style="color:{wait_color}; margin:0;">{wait_label}</h2>
+                <p style="font-size:1.4rem; margin:0.5rem 0;"><b>Probability: {wait_prob*100:.1f}%</b></p>
+                <p style="color:#555; font-size:0.85rem;">Likelihood of waiting >2 hours at gate</p>
+            </div>""", unsafe_allow_html=True)
+
+        st.markdown("<br>", unsafe_allow_html=True)
+        overall_risk = (cong_prob + wait_prob) / 2
+        fig_gauge = charts.risk_gauge(overall_risk)
+        st.plotly_chart(fig_gauge, use_container_width=True)
+
+        p50, p99, n_calls = service.latency_ms()
+        st.caption(f"⚡ Scoring latency over last {n_calls:,} predictions — "
+                   f"p50 {p50:.2f} ms · p99 {p99:.2f} ms")
+        lineage = getattr(service, "lineage", None)
+        if lineage and lineage["updates"]:
+            st.caption(f"🔄 Forests grown for {lineage['added_rows']:,} new responses since "
+                       f"the last full fit on {lineage['full_rows']:,}.")
+
+        # Path contributions: which answers moved each probability, and by how much
+        st.markdown("### 🔎 What Drives These Predictions")
+        show_drivers(service.top_drivers(input_vec), input_vec,
+                     {"exp_encoded": experience, "visit_encoded": visit_freq})
+        st.caption("Contribution of each answer to the predicted probability, "
+                   "relative to the average driver in this dataset.")
+
+        # Personalised recommendations
+        st.markdown("### 💡 Personalised Recommendations")
+        recs = []
+        if afternoon or evening:
+            recs.append("⏰ **Shift arrival time** to morning (6–10 AM) to avoid peak congestion windows.")
+        if gate18 and gate24:
+            recs.append("🚪 **Diversify gate use** — Gates 18 & 24 are most congested. Consider Gate 9/10 where eligible.")
+        if clearance or gateproc:
+            recs.append("📄 **Pre-clear documentation** before gate arrival to reduce processing time.")
+        if gadgets:
+            recs.append("📡 **Coordinate KRA gadget fitting** in advance to avoid waiting at the gate.")
+        if not sched:
+            recs.append("📅 **Book time slots** via KPA's upcoming Truck Appointment System (TAS) when available.")
+        if not recs:
+            recs.append("✅ This driver's profile indicates lower operational risk — maintain current practices.")
+        for r in recs:
+            st.markdown(f'<div class="insight-box">{r}</div>', unsafe_allow_html=True)
+
+
+@fragment
+def roster_scorer():
+    """Chunked roster scoring with a progress bar and a CSV download."""
+    roster = st.file_uploader("Driver roster", type=["csv","parquet"], key="roster_uploader")
+    if roster is not None:
+        roster_bytes = roster.getvalue()
+        try:
+            header = next(iter_roster_chunks(roster_bytes, roster.name, chunksize=1), None)
+        except ValueError as e:          # empty file, no header, unreadable Parquet
+            st.error(f"Could not read roster: {e}")
+            return
+        if header is None:
+            st.error("Could not read roster: the file has no rows.")
+            return
+        id_col = st.selectbox("Identifier column (optional)", ["(row number only)"] + list(header.columns))
+        id_col = None if id_col == "(row number only)" else id_col
+
+        if st.button("📦 Score Roster", use_container_width=True):
+            from kpa_ml import score_batches
+            service  = current_prediction_service()
+            total    = roster_row_count(roster_bytes, roster.name) or 1
+            progress = st.progress(0.0, text="Scoring roster...")
+            # Deleted when closed, i.e. when replaced or dropped with the session
+            out_file = tempfile.SpooledTemporaryFile(max_size=ROSTER_SPOOL_BYTES)
+            done, n_high = 0, 0
+            try:
+                for i, scored in enumerate(score_batches(service, iter_roster_chunks(roster_bytes, roster.name), id_col)):
+                    scored.to_csv(out_file, header=(i == 0))
+                    done   += len(scored)
+                    n_high += int((scored["risk_score"] >= 66).sum())
+                    progress.progress(min(done / total, 1.0), text=f"Scored {done:,} drivers...")
+            except ValueError as e:
+                progress.empty()
+                out_file.close()
+                st.error(f"Could not score roster: {e}")
+            else:
+                progress.empty()
+                previous = st.session_state.get("batch_result")
+                st.session_state["batch_result"] = (roster.name, done, n_high, out_file)
+                if previous is not None:
+                    previous[3].close()
+
+    if "batch_result" in st.session_state:
+        name, done, n_high, out_file = st.session_state["batch_result"]
+        st.success(f"✅ Scored **{done:,} drivers** from {name} — "
+                   f"**{n_high:,}** in the high-risk band (score ≥ 66).")
+
+        # Read back from the spool only when the button is clicked
+        def result_bytes():
+            out_file.seek(0)
+            return out_file.read()
+
+        st.download_button("⬇️ Download Scored Roster (CSV)", result_bytes,
+                           file_name=name.rsplit(".", 1)[0] + "_scored.csv",
+                           mime="text/csv", use_container_width=True)
+
+
+st.markdown('<div class="section-title">🔍 Predict Congestion & Wait Risk for a New Driver</div>', unsafe_allow_html=True)
+st.markdown("""
+<div class="insight-box">Enter a truck driver's profile to predict their likely congestion experience 
+and gate wait time at KPA. Useful for onboarding risk briefings and gate scheduling.</div>
+""", unsafe_allow_html=True)
+
+prediction_form()
+
+# ── Batch scoring for whole rosters ─────────────────────────────────────
+st.markdown("---")
+st.markdown("### 📦 Batch-Score a Driver Roster")
+st.markdown(f"""
+<div class="insight-box">Upload a CSV or Parquet roster using the survey answer vocabulary
+("Selected"/"Not selected", "1-5 years", "Daily", ...). Required columns:
+<b>{", ".join(ROSTER_REQUIRED)}</b>; missing gate/time/cause columns count as not selected.
+The file is encoded and scored in chunks, so large rosters stay within bounded memory.</div>
+""", unsafe_allow_html=True)
+roster_scorer()
@@ -0,0 +1,45 @@
+"""Recommendations — the report's implementation matrix."""
+
+import pandas as pd
+import streamlit as st
+
+import kpa_charts as charts
+from kpa_app import show_chart
+
+
+st.markdown('<div class="section-title">📋 Report Recommendations & Implementation Matrix</div>', unsafe_allow_html=True)
+
+rdf = pd.DataFrame(charts.RECOMMENDATIONS)
+st.dataframe(rdf.set_index("#"), use_container_width=True)
+
+st.markdown("<br>", unsafe_allow_html=True)
+figs = charts.recommendations_figures(rdf)
+col1, col2 = st.columns(2)
+with col1:
+    show_chart(figs["priority"])
+with col2:
+    show_chart(figs["responsibility"])
+
+st.markdown("""
+<div class="success-box">✅ <b>Quick Wins (Immediate):</b> 
+Increase peak-hour staffing at Gates 18 & 24; mandate pre-arrival documentation submission.</div>
+<div class="warning-box">⚠️ <b>Strategic Priority:</b> 
+A fully operational Truck Appointment System (TAS) is the single highest-impact intervention to 
+reduce clustering — endorsed by 37.5% of traffic police and 21.6% of KPA staff.</div>
+<div class="insight-box">📌 <b>Performance Gap:</b> 
+Current turnaround of 90–180 min vs target of ≤30 min represents a 3–6× miss on the 
+2024/25 Performance Contract — requiring urgent systemic intervention, not just operational tweaks.</div>
+""", unsafe_allow_html=True)
+
+st.markdown("---")
+st.markdown("##### 📁 Data Sources")
+st.markdown("""
+| Dataset | Respondents | Coverage |
+|---------|------------|---------|
+| Truck Drivers Survey | 714 | Gate usage, wait times, congestion causes, impacts |
+| Clearing Agents Survey | ~124 | Documentation, gate usage, congestion frequency |
+| KPA Staff Survey | 22 | Gate operations, staffing, infrastructure |
+| Custom/KRA Officials | 10 | Documentation, scanning, staffing |
+| Traffic Police | 9 | Congestion causes, solutions |
+| KPA Traffic Records | Jan–Jun 2025 | Monthly truck volumes by type and gate |
+""")
@@ -0,0 +1,67 @@
+"""Traffic Patterns — gate usage, arrival times and gate-log volumes."""
+
+import streamlit as st
+
+import kpa_charts as charts
+from kpa_app import current_gate_logs, current_survey, fragment, show_chart
+
+
+@fragment
+def gate_log_panel(gate_logs):
+    """
+    Uploader for gate-in/gate-out exports; each file is folded in once.
+    Picking files reruns only this panel; the charts redraw after an ingest.
+    """
+    with st.expander("🛂 Gate transaction logs", expanded=not gate_logs.events):
+        st.caption("CSV exports with timestamp, direction (IN/OUT) and category columns. "
+                   "Files are streamed in chunks and only new files are read.")
+        if "gate_log_added" in st.session_state:
+            st.success(f"Added {st.session_state.pop('gate_log_added'):,} events.")
+        uploads = st.file_uploader("Add gate log files", type=["csv", "gz"],
+                                   accept_multiple_files=True, key="gate_log_uploader")
+        if uploads and st.button("Ingest logs"):
+            added, failed = 0, False
+            with st.spinner("Streaming gate logs..."):
+                for f in uploads:
+                    try:
+                        added += gate_logs.ingest_bytes(f.getvalue(), f.name)
+                    except ValueError as e:
+                        st.error(f"{f.name}: {e}")
+                        failed = True
+            if not failed:
+                st.session_state["gate_log_added"] = added
+                st.rerun()
+            st.success(f"Added {added:,} events.")
+        if gate_logs.events:
+            months = gate_logs.months()
+            files = len(gate_logs.sources) - len(gate_logs.failed())
+            st.caption(f"{gate_logs.events:,} events from {files} file(s), "
+                       f"{gate_logs.month_label(months[0], True)} – "
+                       f"{gate_logs.month_label(months[-1], True)}.")
+
+
+st.markdown('<div class="section-title">🚦 Traffic Patterns & Gate Usage</div>', unsafe_allow_html=True)
+
+gate_logs = current_gate_logs()
+gate_log_panel(gate_logs)
+figs = charts.traffic_figures(current_survey(), gate_logs)
+col1, col2 = st.columns(2)
+with col1:
+    show_chart(figs["gates"])
+with col2:
+    show_chart(figs["time_of_day"])
+
+show_chart(figs["weekly"])
+
+col3, col4 = st.columns(2)
+with col3:
+    show_chart(figs["categories"])
+with col4:
+    show_chart(figs["shifts"])
+
+st.markdown("""
+<div class="insight-box">🕑 <b>Peak Congestion:</b> Afternoon (2–6 PM) accounts for 40% of congestion incidents; 
+combined afternoon + evening = 70%. Gate 24 and Gate 18 handle 79.3% of all truck traffic.</div>
+<div class="warning-box">📅 <b>Peak Days:</b> Thursday and Friday record the highest weekly traffic volumes 
+(7,896 and 7,664 entries), requiring enhanced staffing on these days.</div>
+""", unsafe_allow_html=True)
@@ -0,0 +1,97 @@
+"""
+Benchmark: flat-array tree inference (``kpa_trees``) vs scikit-learn.
+
+Fits the Predict page's Random Forest and the ML page's depth-6 Decision
+Tree on a synthetic survey, checks that ``FlatTrees`` reproduces
+``predict_proba`` bit for bit (including rows with blank answers), and
+reports single-row latency and whole-roster batch time for both.
+
+    python benchmarks/bench_inference.py                      # 1k, 20k rows
+    python benchmarks/bench_inference.py --rows 1000 100000 --calls 2000
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+import warnings
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+os.environ["KPA_CACHE_DIR"] = tempfile.mkdtemp(prefix="kpa-infer-")
+sys.path.insert(0, ROOT)
+
+import numpy as np
+import pandas as pd
+
+from kpa_data import TARGET_COLS, load_csv, prepare_ml_features, truck_subset
+from kpa_ml import MODEL_SPECS
+from kpa_trees import FlatTrees
+from synthetic import csv_bytes, synthetic_survey
+
+warnings.filterwarnings("ignore", category=pd.errors.DtypeWarning)
+
+
+def latency_us(fn, rows):
+    """Median and p99 microseconds of ``fn(row)`` over ``rows``."""
+    lat = []
+    for x in rows:
+        t0 = time.perf_counter()
+        fn(x)
+        lat.append(time.perf_counter() - t0)
+    lat = np.array(lat) * 1e6
+    return float(np.median(lat)), float(np.percentile(lat, 99))
+
+
+def timed(fn, *args):
+    t0 = time.perf_counter()
+    out = fn(*args)
+    return out, time.perf_counter() - t0
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--rows", type=int, nargs="+", default=[1_000, 20_000])
+    ap.add_argument("--calls", type=int, default=500, help="single-row calls per model")
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+
+    print(f"{'model':>14} {'rows':>8} {'MB':>6} {'1-row p50/p99 µs (sklearn)':>27} "
+          f"{'(flat)':>15} {'batch s (sklearn)':>18} {'(flat)':>8}  exact")
+    try:
+        for n in args.rows:
+            _, df = load_csv(csv_bytes(synthetic_survey(n, args.seed)))
+            df_ml, feature_cols = prepare_ml_features(truck_subset(df))
+            data = df_ml[feature_cols + [TARGET_COLS[0]]].dropna()
+            X = data[feature_cols].to_numpy(dtype=np.float64)
+            y = data[TARGET_COLS[0]].to_numpy()
+
+            # Scoring rows: the roster plus blanks, which follow missing_go_to_left
+            rng = np.random.default_rng(args.seed)
+            X_score = df_ml[feature_cols].to_numpy(dtype=np.float32)
+            X_score[rng.random(X_score.shape) < 0.01] = np.nan
+            singles = [np.ascontiguousarray(X_score[i:i + 1])
+                       for i in rng.integers(0, len(X_score), args.calls)]
+
+            for name in ("Random Forest", "Decision Tree"):
+                cls, defaults = MODEL_SPECS[name]
+                model = cls(**defaults).fit(X, y)
+                flat = FlatTrees.from_model(model)
+                ref, t_ref = timed(lambda: model.predict_proba(X_score)[:, 1])
+                got, t_flat = timed(flat.predict_proba, X_score)
+                one_ref = latency_us(lambda x: model.predict_proba(x)[:, 1], singles)
+                one_flat = latency_us(flat.predict_proba, singles)
+                exact = np.array_equal(ref, got) and all(
+                    np.array_equal(model.predict_proba(x)[:, 1], flat.predict_proba(x)) for x in singles)
+                print(f"{name:>14} {n:>8,} {flat.nbytes / 1e6:>6.1f} "
+                      f"{one_ref[0]:>19,.0f} / {one_ref[1]:>5,.0f} {one_flat[0]:>7,.0f} / {one_flat[1]:>5,.0f} "
+                      f"{t_ref:>18.3f} {t_flat:>8.3f}  {exact}")
+                if not exact:
+                    sys.exit(f"{name}: flat-array probabilities differ from scikit-learn at {n:,} rows")
+    finally:
+        shutil.rmtree(os.environ["KPA_CACHE_DIR"], ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
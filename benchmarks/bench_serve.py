@@ -0,0 +1,204 @@
+"""
+Load test: the HTTP scoring service (``kpa_serve.py``) under concurrent clients.
+
+Fits the Predict page's forests on a synthetic survey, starts the service on
+them in a subprocess (or targets a running one with ``--url``) and, for each
+concurrency level, keeps that many keep-alive connections posting one truck
+arrival per request for ``--duration`` seconds. Reports throughput, latency
+percentiles and the service's mean batch size; ``--unbatched`` repeats the
+sweep against a service limited to one record per scoring call.
+
+    python benchmarks/bench_serve.py                                # 1..128 connections
+    python benchmarks/bench_serve.py --concurrency 64 --duration 30 --procs 4
+    python benchmarks/bench_serve.py --url http://127.0.0.1:8765 --concurrency 16
+"""
+
+import argparse
+import http.client
+import json
+import multiprocessing
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import warnings
+from collections import Counter
+from urllib.parse import urlsplit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if __name__ == "__main__":                # not again in the spawned client processes
+    os.environ["KPA_CACHE_DIR"] = tempfile.mkdtemp(prefix="kpa-serve-")
+sys.path.insert(0, ROOT)
+
+import numpy as np
+import pandas as pd
+
+from synthetic import synthetic_survey
+
+warnings.filterwarnings("ignore", category=pd.errors.DtypeWarning)
+
+
+def arrival_bodies(raw, n, seed):
+    """
+    ``n`` JSON request bodies: survey answers of random truck respondents
+    (blank answers left out; respondents missing a required one skipped).
+    """
+    from kpa_data import ROSTER_REQUIRED
+    trucks = raw[raw["Source_Dataset"] == "TRUCK"].drop(columns="Source_Dataset").astype(object)
+    trucks = trucks.dropna(subset=ROSTER_REQUIRED)
+    rows = trucks.sample(n, replace=True, random_state=seed)
+    return [json.dumps({k: v for k, v in row.items() if not pd.isna(v)}).encode()
+            for row in rows.to_dict("records")]
+
+
+def start_service(raw, args, max_batch):
+    """Fit forests on ``raw``, persist them and start ``kpa_serve.py``; returns ``(proc, url)``."""
+    import joblib
+    from kpa_data import load_csv, prepare_ml_features, truck_subset
+    from kpa_ml import PredictionService
+    from synthetic import csv_bytes
+
+    model = os.path.join(os.environ["KPA_CACHE_DIR"], "service.joblib")
+    if not os.path.exists(model):
+        _, df = load_csv(csv_bytes(raw))
+        df_ml, feature_cols = prepare_ml_features(truck_subset(df))
+        joblib.dump(PredictionService.fit(df_ml, feature_cols), model)
+    proc = subprocess.Popen([sys.executable, os.path.join(ROOT, "kpa_serve.py"), "--model", model,
+                             "--port", "0", "--max-batch", str(max_batch),
+                             "--max-wait-ms", str(args.max_wait_ms)],
+                            stdout=subprocess.PIPE, text=True, cwd=ROOT)
+    line = proc.stdout.readline()          # "Serving ... on http://host:port (...)"
+    if not line.startswith("Serving"):
+        proc.kill()
+        sys.exit("scoring service failed to start")
+    return proc, line.split(" on ")[1].split()[0]
+
+
+def health(url):
+    parts = urlsplit(url)
+    conn = http.client.HTTPConnection(parts.hostname, parts.port, timeout=10)
+    conn.request("GET", "/health")
+    return json.loads(conn.getresponse().read())
+
+
+def client_proc(url, connections, bodies, duration):
+    """One client process: ``connections`` threads posting until ``duration`` runs out."""
+    parts = urlsplit(url)
+    latencies, statuses = [], Counter()
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def worker(offset):
+        conn = http.client.HTTPConnection(parts.hostname, parts.port, timeout=30)
+        lat, codes = [], Counter()
+        i = offset
+        while time.perf_counter() < deadline:
+            body = bodies[i % len(bodies)]
+            i += connections
+            t0 = time.perf_counter()
+            try:
+                conn.request("POST", "/score", body, {"Content-Type": "application/json"})
+                resp = conn.getresponse()
+                resp.read()
+                codes[resp.status] += 1
+            except (OSError, http.client.HTTPException):
+                codes["conn error"] += 1
+                conn.close()
+                conn = http.client.HTTPConnection(parts.hostname, parts.port, timeout=30)
+                continue
+            lat.append(time.perf_counter() - t0)
+        with lock:
+            latencies.extend(lat)
+            statuses.update(codes)
+
+    threads = [threading.Thread(target=worker, args=(k,)) for k in range(connections)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return latencies, statuses
+
+
+def run_level(url, connections, bodies, args):
+    """Drive ``connections`` concurrent connections; returns a result record."""
+    procs = max(1, min(args.procs, connections))
+    shares = [connections // procs + (k < connections % procs) for k in range(procs)]
+    before = health(url)
+    t0 = time.perf_counter()
+    with multiprocessing.get_context("spawn").Pool(procs) as pool:
+        parts = pool.starmap(client_proc, [(url, c, bodies[k::procs], args.duration)
+                                           for k, c in enumerate(shares)])
+    seconds = time.perf_counter() - t0
+    after = health(url)
+    latencies = np.array([x for lat, _ in parts for x in lat]) * 1000
+    statuses = sum((codes for _, codes in parts), Counter())
+    batches = after["batches"] - before["batches"]
+    return {"connections": connections, "requests": len(latencies),
+            "rps": round(len(latencies) / args.duration),
+            "p50_ms": round(float(np.percentile(latencies, 50)), 2) if len(latencies) else None,
+            "p99_ms": round(float(np.percentile(latencies, 99)), 2) if len(latencies) else None,
+            "mean_batch": round((after["records"] - before["records"]) / batches, 1) if batches else 0.0,
+            "statuses": dict(statuses), "wall_s": round(seconds, 1)}
+
+
+def sweep(url, label, bodies, args):
+    print(f"\n{label}: {url}")
+    print(f"{'connections':>11} {'requests':>9} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8} "
+          f"{'batch':>6}  statuses")
+    results = []
+    for c in args.concurrency:
+        r = run_level(url, c, bodies, args)
+        results.append({"service": label, **r})
+        print(f"{c:>11} {r['requests']:>9,} {r['rps']:>8,} {r['p50_ms'] or 0:>8.2f} "
+              f"{r['p99_ms'] or 0:>8.2f} {r['mean_batch']:>6.1f}  {r['statuses']}")
+    return results
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--url", help="running service to test (default: start one)")
+    ap.add_argument("--rows", type=int, default=5_000, help="synthetic survey size for the forests")
+    ap.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32, 128])
+    ap.add_argument("--duration", type=float, default=10, help="seconds per concurrency level")
+    ap.add_argument("--procs", type=int, default=os.cpu_count() or 1, help="client processes")
+    ap.add_argument("--max-batch", type=int, default=256)
+    ap.add_argument("--max-wait-ms", type=float, default=0)
+    ap.add_argument("--unbatched", action="store_true", help="also test with batches of one")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("-o", "--out", help="write results as JSON")
+    args = ap.parse_args()
+
+    raw = synthetic_survey(args.rows, args.seed)
+    bodies = arrival_bodies(raw, 10_000, args.seed)
+    from kpa_data import encode_features, encode_records
+    records = [json.loads(b) for b in bodies]
+    if not np.array_equal(encode_records(records),
+                          encode_features(pd.DataFrame(records)).to_numpy(dtype=np.float32), equal_nan=True):
+        sys.exit("encode_records disagrees with encode_features on the request bodies")
+    results, servers = [], []
+    try:
+        if args.url:
+            results += sweep(args.url, "service", bodies, args)
+        else:
+            variants = [("batched", args.max_batch)] + ([("unbatched", 1)] if args.unbatched else [])
+            for label, max_batch in variants:
+                proc, url = start_service(raw, args, max_batch)
+                servers.append(proc)
+                results += sweep(url, f"{label} (max batch {max_batch})", bodies, args)
+                proc.terminate()
+                proc.wait()
+    finally:
+        for proc in servers:
+            proc.kill()
+        shutil.rmtree(os.environ["KPA_CACHE_DIR"], ignore_errors=True)
+
+    if args.out:
+        with open(args.out, "w") as fh:
+            json.dump(results, fh, indent=1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Benchmark: cold-start import time and first paint of the dashboard.
+
+Each scenario runs in a fresh interpreter so module caches are cold:
+
+    upload     the landing/upload screen (no dataset in the session)
+    dashboard  the Executive Dashboard with a synthetic dataset already loaded
+
+For each one it reports the time to import Streamlit, the time for the first
+script run to finish (first paint), and which heavy libraries that run
+pulled in. A scenario fails its budget if it is slower than ``BUDGET_S`` or
+imports anything listed in ``MUST_NOT_IMPORT``, and the dashboard scenario
+fails if its header and page links did not render; the script then exits
+non-zero.
+
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --rows 5000 --repeat 3
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP = os.path.join(ROOT, "port.py")
+
+# Seconds from script start to the end of the first run (single core, cold)
+BUDGET_S = {"upload": 1.5, "dashboard": 2.0}
+HEAVY_MODULES = ["sklearn", "joblib", "scipy", "plotly.express"]
+MUST_NOT_IMPORT = {"upload": ["sklearn", "plotly.express"], "dashboard": ["sklearn"]}
+
+
+def probe(scenario, rows):
+    """Measure one scenario in this (fresh) process and print a JSON line."""
+    t0 = time.perf_counter()
+    from streamlit.testing.v1 import AppTest
+    t_import = time.perf_counter() - t0
+
+    at = AppTest.from_file(APP, default_timeout=120)
+    if scenario == "dashboard":
+        sys.path.insert(0, ROOT)
+        from bench_features import synthetic_trucks
+        from kpa_data import open_upload
+        df = synthetic_trucks(rows)
+        df.insert(0, "Source_Dataset", "TRUCK")
+        # Sessions hold a handle on the shared dataset store, as after an upload
+        dataset = open_upload({"csv": df.to_csv(index=False).encode()}, lambda: df)
+        at.session_state["dataset"] = dataset
+        at.session_state["dataset_key"] = dataset.key
+    loaded_before = {m for m in HEAVY_MODULES if m in sys.modules}
+
+    t0 = time.perf_counter()
+    at.run()
+    t_paint = time.perf_counter() - t0
+
+    print(json.dumps({
+        "scenario"     : scenario,
+        "import_s"     : round(t_import, 3),
+        "first_paint_s": round(t_paint, 3),
+        "errors"       : [e.value for e in at.exception],
+        "dashboard"    : any("Congestion Analytics</h1>" in m.value for m in at.markdown),
+        "page_links"   : len(at.get("page_link")),
+        "heavy_loaded" : sorted(m for m in HEAVY_MODULES
+                                if m in sys.modules and m not in loaded_before),
+    }))
+
+
+def run_probe(scenario, rows):
+    env = dict(os.environ, KPA_CACHE_DIR=tempfile.mkdtemp(prefix="kpa-bench-"))
+    out = subprocess.run([sys.executable, __file__, "--probe", scenario, "--rows", str(rows)],
+                         capture_output=True, text=True, env=env, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--rows", type=int, default=1_000, help="dataset size for the dashboard scenario")
+    ap.add_argument("--repeat", type=int, default=1, help="runs per scenario (best is reported)")
+    ap.add_argument("--probe", choices=list(BUDGET_S), help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.probe:
+        probe(args.probe, args.rows)
+        return
+
+    failures = []
+    print(f"{'scenario':>10} {'import s':>9} {'paint s':>8} {'budget s':>9}  heavy modules loaded")
+    for scenario, budget in BUDGET_S.items():
+        best = min((run_probe(scenario, args.rows) for _ in range(args.repeat)),
+                   key=lambda r: r["first_paint_s"])
+        forbidden = [m for m in best["heavy_loaded"] if m in MUST_NOT_IMPORT[scenario]]
+        print(f"{scenario:>10} {best['import_s']:>9.2f} {best['first_paint_s']:>8.2f} "
+              f"{budget:>9.1f}  {', '.join(best['heavy_loaded']) or '-'}")
+        if best["errors"]:
+            failures.append(f"{scenario}: app raised {best['errors'][0]}")
+        if scenario == "dashboard" and not (best["dashboard"] and best["page_links"]):
+            failures.append(f"{scenario}: dashboard header/navigation did not render")
+        if best["first_paint_s"] > budget:
+            failures.append(f"{scenario}: first paint {best['first_paint_s']:.2f}s > {budget:.1f}s budget")
+        if forbidden:
+            failures.append(f"{scenario}: imported {', '.join(forbidden)}")
+    if failures:
+        sys.exit("over budget:\n  " + "\n  ".join(failures))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,228 @@
+"""
+Benchmark suite: the data and model pipeline on synthetic surveys of any size.
+
+For each dataset size it times, on data from ``synthetic.py``:
+
+    load_csv             parse + normalise + write the columnar cache (cold)
+    load_csv_cached      the same upload again (memory-mapped cache read)
+    combine_excels       the five-workbook upload path (cold)
+    truck_subset         truck rows/columns for the pages (was get_truck_data)
+    prepare_ml_features  feature/target encoding
+    train_all            the ML page's training loop (4 models x 2 targets, CV)
+    service_fit          the Predict page's full-data forests
+    predict_one          one ``score_one`` call (median; p50/p99 reported too)
+    predict_batch        ``score_batches`` over every truck row
+
+Stages that are impractical at large sizes are skipped above ``STAGE_MAX_ROWS``
+(override with ``--limit stage=rows`` or ``--no-limits``). Results go to
+stdout as a table and, with ``-o``, to a JSON file; ``--compare`` checks a run
+against an earlier JSON file and exits non-zero on slowdowns.
+
+    python benchmarks/bench_suite.py                                  # 1k, 10k, 100k
+    python benchmarks/bench_suite.py --rows 1000 10000000 -o bench.json
+    python benchmarks/bench_suite.py -o new.json --compare bench.json --tolerance 0.25
+
+All caches go to a throw-away ``KPA_CACHE_DIR``.
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import warnings
+from datetime import datetime, timezone
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+os.environ["KPA_CACHE_DIR"] = tempfile.mkdtemp(prefix="kpa-suite-")
+sys.path.insert(0, ROOT)
+
+import numpy as np
+import pandas as pd
+
+from kpa_data import (DATASET_DIR, combine_excels, load_csv, load_upload, prepare_ml_features,
+                      truck_subset, upload_key)
+from synthetic import csv_bytes, excel_files, synthetic_survey
+
+# Blank-only stretches of a column make pandas warn per chunk; the app hides it too
+warnings.filterwarnings("ignore", category=pd.errors.DtypeWarning)
+
+STAGES = ["load_csv", "load_csv_cached", "combine_excels", "truck_subset", "prepare_ml_features",
+          "train_all", "service_fit", "predict_one", "predict_batch"]
+
+# Largest dataset each stage runs at by default (1 core, a few GB of RAM).
+# Workbooks hold at most ~1M rows; training cost grows with rows x trees x folds,
+# and the prediction stages need the fitted service.
+STAGE_MAX_ROWS = {"combine_excels": 100_000, "train_all": 50_000, "service_fit": 200_000}
+
+PREDICT_ONE_CALLS = 500
+BATCH_CHUNK_ROWS  = 100_000
+
+
+def best_of(repeat, fn, setup=None):
+    """``(result, best seconds)`` over ``repeat`` runs; ``setup()`` runs untimed before each."""
+    best, out = float("inf"), None
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        t0 = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - t0)
+    return out, best
+
+
+def run_size(n, args, limits):
+    """Time every stage at ``n`` rows; returns a list of result records."""
+    records = []
+
+    def record(stage, seconds, rows, **extra):
+        records.append({"stage": stage, "rows": n, "seconds": round(seconds, 6),
+                        "rows_per_s": round(rows / seconds) if seconds > 0 else None, **extra})
+
+    def skipped(stage):
+        if n > limits.get(stage, float("inf")):
+            records.append({"stage": stage, "rows": n, "skipped": f"> {limits[stage]:,} rows"})
+            return True
+        return False
+
+    raw = synthetic_survey(n, args.seed)
+    data = csv_bytes(raw)
+    cached = DATASET_DIR / f"{upload_key({'csv': data})}.arrow"
+
+    (_, df), t = best_of(args.repeat, lambda: load_csv(data), setup=lambda: cached.unlink(missing_ok=True))
+    record("load_csv", t, n, mb=round(len(data) / 1e6, 1))
+    _, t = best_of(args.repeat, lambda: load_csv(data))
+    record("load_csv_cached", t, n)
+    del data
+
+    if not skipped("combine_excels"):
+        files = excel_files(raw)
+        key = upload_key(files)
+        _, t = best_of(args.repeat, lambda: load_upload(files, lambda: combine_excels(files)),
+                       setup=lambda: (DATASET_DIR / f"{key}.arrow").unlink(missing_ok=True))
+        record("combine_excels", t, n, mb=round(sum(map(len, files.values())) / 1e6, 1))
+        del files
+
+    trucks, t = best_of(args.repeat, lambda: truck_subset(df))
+    record("truck_subset", t, n, truck_rows=len(trucks))
+    (df_ml, feature_cols), t = best_of(args.repeat, lambda: prepare_ml_features(trucks))
+    record("prepare_ml_features", t, len(trucks))
+
+    if not skipped("train_all"):
+        from kpa_ml import train_all
+        _, t = best_of(args.repeat, lambda: train_all(df_ml, feature_cols, workers=args.workers))
+        record("train_all", t, len(df_ml), workers=args.workers or "default")
+
+    if skipped("service_fit"):
+        records += [{"stage": s, "rows": n, "skipped": "needs service_fit"}
+                    for s in ("predict_one", "predict_batch")]
+        return records
+    from kpa_ml import PredictionService, score_batches
+    service, t = best_of(args.repeat, lambda: PredictionService.fit(df_ml, feature_cols))
+    record("service_fit", t, len(df_ml))
+
+    if not skipped("predict_one"):
+        rng = np.random.default_rng(args.seed)
+        picks = df_ml[feature_cols].iloc[rng.integers(0, len(df_ml), PREDICT_ONE_CALLS)]
+        rows = picks.astype(float).to_dict("records")
+        lat = []
+        for row in rows:
+            t0 = time.perf_counter()
+            service.score_one(row)
+            lat.append(time.perf_counter() - t0)
+        lat = np.array(lat)
+        record("predict_one", float(np.median(lat)), 1, calls=len(lat),
+               p50_ms=round(float(np.percentile(lat, 50)) * 1000, 3),
+               p99_ms=round(float(np.percentile(lat, 99)) * 1000, 3))
+
+    if not skipped("predict_batch"):
+        roster = raw[raw["Source_Dataset"] == "TRUCK"].reset_index(drop=True)
+        chunks = [roster.iloc[i:i + BATCH_CHUNK_ROWS] for i in range(0, len(roster), BATCH_CHUNK_ROWS)]
+        _, t = best_of(args.repeat, lambda: sum(len(out) for out in score_batches(service, chunks)))
+        record("predict_batch", t, len(roster))
+    return records
+
+
+def metadata(args):
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                                capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        commit = None
+    import sklearn, pyarrow
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit"   : commit,
+        "python"   : platform.python_version(),
+        "platform" : platform.platform(),
+        "cpus"     : os.cpu_count(),
+        "versions" : {"pandas": pd.__version__, "numpy": np.__version__,
+                      "scikit-learn": sklearn.__version__, "pyarrow": pyarrow.__version__},
+        "seed"     : args.seed,
+        "repeat"   : args.repeat,
+    }
+
+
+def compare(results, baseline, tolerance):
+    """Regression messages for stages more than ``tolerance`` slower than ``baseline``."""
+    base = {(r["stage"], r["rows"]): r["seconds"] for r in baseline["results"] if "seconds" in r}
+    slow = []
+    for r in results:
+        before = base.get((r["stage"], r["rows"]))
+        if before and "seconds" in r and r["seconds"] > before * (1 + tolerance):
+            slow.append(f"{r['stage']} @ {r['rows']:,} rows: {before:.4f}s -> {r['seconds']:.4f}s "
+                        f"(+{r['seconds'] / before - 1:.0%})")
+    return slow
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--rows", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    ap.add_argument("--repeat", type=int, default=1, help="runs per stage (best is reported)")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--workers", type=int, default=None, help="train_all process-pool size")
+    ap.add_argument("--limit", action="append", default=[], metavar="STAGE=ROWS",
+                    help="override a stage's row limit (repeatable)")
+    ap.add_argument("--no-limits", action="store_true", help="run every stage at every size")
+    ap.add_argument("-o", "--out", help="write results as JSON")
+    ap.add_argument("--compare", metavar="JSON", help="baseline results to check against")
+    ap.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown vs baseline")
+    args = ap.parse_args()
+
+    limits = {} if args.no_limits else dict(STAGE_MAX_ROWS)
+    for item in args.limit:
+        stage, _, rows = item.partition("=")
+        if stage not in STAGES:
+            ap.error(f"unknown stage {stage!r} (choose from {', '.join(STAGES)})")
+        limits[stage] = int(float(rows))
+
+    results = []
+    print(f"{'stage':>20} {'rows':>12} {'seconds':>10} {'rows/s':>12}")
+    try:
+        for n in args.rows:
+            for r in run_size(n, args, limits):
+                results.append(r)
+                if "skipped" in r:
+                    print(f"{r['stage']:>20} {n:>12,} {'skipped':>10}  {r['skipped']}")
+                else:
+                    print(f"{r['stage']:>20} {n:>12,} {r['seconds']:>10.4f} {r['rows_per_s'] or 0:>12,}")
+    finally:
+        shutil.rmtree(os.environ["KPA_CACHE_DIR"], ignore_errors=True)
+
+    doc = {"meta": metadata(args), "results": results}
+    if args.out:
+        with open(args.out, "w") as fh:
+            json.dump(doc, fh, indent=1)
+    if args.compare:
+        with open(args.compare) as fh:
+            slow = compare(results, json.load(fh), args.tolerance)
+        if slow:
+            sys.exit("slower than baseline:\n  " + "\n  ".join(slow))
+
+
+if __name__ == "__main__":
+    main()
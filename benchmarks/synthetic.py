@@ -0,0 +1,149 @@
+"""
+Synthetic survey data in the ``COMBINED_DATASETS.csv`` schema.
+
+Rows follow the real upload: the same 40 columns and answer vocabularies
+(including the spelling variants the loader folds, e.g. "often" and
+"6-10 yeras"), the five stakeholder sources in their surveyed proportions and
+grouped in blocks, wait time answered by truck drivers only, and a sprinkle
+of blank answers. Congestion and wait answers lean on arrival time and gate
+use so the models have some signal to find.
+
+Columns are generated as categorical codes, so 10M rows take well under a
+gigabyte; ``write_csv`` streams the text out in chunks.
+
+    python benchmarks/synthetic.py 100000 -o synthetic.csv
+    python benchmarks/synthetic.py 1000 --excel-dir xlsx/     # five workbooks
+"""
+
+import argparse
+import io
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from kpa_data import BINARY_COLS, ORDINAL_LEVELS, SOURCE_MAP, SOURCES
+
+# Respondents per source in the June 2025 survey (697/136/18/17/11 of 879)
+SOURCE_SHARES = {"TRUCK": 0.793, "CLEARING_AGENTS": 0.155, "KPA_STAFF": 0.02,
+                 "CUSTOM": 0.019, "TRAFFIC_POLICE": 0.013}
+
+# (answers, weights) for the single-answer questions
+ANSWERS = {
+    "Nationality": (["Kenya","Uganda","Tanzania","DRC-Congo","Rwanda","Burundi","South Sudan"],
+                    [0.884, 0.04, 0.03, 0.02, 0.012, 0.008, 0.006]),
+    "Gender": (["Male","Female"], [0.98, 0.02]),
+    "Yearsexperience": (["Less than 1 year","1-5 years","6-10 yeras","6-10 years","Over 10 years"],
+                        [0.06, 0.22, 0.15, 0.12, 0.45]),
+    "Visitfrequency": (ORDINAL_LEVELS["Visitfrequency"], [0.08, 0.17, 0.2, 0.3, 0.25]),
+}
+WAIT_ANSWERS = ORDINAL_LEVELS["Averagewaitingtime"]
+FREQ_ANSWERS = ["Never","Rarely","Sometimes","often","Often","Always"]
+
+# Share of "Selected" per multi-select option (others default to 0.3)
+SELECTED_RATE = {"Gate24": 0.48, "Gate18": 0.31, "Afternoon": 0.4, "Evening": 0.3,
+                 "Gateprocessing": 0.25, "securitychecks": 0.21, "Trackinggadgets": 0.18}
+BLANK_RATE = 0.01
+
+COLUMNS = (["Source_Dataset"] + list(ANSWERS) + ["Averagewaitingtime", "Trafficcongestionfrequency"]
+           + BINARY_COLS)
+
+
+def _categorical(codes, answers):
+    return pd.Categorical.from_codes(codes, categories=answers)
+
+
+def synthetic_survey(n, seed=0):
+    """``n`` respondents in the combined-CSV schema, as a categorical frame."""
+    rng = np.random.default_rng(seed)
+    counts = rng.multinomial(n, list(SOURCE_SHARES.values()))
+    source_codes = np.repeat(np.arange(len(SOURCE_SHARES), dtype=np.int8), counts)
+    is_truck = source_codes == 0
+
+    data = {"Source_Dataset": _categorical(source_codes, list(SOURCE_SHARES))}
+    for col, (answers, weights) in ANSWERS.items():
+        data[col] = _categorical(rng.choice(len(answers), n, p=weights).astype(np.int8), answers)
+
+    selected = {}
+    for col in BINARY_COLS:
+        selected[col] = rng.random(n) < SELECTED_RATE.get(col, 0.3)
+        data[col] = _categorical(selected[col].astype(np.int8), ["Not selected", "Selected"])
+
+    # Afternoon/evening arrivals at the two busiest gates wait and queue longer
+    pressure = (selected["Afternoon"].astype(np.int8) + selected["Evening"]
+                + selected["Gate24"] + selected["Gate18"] + selected["Toomanytrucks"])
+    wait = np.clip(rng.integers(0, 4, n) + (pressure >= 3), 0, len(WAIT_ANSWERS) - 1).astype(np.int8)
+    wait[~is_truck] = -1
+    data["Averagewaitingtime"] = _categorical(wait, WAIT_ANSWERS)
+    freq = np.clip(rng.integers(0, 4, n) + (pressure >= 2), 0, 4)
+    freq = np.where(freq == 3, np.where(rng.random(n) < 0.2, 3, 4), np.where(freq == 4, 5, freq))
+    data["Trafficcongestionfrequency"] = _categorical(freq.astype(np.int8), FREQ_ANSWERS)
+
+    df = pd.DataFrame(data)[COLUMNS]
+    for col in COLUMNS[1:]:
+        blanks = rng.random(n) < BLANK_RATE
+        if blanks.any():
+            codes = df[col].cat.codes.to_numpy().copy()
+            codes[blanks] = -1
+            df[col] = _categorical(codes, df[col].cat.categories)
+    return df
+
+
+def write_csv(df, path_or_buf, chunksize=500_000):
+    """Write ``df`` as CSV text in chunks (bounded extra memory)."""
+    for start in range(0, len(df), chunksize):
+        df.iloc[start:start + chunksize].to_csv(path_or_buf, index=False, header=start == 0,
+                                                mode="w" if start == 0 else "a")
+
+
+def csv_bytes(df):
+    buf = io.StringIO()
+    write_csv(df, buf)
+    return buf.getvalue().encode()
+
+
+def excel_files(df):
+    """
+    ``{uploader key: xlsx bytes}`` — one workbook per source, each with a
+    title banner above the header row like the original survey exports.
+    """
+    from openpyxl import Workbook
+    keys = {label: key for key, label in SOURCE_MAP.items()}
+    files = {}
+    for source in SOURCES:
+        part = df[df["Source_Dataset"] == source].drop(columns="Source_Dataset")
+        part = part.loc[:, part.notna().any()] if len(part) else part
+        wb = Workbook(write_only=True)
+        ws = wb.create_sheet()
+        ws.append([f"{source.replace('_', ' ').title()} survey — synthetic"])
+        ws.append(list(part.columns))
+        for row in part.astype(object).itertuples(index=False):
+            ws.append([None if pd.isna(v) else v for v in row])
+        buf = io.BytesIO()
+        wb.save(buf)
+        files[keys[source]] = buf.getvalue()
+    return files
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("rows", type=int)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("-o", "--out", help="CSV path (default: stdout)")
+    ap.add_argument("--excel-dir", help="write the five source workbooks here instead")
+    args = ap.parse_args()
+
+    df = synthetic_survey(args.rows, args.seed)
+    if args.excel_dir:
+        os.makedirs(args.excel_dir, exist_ok=True)
+        for key, data in excel_files(df).items():
+            with open(os.path.join(args.excel_dir, f"{key}.xlsx"), "wb") as fh:
+                fh.write(data)
+    else:
+        write_csv(df, args.out or sys.stdout)
+
+
+if __name__ == "__main__":
+    main()
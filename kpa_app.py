@@ -0,0 +1,186 @@
+"""
+KPA Traffic Analytics — shared Streamlit state
+===============================================
+Cached resources and per-session lookups used by the entry script
+(``port.py``: header, sidebar, navigation) and the page scripts under
+``app_pages/``. Every page resolves the session's dataset through here, so
+a page run costs a few dictionary lookups, not a rebuild.
+"""
+
+from functools import wraps
+
+import pandas as pd
+import streamlit as st
+
+from kpa_data import GATE_LABELS, TIME_OF_DAY_LABELS, CAUSE_LABELS, IMPACT_LABELS
+from kpa_gatelog import GATE_LOG_DIR, GateLogAggregates
+from kpa_perf import cache_miss, current_run, finish_run, span, start_run
+from kpa_tune import best_params, forest_params, load_tuned, start_tuning, tuning_job
+
+# Sidebar cohort filters: option label -> "Selected" column
+COHORT_FILTERS = {
+    **{f"Gate · {label}": col for col, label in GATE_LABELS.items()},
+    **{f"Time · {label}": col for col, label in TIME_OF_DAY_LABELS.items()},
+    **{f"Cause · {label}": col for col, label in CAUSE_LABELS.items()},
+    **{f"Impact · {label}": col for col, label in IMPACT_LABELS.items()},
+}
+
+
+# ============================================================
+# CACHED RESOURCES
+# ============================================================
+@st.cache_resource(show_spinner="Preparing prediction models...")
+def get_prediction_service(fingerprint, _df_ml, feature_cols, params=None):
+    """Full-data forests fitted once per dataset and reused for every click."""
+    cache_miss()
+    from kpa_ml import load_or_fit_service
+    return load_or_fit_service(_df_ml, feature_cols, fingerprint, params)
+
+@st.cache_resource
+def get_gate_logs():
+    """Running gate-log aggregates, shared by all sessions and persisted on disk."""
+    cache_miss()
+    return GateLogAggregates.load()
+
+
+# ============================================================
+# SESSION CONTEXT
+# ============================================================
+def open_dataset(handle):
+    """Make ``handle`` (from ``kpa_data.open_upload``) this session's dataset."""
+    close_dataset()
+    st.session_state["dataset"] = handle
+    st.session_state["dataset_key"] = handle.key
+
+def close_dataset():
+    """Drop this session's dataset; the shared frame goes with its last handle."""
+    handle = st.session_state.pop("dataset", None)
+    st.session_state.pop("dataset_key", None)
+    if handle is not None:
+        handle.release()
+
+def current_dataset():
+    """
+    ``DatasetArtifacts`` for this session's upload, read through the
+    session's handle on the shared dataset store (``kpa_data.DATASETS``):
+    sessions with the same upload share one frame and one set of artifacts.
+    """
+    with span("dataset_artifacts", cache="hit"):
+        return st.session_state["dataset"].artifacts
+
+def current_survey():
+    """The survey cube, or the sidebar cohort when cohort filters are set."""
+    artifacts = current_dataset()
+    filters = st.session_state.get("cohort_filters") or []
+    if filters:
+        # Charts slice the bitmap index instead of the precomputed cube
+        return artifacts.bitmaps.cohort([COHORT_FILTERS[f] for f in filters])
+    return artifacts.cube
+
+def current_gate_logs():
+    """Gate-log aggregates; without logs the volume charts show the report's figures."""
+    with span("gate_logs", cache="hit"):
+        logs = get_gate_logs()
+    if GATE_LOG_DIR:
+        logs.poll_dir(GATE_LOG_DIR)
+        for path, error in logs.failed().items():
+            st.warning(f"Skipped gate log {path}: {error}", icon="⚠️")
+    return logs
+
+def current_tuning():
+    """
+    Persisted search result for this session's dataset, or ``None`` when
+    there is none or the ML page's "Use tuned" toggle is off.
+    """
+    if not st.session_state.get("use_tuned", True):
+        return None
+    return load_tuned(current_dataset().ml_fingerprint)
+
+def current_prediction_service():
+    """The cached scoring service for this session's dataset."""
+    artifacts = current_dataset()
+    df_ml, feature_cols = artifacts.ml
+    with span("prediction_service", cache="hit"):
+        return get_prediction_service(artifacts.ml_fingerprint, df_ml, feature_cols,
+                                      forest_params(current_tuning()))
+
+def current_training_job(retry=False):
+    """
+    Background job training (or holding) this session's models — shared with
+    every session on the same dataset; ``wait()`` gives the results.
+    """
+    from kpa_ml import start_training
+    artifacts = current_dataset()
+    df_ml, feature_cols = artifacts.ml
+    with span("trained_models", cache="hit"):
+        job = start_training(df_ml, feature_cols, artifacts.ml_fingerprint,
+                             best_params(current_tuning()), retry)
+        if not job.done:
+            cache_miss()
+    return job
+
+def start_dataset_tuning(budget_s):
+    """Start (or join) the background hyperparameter search for this dataset."""
+    artifacts = current_dataset()
+    df_ml, feature_cols = artifacts.ml
+    return start_tuning(df_ml, feature_cols, artifacts.ml_fingerprint, budget_s)
+
+def current_tuning_job():
+    """This dataset's running or last background search in this server process."""
+    return tuning_job(current_dataset().ml_fingerprint)
+
+
+# ============================================================
+# RENDERING HELPERS
+# ============================================================
+def show_chart(entry, section=False):
+    """Render a ``(title, figure)`` pair from ``kpa_charts``."""
+    title, fig = entry
+    if section:
+        st.markdown(f'<div class="section-title">{title}</div>', unsafe_allow_html=True)
+    else:
+        st.markdown(f"**{title}**")
+    with span("plotly_chart", title=title):
+        st.plotly_chart(fig, use_container_width=True)
+
+
+# ============================================================
+# DIAGNOSTICS
+# ============================================================
+def fragment(fn=None, *, run_every=None):
+    """
+    ``st.fragment`` whose standalone reruns are timed and logged as their own
+    run (during a full rerun its spans belong to the page's run).
+    """
+    if fn is None:
+        return lambda fn: fragment(fn, run_every=run_every)
+
+    @st.fragment(run_every=run_every)
+    @wraps(fn)
+    def run_fragment(*args, **kwargs):
+        if current_run() is not None:
+            return fn(*args, **kwargs)
+        run = start_run(f"fragment:{fn.__name__}", dataset=st.session_state.get("dataset_key"))
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            finish_run(run)
+    return run_fragment
+
+def diagnostics_panel(summary, title="Last rerun"):
+    """Timings, peak memory and cache hits of the rerun in ``summary``."""
+    st.markdown(f"**⏱️ {title}**")
+    c1, c2 = st.columns(2)
+    c1.metric("Wall time", f"{summary['wall_ms']:,.0f} ms")
+    c2.metric("Cache hit/miss", f"{summary['cache_hits']}/{summary['cache_misses']}")
+    spans = pd.DataFrame(summary["spans"], columns=["name", "depth", "ms", "peak_mb", "cache"])
+    spans["name"] = ["\u2003" * d + n for d, n in zip(spans["depth"], spans["name"])]
+    spans["cache"] = spans["cache"].fillna("")
+    st.dataframe(spans.drop(columns="depth").rename(columns={
+        "name": "Step", "ms": "ms", "peak_mb": "Peak MB", "cache": "Cache"}),
+        hide_index=True, use_container_width=True)
+    rss = summary.get("rss_peak_mb")
+    st.caption((f"Process peak RSS {rss:,.0f} MB. " if rss else "") +
+               ("Per-step peak memory is traced." if spans["peak_mb"].notna().any()
+                else "Set KPA_PERF_MEMORY=1 for per-step peak memory.") +
+               " Fragment reruns are logged but not shown here.")
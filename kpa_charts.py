@@ -0,0 +1,476 @@
+"""
+KPA Traffic Analytics — page figures
+=====================================
+Plotly figures for each dashboard page, built from the derived data only
+(no Streamlit), so the app and the headless report draw identical charts.
+
+Each ``*_figures`` function returns ``{key: (title, figure)}`` in page order.
+"""
+
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+
+from kpa_data import (ORDINAL_LEVELS, GATE_LABELS, TIME_OF_DAY_LABELS, CAUSE_LABELS,
+                      IMPACT_LABELS)
+from kpa_perf import span
+
+PNG_WIDTH, PNG_SCALE = 1100, 2
+
+STAKEHOLDER_LABELS = {
+    "TRUCK":"Truck Drivers", "CLEARING_AGENTS":"Clearing Agents",
+    "CUSTOM":"Custom Officials", "KPA_STAFF":"KPA Staff", "TRAFFIC_POLICE":"Traffic Police",
+}
+
+# Cause columns as labelled on the selection-rate chart
+CAUSE_RATE_LABELS = {
+    "Toomanytrucks":"Too Many Trucks","clearance":"Clearance Delays",
+    "securitychecks":"Security Checks","Gateprocessing":"Gate Processing",
+    "Trackinggadgets":"KRA Gadgets","Roadconditions":"Road Conditions",
+    "Gatelanes":"Limited Gate Lanes","Truckscheduling":"No Truck Scheduling"
+}
+
+# Multi-select options on the stakeholder-group chart: column -> (question, label)
+OPTION_GROUPS = {
+    **{c: ("Gate used", l) for c, l in GATE_LABELS.items()},
+    **{c: ("Cargo", c) for c in ("Containerized", "Empty", "Bulk", "Breakbulk")},
+    "Refridgerated": ("Cargo", "Refrigerated"),
+    **{c: ("Time of day", l) for c, l in TIME_OF_DAY_LABELS.items()},
+    **{c: ("Cause", l) for c, l in CAUSE_LABELS.items()},
+    **{c: ("Impact", l) for c, l in IMPACT_LABELS.items()},
+    "Nosignificantimpact": ("Impact", "No Significant Impact"),
+}
+
+RECOMMENDATIONS = [
+    {"#":1, "Problem":"Unregulated truck arrivals","Recommendation":"Implement Truck Appointment System (TAS)",
+     "Responsibility":"KPA","Priority":"🔴 Critical","Timeline":"Short-term"},
+    {"#":2, "Problem":"No staging space for trucks","Recommendation":"Establish Off-Port Truck Marshalling Yard",
+     "Responsibility":"KPA","Priority":"🔴 Critical","Timeline":"Medium-term"},
+    {"#":3, "Problem":"No coordinated traffic policy","Recommendation":"Develop Comprehensive Traffic Management Policy",
+     "Responsibility":"KPA, KRA, Traffic Police, MoT","Priority":"🟠 High","Timeline":"Short-term"},
+    {"#":4, "Problem":"Manual gate processes","Recommendation":"Expand & Digitize Gate Infrastructure (RFID, ANPR)",
+     "Responsibility":"KPA","Priority":"🔴 Critical","Timeline":"Medium-term"},
+    {"#":5, "Problem":"Insufficient peak-hour staffing","Recommendation":"Enhance HR Deployment at Gates",
+     "Responsibility":"KPA, KRA","Priority":"🟠 High","Timeline":"Immediate"},
+    {"#":6, "Problem":"Weak supervision & accountability","Recommendation":"Strengthen Staff Supervision & Appraisal",
+     "Responsibility":"KPA, KRA","Priority":"🟡 Medium","Timeline":"Short-term"},
+    {"#":7, "Problem":"Narrow roads & poor drainage","Recommendation":"Expand Access Roads & Internal Circulation",
+     "Responsibility":"KPA, KURA","Priority":"🟠 High","Timeline":"Long-term"},
+    {"#":8, "Problem":"Over-reliance on road transport","Recommendation":"Promote Modal Shift to SGR Rail",
+     "Responsibility":"KPA, KRC","Priority":"🟡 Medium","Timeline":"Long-term"},
+]
+
+
+# ============================================================
+# PAGE 1 — EXECUTIVE DASHBOARD
+# ============================================================
+@span("charts.executive_figures")
+def executive_figures(trucks, gate_logs=None):
+    figs = {}
+
+    wait_counts = trucks["Averagewaitingtime"].value_counts()
+    order = ORDINAL_LEVELS["Averagewaitingtime"]
+    wait_counts = wait_counts.reindex(order)
+    colors = ["#2ecc71","#f1c40f","#e67e22","#e74c3c","#8e44ad"]
+    fig = px.bar(x=wait_counts.index, y=wait_counts.values,
+                 color=wait_counts.index,
+                 color_discrete_sequence=colors,
+                 labels={"x":"Wait Time","y":"Drivers"},
+                 text=wait_counts.values)
+    fig.update_traces(textposition="outside")
+    fig.update_layout(showlegend=False, height=320, plot_bgcolor="white",
+                      xaxis_title="", yaxis_title="Number of Drivers")
+    figs["wait_time"] = ("Waiting Time Distribution – Truck Drivers", fig)
+
+    cf = trucks["Trafficcongestionfrequency"].value_counts()
+    order2 = ORDINAL_LEVELS["Trafficcongestionfrequency"]
+    cf = cf.reindex(order2).fillna(0)
+    fig2 = px.pie(values=cf.values, names=cf.index,
+                  color_discrete_sequence=["#2ecc71","#f1c40f","#e67e22","#e74c3c","#8e44ad"],
+                  hole=0.4)
+    fig2.update_traces(textinfo="percent+label")
+    fig2.update_layout(height=320, showlegend=True)
+    figs["congestion_frequency"] = ("Congestion Frequency – All Drivers", fig2)
+
+    if gate_logs is not None and gate_logs.events:
+        months = gate_logs.months()
+        period = (f"{gate_logs.month_label(months[0], True)}–"
+                  f"{gate_logs.month_label(months[-1], True)}, gate logs")
+        mdf = gate_logs.monthly().reset_index()
+    else:
+        period = "Jan–Jun 2025"
+        monthly_data = {
+            "Month":   ["Jan","Feb","Mar","Apr","May","Jun"],
+            "Transit": [13056,11865,13119,12370,13559,6922],
+            "Local/CFS":[15187,12661,15501,15600,15648,8445],
+            "Export":  [30362,27183,31680,30867,33429,15665],
+        }
+        mdf = pd.DataFrame(monthly_data)
+    fig3 = px.line(mdf, x="Month", y=[c for c in mdf.columns if c != "Month"],
+                   markers=True, title="",
+                   color_discrete_map={"Transit":"#003087","Local/CFS":"#0078d4","Export":"#e74c3c"})
+    fig3.update_layout(height=300, plot_bgcolor="white", yaxis_title="Trucks",
+                       legend_title="Truck Type")
+    figs["monthly_volumes"] = (f"Monthly Traffic Volumes ({period})", fig3)
+    return figs
+
+
+# ============================================================
+# PAGE 2 — DEMOGRAPHICS
+# ============================================================
+@span("charts.demographics_figures")
+def demographics_figures(survey):
+    """``survey`` is a ``SurveyCube`` or a filtered ``Cohort``."""
+    figs = {}
+
+    nat = survey.value_counts("Nationality", Source_Dataset="TRUCK").reset_index()
+    nat.columns = ["Country","Count"]
+    fig = px.bar(nat, x="Count", y="Country", orientation="h",
+                 color="Count", color_continuous_scale="Blues",
+                 text="Count")
+    fig.update_traces(textposition="outside")
+    fig.update_layout(height=320, plot_bgcolor="white",
+                      coloraxis_showscale=False, yaxis_title="")
+    figs["nationality"] = ("Nationality Distribution – Truck Drivers", fig)
+
+    gender = pd.DataFrame({label: survey.value_counts("Gender", Source_Dataset=src)
+                           for src, label in STAKEHOLDER_LABELS.items()}).T.fillna(0)
+    gender = gender.reindex(columns=["Male","Female"], fill_value=0)
+    gender = gender.div(gender.sum(axis=1).replace(0, 1), axis=0).mul(100).round(1)
+    gdf = gender.set_axis(["Male %","Female %"], axis=1).rename_axis("Category").reset_index()
+    fig2 = go.Figure()
+    fig2.add_trace(go.Bar(name="Male", x=gdf["Category"], y=gdf["Male %"],
+                          marker_color="#003087"))
+    fig2.add_trace(go.Bar(name="Female", x=gdf["Category"], y=gdf["Female %"],
+                          marker_color="#e74c3c"))
+    fig2.update_layout(barmode="stack", height=320, plot_bgcolor="white",
+                       yaxis_title="%", xaxis_title="")
+    figs["gender"] = ("Gender Distribution Across Stakeholder Groups", fig2)
+
+    exp = survey.value_counts("Yearsexperience", Source_Dataset="TRUCK")
+    order = ORDINAL_LEVELS["Yearsexperience"]
+    exp = exp.reindex(order, fill_value=0)
+    fig3 = px.bar(x=exp.index, y=exp.values,
+                  color_discrete_sequence=["#0056b3"],
+                  text=exp.values,
+                  labels={"x":"Experience","y":"Count"})
+    fig3.update_traces(textposition="outside")
+    fig3.update_layout(height=300, plot_bgcolor="white",
+                       showlegend=False, xaxis_title="")
+    figs["experience"] = ("Years of Experience – Truck Drivers", fig3)
+
+    vf = survey.value_counts("Visitfrequency", Source_Dataset="TRUCK").reset_index()
+    vf.columns = ["Frequency","Count"]
+    fig4 = px.pie(vf, values="Count", names="Frequency",
+                  color_discrete_sequence=px.colors.sequential.Blues_r,
+                  hole=0.35)
+    fig4.update_layout(height=300)
+    figs["visit_frequency"] = ("Visit Frequency – Truck Drivers", fig4)
+    return figs
+
+
+@span("charts.stakeholder_figures")
+def stakeholder_figures(frame, schema, label):
+    """
+    One stakeholder group's own answers: ``frame``/``schema`` from
+    ``SourcePartitions.frame``/``schema``. Boolean columns are multi-select
+    options (share selecting each); categorical ones are single-answer
+    questions (share giving each answer, ordinal answers in their order).
+    """
+    figs = {}
+
+    options = [c for c, t in schema.items() if t == "boolean" and c in OPTION_GROUPS]
+    odf = pd.DataFrame({
+        "Question": [OPTION_GROUPS[c][0] for c in options],
+        "Option":   [OPTION_GROUPS[c][1] for c in options],
+        "Selected %": [round(float(frame[c].fillna(False).mean()) * 100, 1) for c in options],
+    })
+    fig = px.bar(odf, x="Selected %", y="Option", color="Question", orientation="h",
+                 text="Selected %", color_discrete_sequence=px.colors.qualitative.Safe)
+    fig.update_traces(textposition="outside")
+    fig.update_layout(height=max(320, 22 * len(odf)), plot_bgcolor="white", yaxis_title="",
+                      yaxis={"categoryorder": "array", "categoryarray": odf["Option"][::-1]})
+    figs["options"] = (f"Options Selected – {label}", fig)
+
+    rows = []
+    for col, dtype in schema.items():
+        if not isinstance(dtype, pd.CategoricalDtype):
+            continue
+        counts = frame[col].value_counts(normalize=True, sort=not dtype.ordered)
+        rows += [{"Question": col, "Answer": str(a), "Share %": round(v * 100, 1)}
+                 for a, v in counts.items() if v > 0]
+    fig2 = px.bar(pd.DataFrame(rows, columns=["Question", "Answer", "Share %"]),
+                  x="Share %", y="Question", color="Answer", orientation="h",
+                  color_discrete_sequence=px.colors.qualitative.Pastel)
+    fig2.update_layout(barmode="stack", height=320, plot_bgcolor="white", yaxis_title="",
+                       showlegend=False)
+    fig2.update_traces(hovertemplate="%{fullData.name}: %{x}%<extra></extra>")
+    figs["answers"] = (f"Single-answer Questions – {label}", fig2)
+    return figs
+
+
+# ============================================================
+# PAGE 3 — TRAFFIC PATTERNS
+# ============================================================
+@span("charts.traffic_figures")
+def traffic_figures(survey, gate_logs=None):
+    figs = {}
+
+    gdf = (survey.crosstab(GATE_LABELS, by="Source_Dataset", columns=["TRUCK","CLEARING_AGENTS"])
+           .set_axis(["Truck Drivers","Clearing Agents"], axis=1)
+           .rename_axis("Gate").reset_index())
+    fig = go.Figure()
+    fig.add_trace(go.Bar(name="Truck Drivers",  x=gdf["Gate"], y=gdf["Truck Drivers"],  marker_color="#003087"))
+    fig.add_trace(go.Bar(name="Clearing Agents",x=gdf["Gate"], y=gdf["Clearing Agents"],marker_color="#e74c3c"))
+    fig.update_layout(barmode="group", height=330, plot_bgcolor="white",
+                      yaxis_title="Responses", xaxis_title="")
+    figs["gates"] = ("Mostly Used Gates – Truck Drivers vs Clearing Agents", fig)
+
+    tdf = survey.crosstab(TIME_OF_DAY_LABELS).rename_axis("Period").reset_index()
+    colors_tod = ["#2ecc71","#f1c40f","#e74c3c","#8e44ad"]
+    fig2 = px.pie(tdf, values="Count", names="Period",
+                  color_discrete_sequence=colors_tod, hole=0.4)
+    fig2.update_traces(textinfo="percent+label")
+    fig2.update_layout(height=330)
+    figs["time_of_day"] = ("Congestion Time of Day (All Respondents)", fig2)
+
+    has_logs = gate_logs is not None and gate_logs.events
+    if has_logs:
+        latest = gate_logs.months()[-1]
+        latest_label = gate_logs.month_label(latest, True)
+        wdf = (gate_logs.weekly(latest)
+               .rename(columns={"Entry": "Entry Total", "Exit": "Exit Total"}).reset_index())
+    else:
+        latest, latest_label = None, "May 2025"
+        weekly = {
+            "Day":        ["Mon","Tue","Wed","Thu","Fri","Sat","Sun"],
+            "Entry Total":[4923, 5386, 6733, 7896, 7664, 6654, 4262],
+            "Exit Total": [5129, 5482, 5245, 6603, 6799, 6051, 2720],
+        }
+        wdf = pd.DataFrame(weekly)
+    fig3 = go.Figure()
+    fig3.add_trace(go.Scatter(x=wdf["Day"], y=wdf["Entry Total"], name="Entry Total",
+                              mode="lines+markers", line=dict(color="#003087", width=3),
+                              marker=dict(size=8)))
+    fig3.add_trace(go.Scatter(x=wdf["Day"], y=wdf["Exit Total"],  name="Exit Total",
+                              mode="lines+markers", line=dict(color="#e74c3c", width=3),
+                              marker=dict(size=8)))
+    fig3.update_layout(height=280, plot_bgcolor="white",
+                       yaxis_title="Trucks", xaxis_title="")
+    figs["weekly"] = (f"Weekly Traffic Entry & Exit Pattern ({latest_label})", fig3)
+
+    if has_logs:
+        mdf2 = gate_logs.categories(latest).rename_axis("Type").reset_index(name="Count")
+    else:
+        may_data = {"Type":["Transit","Local/CFS","Export","Loose Cargo","Empty"],
+                    "Count":[13559, 15648, 6230, 9418, 16395]}
+        mdf2 = pd.DataFrame(may_data)
+    fig4 = px.bar(mdf2, x="Type", y="Count", text="Count",
+                  color="Type",
+                  color_discrete_sequence=px.colors.sequential.Blues_r)
+    fig4.update_traces(textposition="outside")
+    fig4.update_layout(height=310, plot_bgcolor="white",
+                       showlegend=False, xaxis_title="")
+    figs["categories"] = (f"{latest_label} — Containerised Trucks Breakdown", fig4)
+
+    if has_logs:
+        sdf = gate_logs.shifts()
+    else:
+        shift_data = {
+            "Category":   ["Transit","Local/CFS","Export","Loose Cargo","Empty"],
+            "1st Shift":  [108, 175, 82, 392, 364],
+            "2nd Shift":  [246, 235, 88, 270, 321],
+            "3rd Shift":  [142,  62, 91, 347, 247],
+        }
+        sdf = pd.DataFrame(shift_data).set_index("Category")
+    fig5 = px.bar(sdf.T.rename_axis("Shift").reset_index(),
+                  x="Shift", y=sdf.index.tolist(),
+                  barmode="stack", height=310,
+                  color_discrete_sequence=["#003087","#0056b3","#e74c3c","#f1c40f","#2ecc71"])
+    fig5.update_layout(plot_bgcolor="white", xaxis_title="", yaxis_title="Trucks",
+                       legend_title="Type")
+    figs["shifts"] = ("Shift Distribution — Mombasa Port", fig5)
+    return figs
+
+
+# ============================================================
+# PAGE 4 — CONGESTION CAUSES
+# ============================================================
+@span("charts.causes_figures")
+def causes_figures(survey):
+    figs = {}
+
+    cdf = (survey.crosstab(CAUSE_LABELS, by="Source_Dataset", columns=["TRUCK","CLEARING_AGENTS"])
+           .set_axis(["Truck Drivers","Clearing Agents"], axis=1)
+           .rename_axis("Cause").reset_index())
+    cdf["Total"] = cdf["Truck Drivers"] + cdf["Clearing Agents"]
+    cdf = cdf.sort_values("Total", ascending=True)
+    fig = go.Figure()
+    fig.add_trace(go.Bar(y=cdf["Cause"], x=cdf["Truck Drivers"],  name="Truck Drivers",
+                         orientation="h", marker_color="#003087"))
+    fig.add_trace(go.Bar(y=cdf["Cause"], x=cdf["Clearing Agents"],name="Clearing Agents",
+                         orientation="h", marker_color="#e74c3c"))
+    fig.update_layout(barmode="stack", height=430, plot_bgcolor="white",
+                      xaxis_title="Response Count", yaxis_title="",
+                      legend=dict(orientation="h", yanchor="bottom", y=1.02))
+    figs["causes"] = ("Causes of Traffic Congestion at KPA Gates", fig)
+
+    # Share of all impact mentions by truck drivers
+    impact = survey.crosstab(IMPACT_LABELS, Source_Dataset="TRUCK")["Count"]
+    idf = (impact.mul(100 / max(impact.sum(), 1)).round(1)
+           .rename_axis("Impact").reset_index(name="Score").sort_values("Score", ascending=True))
+    fig2 = px.bar(idf, x="Score", y="Impact", orientation="h",
+                  color="Score", color_continuous_scale="Reds",
+                  text="Score")
+    fig2.update_traces(texttemplate="%{text:.1f}%", textposition="outside")
+    fig2.update_layout(height=330, plot_bgcolor="white",
+                       coloraxis_showscale=False, xaxis_title="%", yaxis_title="")
+    figs["impact"] = ("Impact on Truck Drivers", fig2)
+
+    sol_data = {
+        "Solution":["Truck Scheduling System","Enhance KPA Coordination",
+                    "Expand Gate Capacity","Automate Clearance",
+                    "Upgrade Inspection Tech","Increase Customs Staff",
+                    "Faster Document Processing","Pre-Clearance Process",
+                    "Staff Training"],
+        "Priority":[37.5, 33.3, 25.0, 21.6, 23.8, 16.7, 21.4, 16.7, 13.7]
+    }
+    sdf2 = pd.DataFrame(sol_data).sort_values("Priority", ascending=True)
+    fig3 = px.bar(sdf2, x="Priority", y="Solution", orientation="h",
+                  color="Priority", color_continuous_scale="Greens",
+                  text="Priority")
+    fig3.update_traces(texttemplate="%{text:.1f}%", textposition="outside")
+    fig3.update_layout(height=330, plot_bgcolor="white",
+                       coloraxis_showscale=False, xaxis_title="% Recommending", yaxis_title="")
+    figs["solutions"] = ("Stakeholder-Proposed Solutions", fig3)
+
+    selected = survey.crosstab(CAUSE_RATE_LABELS, Source_Dataset="TRUCK")["Count"]
+    rates = (selected * 100 / max(survey.size(Source_Dataset="TRUCK"), 1)).round(1)
+    rdf = rates.rename_axis("Cause").reset_index(name="Selection Rate %")
+    rdf = rdf.sort_values("Selection Rate %", ascending=False)
+    fig4 = px.bar(rdf, x="Cause", y="Selection Rate %", text="Selection Rate %",
+                  color="Selection Rate %", color_continuous_scale="Blues")
+    fig4.update_traces(textposition="outside")
+    fig4.update_layout(height=330, plot_bgcolor="white",
+                       coloraxis_showscale=False, xaxis_title="")
+    figs["cause_rates"] = ("Congestion Cause Selection Rate by Truck Drivers (%)", fig4)
+    return figs
+
+
+# ============================================================
+# PAGE 5 — ML MODELS
+# ============================================================
+@span("charts.model_figures")
+def model_figures(summary, feature_cols, target_label, model_name=None):
+    """
+    ``summary`` is one target's entry from ``kpa_ml.train_all``. Importances
+    are the best model's unless ``model_name`` picks another one.
+    """
+    figs = {}
+    results = summary["models"]
+
+    comp_df = pd.DataFrame({
+        "Model"     : list(results.keys()),
+        "Accuracy"  : [r["acc"]*100 for r in results.values()],
+        "CV Mean"   : [r["cv_mean"]*100 for r in results.values()],
+        "ROC-AUC"   : [r["auc"] for r in results.values()],
+    })
+    fig_comp = go.Figure()
+    fig_comp.add_trace(go.Bar(name="Test Accuracy %", x=comp_df["Model"],
+                              y=comp_df["Accuracy"], marker_color="#003087"))
+    fig_comp.add_trace(go.Bar(name="CV Mean %", x=comp_df["Model"],
+                              y=comp_df["CV Mean"], marker_color="#0078d4"))
+    fig_comp.update_layout(barmode="group", height=310, plot_bgcolor="white",
+                           yaxis_title="%", xaxis_title="")
+    figs["comparison"] = ("Model Comparison", fig_comp)
+
+    fig_cm = px.imshow(summary["cm"], text_auto=True, aspect="auto",
+                       color_continuous_scale="Blues",
+                       labels=dict(x="Predicted", y="Actual"),
+                       x=["Low/Moderate","High"],
+                       y=["Low/Moderate","High"])
+    fig_cm.update_layout(height=310, title=f"Confusion Matrix: {target_label}")
+    figs["confusion"] = ("Confusion Matrix — Best Model", fig_cm)
+
+    importances = summary["models"][model_name]["importances"] if model_name else summary["importances"]
+    fi_df = pd.DataFrame({
+        "Feature"   : feature_cols,
+        "Importance": importances
+    }).sort_values("Importance", ascending=True).tail(15)
+    fig_fi = px.bar(fi_df, x="Importance", y="Feature",
+                    orientation="h",
+                    color="Importance", color_continuous_scale="Blues",
+                    text=fi_df["Importance"].round(3))
+    fig_fi.update_traces(textposition="outside")
+    fig_fi.update_layout(height=420, plot_bgcolor="white",
+                         coloraxis_showscale=False, yaxis_title="")
+    shown = "Best Model" if model_name in (None, summary.get("best_name")) else model_name
+    figs["importances"] = (f"Feature Importances — {shown}", fig_fi)
+    return figs
+
+
+# ============================================================
+# PAGE 6 — PREDICT FOR NEW DRIVER
+# ============================================================
+@span("charts.risk_gauge")
+def risk_gauge(overall_risk):
+    fig_gauge = go.Figure(go.Indicator(
+        mode="gauge+number+delta",
+        value=overall_risk * 100,
+        title={"text":"Overall Operational Risk Score"},
+        gauge={
+            "axis": {"range":[0,100]},
+            "bar":  {"color":"#003087"},
+            "steps":[
+                {"range":[0,33],  "color":"#2ecc71"},
+                {"range":[33,66], "color":"#f1c40f"},
+                {"range":[66,100],"color":"#e74c3c"},
+            ],
+            "threshold":{"line":{"color":"black","width":4},"thickness":0.75,"value":66}
+        }
+    ))
+    fig_gauge.update_layout(height=280)
+    return fig_gauge
+
+
+# ============================================================
+# PAGE 7 — RECOMMENDATIONS
+# ============================================================
+@span("charts.recommendations_figures")
+def recommendations_figures(rdf):
+    figs = {}
+
+    pri_counts = rdf["Priority"].value_counts().reset_index()
+    pri_counts.columns = ["Priority","Count"]
+    fig_pri = px.pie(pri_counts, values="Count", names="Priority",
+                     color_discrete_sequence=["#e74c3c","#e67e22","#f1c40f"])
+    fig_pri.update_layout(height=300)
+    figs["priority"] = ("Priority Distribution", fig_pri)
+
+    resp_counts = rdf["Responsibility"].value_counts().reset_index()
+    resp_counts.columns = ["Agency","Count"]
+    fig_resp = px.bar(resp_counts, x="Count", y="Agency", orientation="h",
+                      color="Count", color_continuous_scale="Blues")
+    fig_resp.update_layout(height=300, plot_bgcolor="white",
+                           coloraxis_showscale=False, yaxis_title="")
+    figs["responsibility"] = ("Responsibility Distribution", fig_resp)
+    return figs
+
+
+# ============================================================
+# STATIC EXPORT
+# ============================================================
+def export_figures(builder, args, png=False):
+    """
+    Build one page's figures with ``builder(*args)`` (named by string, so the
+    call pickles for worker processes) and export each one.
+
+    Returns ``[(key, title, html_div, png_bytes_or_None), ...]``. HTML
+    fragments omit plotly.js, which the caller includes once.
+    """
+    rendered = []
+    for key, (title, fig) in globals()[builder](*args).items():
+        div = fig.to_html(full_html=False, include_plotlyjs=False, default_width="100%")
+        image = fig.to_image(format="png", width=PNG_WIDTH, scale=PNG_SCALE) if png else None
+        rendered.append((key, title, div, image))
+    return rendered
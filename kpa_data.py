@@ -0,0 +1,1129 @@
+"""
+KPA Traffic Analytics — data & feature encoding
+================================================
+Survey vocabularies and vectorised encoders shared by the dashboard pages and
+the batch scoring path. Nothing in here depends on Streamlit.
+"""
+
+import hashlib
+import io
+import multiprocessing
+import os
+import sys
+import threading
+import weakref
+from concurrent.futures import ProcessPoolExecutor
+from collections.abc import Mapping
+from contextlib import contextmanager
+from functools import cached_property
+from importlib.machinery import ModuleSpec
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from kpa_perf import cache_miss, span
+
+CACHE_DIR = Path(os.environ.get("KPA_CACHE_DIR", ".kpa_cache"))
+
+# ============================================================
+# SURVEY VOCABULARY
+# ============================================================
+# Uploader key / file stem -> Source_Dataset label
+SOURCE_MAP = {
+    "clearing": "CLEARING_AGENTS",
+    "custom":   "CUSTOM",
+    "kpa":      "KPA_STAFF",
+    "traffic":  "TRAFFIC_POLICE",
+    "truck":    "TRUCK",
+}
+
+BINARY_COLS = [
+    "Gate18","Gate24","Gates9","Gate12","Gate15","Gate16","ICDGATES",
+    "Containerized","Empty","Bulk","Breakbulk","Refridgerated",
+    "Morning","Midday","Afternoon","Evening",
+    "Toomanytrucks","clearance","securitychecks","Gateprocessing",
+    "Trackinggadgets","Roadconditions","Gatelanes","Truckscheduling",
+    "Fuelcost","Increasedtunaruondtimes","misseddeliveryschedules",
+    "longerworkinghours","Increaseddemurrage","Delayinstacking",
+    "Increasedstoragefees","stressorfatigue","Nosignificantimpact"
+]
+
+WAIT_MAP = {
+    "Less than 30 mins":0, "30 min-1 hr":1, "1-2 hrs":2, "2-5 hrs":3, "over 5 hrs":4
+}
+FREQ_MAP  = {"Never":0,"Rarely":1,"Sometimes":2,"often":3,"Often":3,"Always":4}
+EXP_MAP   = {"Less than 1 year":0,"1-5 years":1,"6-10 yeras":2,"6-10 years":2,"Over 10 years":3}
+VISIT_MAP = {
+    "Rarely less than once per month":0,
+    "A few times a month,1-3 times":1,
+    "Once a week":2,
+    "several times a week,2-4 times":3,
+    "Daily":4
+}
+
+# Canonical answer order for the ordinal questions. Loading folds case and
+# known misspellings onto these levels ("often" -> "Often", "6-10 yeras" ->
+# "6-10 years") and stores the columns as ordered categoricals.
+ORDINAL_LEVELS = {
+    "Averagewaitingtime"        : ["Less than 30 mins","30 min-1 hr","1-2 hrs","2-5 hrs","over 5 hrs"],
+    "Trafficcongestionfrequency": ["Never","Rarely","Sometimes","Often","Always"],
+    "Yearsexperience"           : ["Less than 1 year","1-5 years","6-10 years","Over 10 years"],
+    "Visitfrequency"            : list(VISIT_MAP),
+}
+ANSWER_VARIANTS = {"6-10 yeras": "6-10 years"}
+
+FEATURE_COLS = [
+    "is_kenyan","is_male","exp_encoded","visit_encoded",
+    "Gate18","Gate24","Gates9","Gate12","Gate16","ICDGATES",
+    "Morning","Midday","Afternoon","Evening",
+    "Containerized","Empty","Bulk","Toomanytrucks",
+    "clearance","securitychecks","Gateprocessing","Trackinggadgets",
+    "Roadconditions","Gatelanes","Truckscheduling"
+]
+
+# Columns of the truck-driver survey used across the dashboard pages
+TRUCK_COLS = [
+    "Nationality","Gender","Yearsexperience","Visitfrequency",
+    "Gate18","Gate24","Gates9","Gate12","Gate15","Gate16","ICDGATES",
+    "Containerized","Empty","Bulk","Breakbulk","Refridgerated",
+    "Morning","Midday","Afternoon","Evening",
+    "Averagewaitingtime","Trafficcongestionfrequency",
+    "Toomanytrucks","clearance","securitychecks","Gateprocessing",
+    "Trackinggadgets","Roadconditions","Gatelanes","Truckscheduling",
+    "Fuelcost","Increasedtunaruondtimes","misseddeliveryschedules",
+    "longerworkinghours","Increaseddemurrage","Delayinstacking",
+    "Increasedstoragefees","stressorfatigue","Nosignificantimpact"
+]
+
+TARGET_COLS = ["high_congestion", "long_wait"]
+
+SOURCES = ["TRUCK", "CUSTOM", "KPA_STAFF", "TRAFFIC_POLICE", "CLEARING_AGENTS"]
+
+# Raw columns a driver roster must carry to be scored; binary columns that are
+# absent are treated as "Not selected".
+ROSTER_REQUIRED = ["Nationality", "Gender", "Yearsexperience", "Visitfrequency"]
+
+# Multi-select questions: one "Selected" column per option, with chart labels
+GATE_LABELS = {
+    "Gates9":"9/10 Main", "Gate12":"12/13 Shimanzi", "Gate15":"Gate 15", "Gate16":"Gate 16",
+    "Gate18":"Gate 18", "Gate24":"Gate 24", "ICDGATES":"ICD Gates",
+}
+TIME_OF_DAY_LABELS = {"Morning":"Morning", "Midday":"Midday", "Afternoon":"Afternoon", "Evening":"Evening"}
+CAUSE_LABELS = {
+    "Gateprocessing":"Slow Gate Processing", "securitychecks":"Slow Security Checks",
+    "Trackinggadgets":"KRA Gadget Delays",   "clearance":"Clearance Delays",
+    "Toomanytrucks":"Too Many Trucks",       "Gatelanes":"Limited Gate Lanes",
+    "Truckscheduling":"Lack of Truck Scheduling", "Roadconditions":"Poor Road Conditions",
+}
+IMPACT_LABELS = {
+    "longerworkinghours":"Longer Working Hours",     "Increasedstoragefees":"Increased Storage Fees",
+    "Fuelcost":"Increased Fuel Costs",               "misseddeliveryschedules":"Missed Delivery Schedules",
+    "stressorfatigue":"Stress / Fatigue",            "Increasedtunaruondtimes":"Increased Turnaround",
+    "Increaseddemurrage":"Increased Demurrage",      "Delayinstacking":"Delay in Stacking",
+}
+
+# Model features as named in explanations ("top drivers" on the Predict page)
+FEATURE_LABELS = {
+    "is_kenyan":"Kenyan national", "is_male":"Male", "exp_encoded":"Years of experience",
+    "visit_encoded":"Visit frequency",
+    **{c: f"Uses {label}" for c, label in GATE_LABELS.items()},
+    **{c: f"Arrives {label.lower()}" for c, label in TIME_OF_DAY_LABELS.items()},
+    "Containerized":"Containerized cargo", "Empty":"Empty truck", "Bulk":"Bulk cargo",
+    **CAUSE_LABELS,
+}
+
+# Single-answer questions the survey cube is grouped by
+CUBE_DIMS = [
+    "Source_Dataset","Nationality","Gender","Yearsexperience","Visitfrequency",
+    "Averagewaitingtime","Trafficcongestionfrequency",
+]
+CUBE_MISSING = "(no answer)"
+
+
+# ============================================================
+# DERIVED FRAMES
+# ============================================================
+def row_hashes(df):
+    """One 64-bit content hash per row (ignoring the index)."""
+    return pd.util.hash_pandas_object(df, index=False).to_numpy()
+
+
+def delta_rows(base, hashes):
+    """
+    Boolean mask of the rows in ``hashes`` beyond those of ``base`` (both row
+    hashes), or ``None`` if some ``base`` row is missing or changed.
+    """
+    n = len(base)
+    if np.array_equal(hashes[:n], base):          # new rows appended — the usual case
+        delta = np.zeros(len(hashes), dtype=bool)
+        delta[n:] = True
+        return delta
+    new = pd.Series(hashes)
+    need = pd.Series(np.asarray(base)).value_counts()
+    if (new.value_counts().reindex(need.index, fill_value=0) < need).any():
+        return None
+    # The first ``need[h]`` occurrences of each hash are the base's rows
+    return new.groupby(new).cumcount().to_numpy() >= new.map(need).fillna(0).to_numpy()
+
+
+def fingerprint_rows(columns, hashes):
+    """``frame_fingerprint`` from precomputed ``row_hashes``."""
+    h = hashlib.blake2b(digest_size=16)
+    h.update("\x1f".join(map(str, columns)).encode())
+    h.update(hashes.tobytes())
+    return h.hexdigest()
+
+
+@span("frame_fingerprint")
+def frame_fingerprint(df):
+    """Content hash of a DataFrame (column names + values, ignoring the index)."""
+    return fingerprint_rows(df.columns, row_hashes(df))
+
+
+def _source_codes(df):
+    """Integer code per row for ``Source_Dataset`` plus the label of each code."""
+    src = df["Source_Dataset"]
+    if isinstance(src.dtype, pd.CategoricalDtype):
+        return src.cat.codes.to_numpy(), list(src.cat.categories)
+    codes, labels = pd.factorize(src)
+    return codes, list(labels)
+
+
+def group_by_source(df):
+    """
+    Reorder rows so each ``Source_Dataset`` is one contiguous block.
+
+    The sort is stable and a no-op for frames that are already grouped (as
+    the combined CSV and ``combine_excels`` output are), so the order of
+    rows within a source — and everything derived from it — is unchanged.
+    """
+    codes, _ = _source_codes(df)
+    if len(codes) < 2 or np.count_nonzero(np.diff(codes)) < len(np.unique(codes)):
+        return df
+    order = pd.factorize(codes)[0]   # blocks in first-appearance order
+    return df.iloc[np.argsort(order, kind="stable")].reset_index(drop=True)
+
+
+class SourcePartitions(Mapping):
+    """
+    Rows of each stakeholder group, indexed in a single pass over
+    ``Source_Dataset``.
+
+    When every source is a contiguous block (see ``group_by_source``) a
+    partition is an ``iloc`` slice — a view, not a copy. Otherwise the row
+    positions are found with one stable argsort. ``parts[source]`` returns
+    all columns (empty for sources absent from the upload); ``frame(source)``
+    narrows it to the columns that source actually answered.
+    """
+
+    def __init__(self, df):
+        self.df = df
+        codes, labels = _source_codes(df)
+        starts = np.concatenate([[0], np.flatnonzero(np.diff(codes)) + 1]) if len(codes) else np.array([], dtype=np.int64)
+        run_codes = codes[starts]
+        self._rows = {}
+        if len(run_codes) == len(np.unique(run_codes)):
+            # Each source is a single run of rows: partitions are slices
+            stops = np.append(starts[1:], len(codes))
+            for c, lo, hi in zip(run_codes, starts, stops):
+                if c >= 0:
+                    self._rows[labels[c]] = slice(int(lo), int(hi))
+        else:
+            order  = np.argsort(codes, kind="stable")
+            bounds = np.cumsum(np.bincount(codes + 1, minlength=len(labels) + 1))
+            for k, label in enumerate(labels):
+                if bounds[k + 1] > bounds[k]:
+                    self._rows[label] = order[bounds[k]:bounds[k + 1]]
+        self._schemas = {}
+
+    def __getitem__(self, source):
+        rows = self._rows.get(source)
+        if rows is None:
+            if source not in SOURCES:
+                raise KeyError(source)
+            return self.df.iloc[:0]
+        return self.df.iloc[rows]
+
+    def __iter__(self):
+        return iter(SOURCES + [s for s in self._rows if s not in SOURCES])
+
+    def __len__(self):
+        return len(list(iter(self)))
+
+    def size(self, source):
+        rows = self._rows.get(source)
+        if rows is None:
+            return 0
+        return rows.stop - rows.start if isinstance(rows, slice) else len(rows)
+
+    def schema(self, source):
+        """``{column: dtype}`` of the columns holding any answer for ``source``."""
+        if source not in self._schemas:
+            part = self[source].drop(columns="Source_Dataset")
+            answered = part.notna().any()
+            self._schemas[source] = part.dtypes[answered[answered].index].to_dict()
+        return self._schemas[source]
+
+    def frame(self, source):
+        """``source``'s rows restricted to its own schema columns."""
+        return self[source][list(self.schema(source))]
+
+
+@span("truck_subset")
+def truck_subset(df, parts=None):
+    """Truck-driver rows restricted to ``TRUCK_COLS``."""
+    parts = parts if parts is not None else SourcePartitions(df)
+    trucks = parts["TRUCK"][TRUCK_COLS].reset_index(drop=True)
+    # Categoricals from the columnar cache keep other sources' answers as
+    # categories; drop them so value_counts only lists truck answers.
+    for col in trucks.select_dtypes("category"):
+        trucks[col] = trucks[col].cat.remove_unused_categories()
+    return trucks
+
+
+# ============================================================
+# SURVEY CUBE
+# ============================================================
+class SurveyCube:
+    """
+    Pre-aggregated survey counts.
+
+    ``cells`` has one row per combination of ``CUBE_DIMS`` answers seen in
+    the data, holding the number of ``respondents`` and, for every binary
+    column, how many of them selected it. Multi-select questions (gates,
+    time of day, causes, impacts) are therefore tallies, not dimensions.
+    Slices are memoised until the next ``update``; like other artifacts
+    they are shared and must be treated as read-only.
+    """
+
+    def __init__(self, cells):
+        self.cells = cells
+        self._slices = {}
+
+    @staticmethod
+    def aggregate(df):
+        """Cube cells for the rows of ``df`` (raw or normalised)."""
+        keys = [
+            df[d].astype("string").fillna(CUBE_MISSING).rename(d) if d in df
+            else pd.Series(CUBE_MISSING, index=df.index, name=d)
+            for d in CUBE_DIMS
+        ]
+        measures = pd.DataFrame(
+            {c: selected_flag(df[c]) if c in df else 0 for c in BINARY_COLS}, index=df.index)
+        measures.insert(0, "respondents", 1)
+        return measures.groupby(keys, sort=False).sum()
+
+    @classmethod
+    @span("survey_cube")
+    def build(cls, df):
+        return cls(cls.aggregate(df))
+
+    def update(self, rows):
+        """Fold additional respondent rows into the cube."""
+        both = pd.concat([self.cells, self.aggregate(rows)])
+        self.cells = both.groupby(level=CUBE_DIMS, sort=False).sum()
+        self._slices.clear()
+
+    @span("survey_cube_update")
+    def extended(self, rows):
+        """
+        A new cube with ``rows`` folded in, leaving this (shared) one as is.
+        Counts equal a rebuild's; combinations new to this cube come after
+        its own, so answers tied on count may be listed in another order.
+        """
+        cube = SurveyCube(self.cells)
+        cube.update(rows)
+        return cube
+
+    def crosstab(self, labels, by=None, columns=None, **where):
+        """
+        Tallies of the ``labels`` columns (``{column: label}``), one row per
+        label, with one column per value of dimension ``by`` (``"Count"``
+        when ``by`` is None). ``columns`` fixes which ``by`` values appear and
+        in what order; ``where`` keeps cells whose dimensions equal the given
+        values, e.g. ``Source_Dataset="TRUCK"``.
+        """
+        key = ("crosstab", tuple(labels.items()), by,
+               tuple(columns) if columns is not None else None, tuple(sorted(where.items())))
+        if key not in self._slices:
+            cells = self._where(where)
+            cols = list(labels)
+            if by is None:
+                table = cells[cols].sum().to_frame("Count")
+            else:
+                table = cells[cols].groupby(level=by, sort=False).sum().T
+                if columns is not None:
+                    table = table.reindex(columns=list(columns), fill_value=0)
+            table.index = [labels[c] for c in table.index]
+            self._slices[key] = table
+        return self._slices[key]
+
+    def value_counts(self, dim, **where):
+        """Respondents per answer of ``dim`` (unanswered excluded), largest first."""
+        key = ("value_counts", dim, tuple(sorted(where.items())))
+        if key not in self._slices:
+            counts = self._where(where)["respondents"].groupby(level=dim, sort=False).sum()
+            counts = counts.drop(CUBE_MISSING, errors="ignore")
+            self._slices[key] = counts[counts > 0].sort_values(ascending=False, kind="stable")
+        return self._slices[key]
+
+    def size(self, **where):
+        """Number of respondents matching ``where``."""
+        return int(self._where(where)["respondents"].sum())
+
+    def _where(self, where):
+        cells = self.cells
+        for dim, value in where.items():
+            cells = cells[cells.index.get_level_values(dim) == value]
+        return cells
+
+
+# ============================================================
+# BITMAP INDEX
+# ============================================================
+def _pack_bits(mask):
+    """Boolean row mask -> packed ``uint64`` words (zero-padded)."""
+    packed = np.packbits(mask)
+    packed = np.concatenate([packed, np.zeros(-len(packed) % 8, dtype=np.uint8)])
+    return packed.view(np.uint64)
+
+
+def _popcount(words):
+    return int(np.bitwise_count(words).sum())
+
+
+class BitmapIndex:
+    """
+    Packed bitmaps over respondent rows: one per binary column (bit set where
+    "Selected") and one per answer of each ``CUBE_DIMS`` column.
+
+    A cohort is the AND of its filters' bitmaps and every count is a
+    popcount, so slicing costs one pass over ``rows / 64`` words per
+    bitmap regardless of how many filters are combined.
+    """
+
+    @span("bitmap_index")
+    def __init__(self, df):
+        self.rows = len(df)
+        self._all = _pack_bits(np.ones(self.rows, dtype=bool))
+        self._none = np.zeros_like(self._all)
+        self._columns = {c: _pack_bits(selected_flag(df[c]).to_numpy() == 1)
+                         for c in BINARY_COLS if c in df}
+        self._values = {}
+        for dim in CUBE_DIMS:
+            if dim not in df:
+                continue
+            codes, uniques = pd.factorize(df[dim].astype("string"))
+            self._values[dim] = {str(u): _pack_bits(codes == i) for i, u in enumerate(uniques)}
+
+    def column(self, col):
+        return self._columns.get(col, self._none)
+
+    def value(self, dim, value):
+        return self._values.get(dim, {}).get(value, self._none)
+
+    def values(self, dim):
+        return list(self._values.get(dim, {}))
+
+    def cohort(self, columns=()):
+        """Respondents who selected every one of ``columns``."""
+        words = self._all
+        for col in columns:
+            words = words & self.column(col)
+        return Cohort(self, words)
+
+
+class Cohort:
+    """
+    A filtered set of respondents from a ``BitmapIndex``.
+
+    Offers the same ``crosstab`` / ``value_counts`` / ``size`` slices as
+    ``SurveyCube`` so pages can chart either one.
+    """
+
+    def __init__(self, index, words):
+        self.index = index
+        self.words = words
+
+    def _mask(self, where):
+        words = self.words
+        for dim, value in where.items():
+            words = words & self.index.value(dim, value)
+        return words
+
+    def size(self, **where):
+        return _popcount(self._mask(where))
+
+    def crosstab(self, labels, by=None, columns=None, **where):
+        """See ``SurveyCube.crosstab``."""
+        base = self._mask(where)
+        if by is None:
+            counts = {"Count": [_popcount(base & self.index.column(c)) for c in labels]}
+        else:
+            columns = list(columns) if columns is not None else self.index.values(by)
+            counts = {}
+            for value in columns:
+                part = base & self.index.value(by, value)
+                counts[value] = [_popcount(part & self.index.column(c)) for c in labels]
+        return pd.DataFrame(counts, index=list(labels.values()))
+
+    def value_counts(self, dim, **where):
+        """See ``SurveyCube.value_counts``."""
+        base = self._mask(where)
+        counts = pd.Series({v: _popcount(base & self.index.value(dim, v))
+                            for v in self.index.values(dim)}, dtype="int64")
+        return counts[counts > 0].sort_values(ascending=False, kind="stable")
+
+
+class DatasetArtifacts:
+    """
+    Frames derived from one uploaded dataset, keyed by its content key.
+
+    Each artifact is built on first access and then served as-is, so a
+    rerun only pays a dictionary lookup on the key — never a hash of the
+    frame. Artifacts are shared, so callers must treat them as read-only.
+    """
+
+    def __init__(self, key, df, base=None):
+        self.key = key
+        self.df = df
+        # (cube, frame_hashes) of an earlier upload this one may extend
+        self._base = base
+
+    @cached_property
+    def trucks(self):
+        return truck_subset(self.df, self.sources)
+
+    @cached_property
+    @span("source_partitions")
+    def sources(self):
+        """``SourcePartitions`` over the upload."""
+        return SourcePartitions(self.df)
+
+    @cached_property
+    def ml(self):
+        """``(df_ml, feature_cols)`` from ``prepare_ml_features``."""
+        return prepare_ml_features(self.trucks)
+
+    @cached_property
+    def cube(self):
+        """
+        ``SurveyCube`` over every respondent: the base upload's cube with
+        the added rows folded in when this upload only adds rows to it.
+        """
+        base, self._base = self._base, None
+        if base is not None:
+            cube, hashes = base
+            delta = delta_rows(hashes, self.frame_hashes)
+            if delta is not None:
+                return cube.extended(self.df[delta])
+        return SurveyCube.build(self.df)
+
+    @cached_property
+    def frame_hashes(self):
+        """Per-row hashes of the whole upload (incremental cube updates)."""
+        return row_hashes(self.df)
+
+    @cached_property
+    def bitmaps(self):
+        """``BitmapIndex`` over every respondent (cohort cross-filters)."""
+        return BitmapIndex(self.df)
+
+    @cached_property
+    def memory(self):
+        """``(raw_bytes, typed_bytes)`` — see ``memory_report``."""
+        return memory_report(self.df)
+
+    @cached_property
+    def ml_row_hashes(self):
+        """Per-row hashes of the model inputs/targets (incremental model updates)."""
+        df_ml, feature_cols = self.ml
+        return row_hashes(df_ml[feature_cols + TARGET_COLS])
+
+    @cached_property
+    @span("frame_fingerprint")
+    def ml_fingerprint(self):
+        """Content hash of the model inputs/targets (keys the model caches)."""
+        return fingerprint_rows(self.ml[1] + TARGET_COLS, self.ml_row_hashes)
+
+
+# ============================================================
+# VECTORISED ENCODERS
+# ============================================================
+def is_selected(value):
+    """Whether one answer cell reads "Selected" (case/whitespace-insensitive)."""
+    return str(value).strip().lower() == "selected"
+
+
+def selected_flag(series):
+    """
+    1 where a cell reads "Selected" (case/whitespace-insensitive), else 0.
+
+    Only the distinct values are inspected in Python; rows are mapped through
+    their factorized codes, so the cost is one hash pass over the column.
+    """
+    if pd.api.types.is_bool_dtype(series.dtype):
+        # Already normalised (see normalise_survey); missing counts as not selected
+        return pd.Series(series.fillna(False).to_numpy(dtype=np.int64),
+                         index=series.index, name=series.name)
+    codes, uniques = pd.factorize(series)
+    # Trailing 0 is the lookup for code -1 (missing), i.e. str(nan) != "selected"
+    flags = np.fromiter(map(is_selected, uniques), dtype=np.int64, count=len(uniques))
+    flags = np.append(flags, 0)
+    return pd.Series(flags[codes], index=series.index, name=series.name)
+
+
+def map_answers(series, mapping):
+    """
+    ``series.map(mapping)`` that also works on categorical columns, always
+    returning the plain dtype object input gives (int64, or float64 when
+    some answers are unmapped/missing).
+    """
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        lookup = np.append(series.cat.categories.map(mapping).to_numpy(dtype=np.float64), np.nan)
+        values = lookup[series.cat.codes.to_numpy()]
+        if not np.isnan(values).any():
+            values = values.astype(np.int64)
+        return pd.Series(values, index=series.index, name=series.name)
+    return series.map(mapping)
+
+
+def encode_features(raw):
+    """
+    Model feature frame (``FEATURE_COLS`` order) from raw survey vocabulary.
+
+    Unknown experience/visit answers encode as NaN; missing binary columns
+    encode as 0.
+    """
+    missing = [c for c in ROSTER_REQUIRED if c not in raw.columns]
+    if missing:
+        raise ValueError(f"missing required column(s): {', '.join(missing)}")
+
+    enc = {
+        "is_kenyan"    : (raw["Nationality"] == "Kenya").astype(np.int64),
+        "is_male"      : (raw["Gender"] == "Male").astype(np.int64),
+        "exp_encoded"  : map_answers(raw["Yearsexperience"], EXP_MAP),
+        "visit_encoded": map_answers(raw["Visitfrequency"], VISIT_MAP),
+    }
+    for col in FEATURE_COLS[4:]:
+        if col in raw.columns:
+            enc[col] = selected_flag(raw[col])
+        else:
+            enc[col] = pd.Series(0, index=raw.index, dtype=np.int64)
+    return pd.DataFrame(enc, index=raw.index)[FEATURE_COLS]
+
+
+def encode_records(records, feature_cols=FEATURE_COLS):
+    """
+    ``encode_features`` for a list of answer dicts, as a float32 matrix in
+    ``feature_cols`` order. Same maps and "Selected" rule applied value by
+    value, which beats building a frame for the few rows of a scoring
+    request (about 10 µs a row against a fixed ~13 ms). Answers must be
+    scalars; a ``True`` option counts as selected, as in a boolean column.
+    """
+    X = np.empty((len(records), len(feature_cols)), dtype=np.float32)
+    for i, r in enumerate(records):
+        enc = {
+            "is_kenyan"    : r["Nationality"] == "Kenya",
+            "is_male"      : r["Gender"] == "Male",
+            "exp_encoded"  : EXP_MAP.get(r["Yearsexperience"], np.nan),
+            "visit_encoded": VISIT_MAP.get(r["Visitfrequency"], np.nan),
+        }
+        X[i] = [enc[c] if c in enc else (r.get(c) is True or is_selected(r.get(c)))
+                for c in feature_cols]
+    return X
+
+
+@span("prepare_ml_features")
+def prepare_ml_features(trucks):
+    """
+    Encode the truck-driver frame for modelling.
+
+    Returns ``(df, feature_cols)``: a copy of ``trucks`` with the binary
+    columns as 0/1, the ordinal ``*_encoded`` columns, ``is_kenyan``/``is_male``
+    and the ``high_congestion``/``long_wait`` targets, plus the subset of
+    ``FEATURE_COLS`` present in it. Every step is a column-level operation, so
+    the cost per row is a hash lookup rather than a Python call.
+    """
+    df = trucks.copy()
+
+    for col in BINARY_COLS:
+        if col in df.columns:
+            df[col] = selected_flag(df[col])
+
+    df["wait_encoded"]       = map_answers(df["Averagewaitingtime"], WAIT_MAP)
+    df["congestion_encoded"] = map_answers(df["Trafficcongestionfrequency"], FREQ_MAP)
+    df["exp_encoded"]        = map_answers(df["Yearsexperience"], EXP_MAP)
+    df["visit_encoded"]      = map_answers(df["Visitfrequency"], VISIT_MAP)
+
+    df["is_kenyan"] = (df["Nationality"] == "Kenya").astype(int)
+    df["is_male"]   = (df["Gender"] == "Male").astype(int)
+
+    # Targets: High Congestion (Always/Often = 1), Long Wait (over 2 hrs = 1).
+    # NaN compares False, matching the previous row-wise lambdas.
+    df["high_congestion"] = (df["congestion_encoded"] >= 3).astype(int)
+    df["long_wait"]       = (df["wait_encoded"] >= 3).astype(int)
+
+    feature_cols = [c for c in FEATURE_COLS if c in df.columns]
+    return df, feature_cols
+
+
+# ============================================================
+# ROSTER READERS
+# ============================================================
+def iter_roster_chunks(file_bytes, filename, chunksize=100_000):
+    """
+    Yield a driver roster (CSV or Parquet) as DataFrames of at most
+    ``chunksize`` rows, so arbitrarily large files score in bounded memory.
+    """
+    buf = io.BytesIO(file_bytes)
+    if filename.lower().endswith(".parquet"):
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(buf).iter_batches(batch_size=chunksize):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(buf, chunksize=chunksize, dtype=str)
+
+
+def roster_row_count(file_bytes, filename):
+    """Row count for progress reporting (approximate for CSV with quoted newlines)."""
+    if filename.lower().endswith(".parquet"):
+        import pyarrow.parquet as pq
+        return pq.ParquetFile(io.BytesIO(file_bytes)).metadata.num_rows
+    return max(file_bytes.count(b"\n") - 1, 0)
+
+
+# ============================================================
+# PROCESS POOLS
+# ============================================================
+# Spawn-started workers re-run the parent's ``__main__`` script unless that
+# module's spec names a module; the name "__main__" itself tells them to skip
+# the step (``multiprocessing.spawn._fixup_main_from_name``).
+_MAIN_SPEC = ModuleSpec("__main__", None)
+
+
+@contextmanager
+def spawn_safe_main():
+    """
+    ``streamlit run`` installs the app script as a fresh ``__main__`` module
+    on every script run, with a ``__file__`` but no ``__spec__``, and
+    spawn-started workers would re-execute that script on start-up. Pool
+    jobs only need library modules, so before workers launch (i.e. around
+    the submit/map call) give the current ``__main__`` that spec.
+
+    The change only adds an attribute the script never reads: ``__file__``
+    stays and nothing is restored afterwards, so concurrent script runs and
+    pool launches never see a half-patched module and need no lock.
+    """
+    main = sys.modules.get("__main__")
+    if main is not None and getattr(main, "__spec__", None) is None:
+        main.__spec__ = _MAIN_SPEC
+    yield
+
+
+# ============================================================
+# EXCEL INGESTION
+# ============================================================
+# Title/banner rows sometimes sit above the real header row
+HEADER_SCAN_ROWS = 10
+
+# Below this total upload size, worker start-up costs more than it saves
+EXCEL_PARALLEL_MIN_BYTES = 4 << 20
+
+
+def _sheet_rows(file_bytes):
+    """
+    Cell values of the first worksheet as tuples, blanks as ``None``.
+
+    Uses the Rust ``python-calamine`` reader when installed, otherwise
+    openpyxl in streaming read-only mode.
+    """
+    try:
+        from python_calamine import CalamineWorkbook
+    except ImportError:
+        from openpyxl import load_workbook
+        wb = load_workbook(io.BytesIO(file_bytes), read_only=True, data_only=True)
+        try:
+            rows = list(wb.worksheets[0].iter_rows(values_only=True))
+        finally:
+            wb.close()
+    else:
+        rows = CalamineWorkbook.from_filelike(io.BytesIO(file_bytes)).get_sheet_by_index(0).to_python()
+    return [tuple(None if c == "" else c for c in row) for row in rows]
+
+
+def _header_row(rows):
+    """
+    Index of the header: the all-text row with the most filled cells among
+    the first ``HEADER_SCAN_ROWS`` (ties go to the earliest, so an all-text
+    first answer row never beats the header above it).
+    """
+    best, best_n = 0, 0
+    for i, row in enumerate(rows[:HEADER_SCAN_ROWS]):
+        cells = [c for c in row if c is not None]
+        if len(cells) > best_n and all(isinstance(c, str) for c in cells):
+            best, best_n = i, len(cells)
+    return best
+
+
+def _header_names(row, width):
+    names, seen = [], {}
+    for j in range(width):
+        cell = row[j] if j < len(row) else None
+        name = str(cell).strip() if cell is not None else f"Unnamed: {j}"
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        else:
+            seen[name] = 0
+        names.append(name)
+    return names
+
+
+def read_survey_sheet(file_bytes):
+    """One survey workbook as a typed frame with its real header promoted."""
+    rows = _sheet_rows(file_bytes)
+    if not rows:
+        return pd.DataFrame()
+    width = max(len(r) for r in rows)
+    h = _header_row(rows)
+    body = [r + (None,) * (width - len(r)) for r in rows[h + 1:]
+            if any(c is not None for c in r)]
+    df = pd.DataFrame(body, columns=_header_names(rows[h], width))
+    unnamed_empty = [c for c in df.columns if c.startswith("Unnamed: ") and df[c].isna().all()]
+    return df.drop(columns=unnamed_empty).infer_objects()
+
+
+def drop_non_respondent_rows(df):
+    """
+    Drop rows with no answers, and header rows that ended up in the data
+    (most filled cells equal their own column name).
+    """
+    answers = df.drop(columns=["Source_Dataset"], errors="ignore")
+    filled = answers.notna().sum(axis=1)
+    echoes = sum(answers[c].eq(c).fillna(False).to_numpy(dtype=np.int64) for c in answers.columns)
+    keep = (filled > 0) & (echoes * 2 <= filled)
+    if keep.all():
+        return df
+    return df[keep].reset_index(drop=True)
+
+
+@span("combine_excels")
+def combine_excels(file_bytes_dict, workers=None):
+    """
+    Combine the raw survey workbooks into one frame.
+
+    ``file_bytes_dict`` maps uploader keys (see ``SOURCE_MAP``) to file bytes.
+    Workbooks are parsed concurrently in a process pool when the upload is
+    large enough to pay for it; each sheet's header row is detected and
+    promoted, and columns are aligned by name across sources.
+    """
+    keys = list(file_bytes_dict)
+    blobs = [file_bytes_dict[k] for k in keys]
+    if workers is None:
+        workers = len(blobs) if sum(map(len, blobs)) >= EXCEL_PARALLEL_MIN_BYTES else 1
+    if workers > 1 and len(blobs) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(blobs)),
+                                 mp_context=multiprocessing.get_context("spawn")) as pool:
+            with spawn_safe_main():
+                pending = pool.map(read_survey_sheet, blobs)
+            frames = list(pending)
+    else:
+        frames = [read_survey_sheet(b) for b in blobs]
+
+    for key, df in zip(keys, frames):
+        df.insert(0, "Source_Dataset", SOURCE_MAP.get(key, key.upper()))
+    combined = pd.concat(frames, ignore_index=True, sort=False)
+    return drop_non_respondent_rows(combined.infer_objects())
+
+
+# ============================================================
+# TYPED SURVEY FRAME
+# ============================================================
+def _answer_key(value):
+    return str(value).strip().lower()
+
+
+def _as_binary(series):
+    """Selected/Not selected column as nullable ``boolean``; ``None`` if not one."""
+    codes, uniques = pd.factorize(series)
+    keys = [_answer_key(u) for u in uniques]
+    if not keys or not set(keys) <= {"selected", "not selected"}:
+        return None
+    flags = np.append(np.array([k == "selected" for k in keys]), False)
+    return pd.Series(pd.arrays.BooleanArray(flags[codes], codes < 0),
+                     index=series.index, name=series.name)
+
+
+def _as_ordinal(series, levels):
+    """
+    Ordered categorical over ``levels`` with case/spelling variants folded,
+    or ``None`` if some answer does not match any level.
+    """
+    lookup = {_answer_key(v): i for i, v in enumerate(levels)}
+    lookup.update({_answer_key(v): levels.index(c) for v, c in ANSWER_VARIANTS.items() if c in levels})
+    codes, uniques = pd.factorize(series)
+    level_codes = [lookup.get(_answer_key(u)) for u in uniques]
+    if None in level_codes:
+        return None
+    level_codes = np.append(np.array(level_codes, dtype=np.int64), -1)
+    cat = pd.Categorical.from_codes(level_codes[codes], categories=levels, ordered=True)
+    return pd.Series(cat, index=series.index, name=series.name)
+
+
+@span("normalise_survey")
+def normalise_survey(df):
+    """
+    Compact typed copy of a parsed survey frame.
+
+    Selected/Not selected columns become nullable booleans, the ordinal
+    questions in ``ORDINAL_LEVELS`` become ordered categoricals and the
+    remaining low-cardinality text (``Source_Dataset``, nationality, ...)
+    becomes categorical. The original size is kept in
+    ``attrs["raw_memory_bytes"]`` for the memory report.
+    """
+    out = {}
+    for col in df.columns:
+        s = df[col]
+        if s.dtype == object or pd.api.types.is_string_dtype(s.dtype) \
+                or isinstance(s.dtype, pd.CategoricalDtype):
+            typed = _as_ordinal(s, ORDINAL_LEVELS[col]) if col in ORDINAL_LEVELS else None
+            if typed is None:
+                typed = _as_binary(s)
+            if typed is not None:
+                s = typed
+        out[col] = s
+    typed = to_categoricals(pd.DataFrame(out, index=df.index))
+    typed.attrs["raw_memory_bytes"] = int(df.memory_usage(deep=True).sum())
+    return typed
+
+
+def memory_report(df):
+    """``(raw_bytes, typed_bytes)`` for a frame produced by ``normalise_survey``."""
+    typed = int(df.memory_usage(deep=True).sum())
+    return df.attrs.get("raw_memory_bytes", typed), typed
+
+
+# ============================================================
+# COLUMNAR UPLOAD CACHE
+# ============================================================
+# Parsed uploads are stored once per content hash as uncompressed Arrow IPC
+# files, which later sessions, restarts and other server processes open with
+# memory-mapped reads instead of re-parsing CSV/Excel.
+DATASET_DIR = CACHE_DIR / "datasets"
+
+# Bump when parsing/cleaning changes what a given upload turns into.
+DATASET_FORMAT_VERSION = 3
+
+# Text columns with at most this share of distinct values become categoricals
+CATEGORY_MAX_UNIQUE_RATIO = 0.5
+
+
+@span("upload_key")
+def upload_key(file_bytes_dict):
+    """Content address of an upload: hash of every file's name and bytes."""
+    h = hashlib.blake2b(digest_size=16)
+    h.update(f"v{DATASET_FORMAT_VERSION}".encode())
+    for name in sorted(file_bytes_dict):
+        h.update(name.encode() + b"\x00")
+        h.update(hashlib.blake2b(file_bytes_dict[name], digest_size=16).digest())
+    return h.hexdigest()
+
+
+def to_categoricals(df):
+    """Low-cardinality text columns as ``category`` (dictionary-encoded on disk)."""
+    out = {}
+    limit = max(1, int(len(df) * CATEGORY_MAX_UNIQUE_RATIO))
+    for col in df.columns:
+        s = df[col]
+        if (s.dtype == object or pd.api.types.is_string_dtype(s.dtype)) and s.nunique() <= limit:
+            s = s.astype("category")
+        out[col] = s
+    return pd.DataFrame(out, index=df.index)
+
+
+@span("write_columnar")
+def write_columnar(df, path):
+    """Atomically write ``df`` as an uncompressed Arrow IPC file."""
+    import pyarrow as pa
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(f".{os.getpid()}.tmp")
+    with pa.OSFile(str(tmp), "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    os.replace(tmp, path)
+
+
+@span("read_columnar")
+def read_columnar(path):
+    """Memory-map an Arrow IPC file written by ``write_columnar``."""
+    import pyarrow as pa
+    with pa.memory_map(str(path), "r") as source:
+        table = pa.ipc.open_file(source).read_all()
+    return table.to_pandas()
+
+
+def load_upload(file_bytes_dict, parse, key=None):
+    """
+    ``(key, df)`` for an upload: read from the columnar cache when these exact
+    bytes were seen before, otherwise ``parse()`` them and store the result.
+    Pass ``key`` when ``upload_key`` was already computed.
+    """
+    with span("load_upload", cache="hit"):
+        key = key or upload_key(file_bytes_dict)
+        path = DATASET_DIR / f"{key}.arrow"
+        if path.exists():
+            try:
+                return key, read_columnar(path)
+            except Exception:
+                pass  # truncated/foreign file — re-parse and overwrite
+
+        cache_miss()
+        with span("parse"):
+            raw = parse()
+        df = group_by_source(normalise_survey(raw))
+        try:
+            write_columnar(df, path)
+        except OSError:
+            pass  # read-only deployments just skip the disk cache
+        return key, df
+
+
+def _csv_parser(file_bytes):
+    return lambda: drop_non_respondent_rows(pd.read_csv(io.BytesIO(file_bytes)))
+
+
+def load_csv(file_bytes):
+    """``(key, df)`` for an uploaded combined CSV (see ``load_upload``)."""
+    return load_upload({"csv": file_bytes}, _csv_parser(file_bytes))
+
+
+# ============================================================
+# SHARED DATASET STORE
+# ============================================================
+class _StoredDataset:
+    """One uploaded frame, its derived artifacts and the handles holding it."""
+
+    def __init__(self, key):
+        self.key  = key
+        self.df   = None
+        self.base = None                # see DatasetStore._base_for
+        self.refs = 0
+        self.lock = threading.Lock()    # held while the frame loads
+
+    @cached_property
+    def artifacts(self):
+        cache_miss()
+        base, self.base = self.base, None
+        return DatasetArtifacts(self.key, self.df, base)
+
+
+class DatasetHandle:
+    """
+    A session's reference to a frame in the ``DatasetStore``. The reference
+    is dropped by ``release()`` or, at the latest, when the handle itself is
+    garbage-collected with the session that held it.
+    """
+
+    def __init__(self, store, entry):
+        self.key = entry.key
+        self._entry = entry
+        self._finalizer = weakref.finalize(self, store._release, entry)
+
+    @property
+    def df(self):
+        return self._entry.df
+
+    @property
+    def artifacts(self):
+        """``DatasetArtifacts`` shared by every handle on this upload."""
+        return self._entry.artifacts
+
+    @property
+    def sessions(self):
+        """Handles currently open on this upload, this one included."""
+        return self._entry.refs
+
+    def release(self):
+        """Drop this handle's reference (idempotent)."""
+        self._finalizer()
+
+
+class DatasetStore:
+    """
+    Process-wide uploads keyed by content key and counted by reference.
+    Sessions that upload the same bytes get handles on one frame and one set
+    of ``DatasetArtifacts``; the last handle released frees both. Frames are
+    shared, so holders must treat them as read-only.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}
+
+    def acquire(self, key, load):
+        """
+        ``DatasetHandle`` on ``key``, calling ``load() -> df`` only when no
+        session holds that upload already (concurrent callers wait for it).
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._entries[key] = _StoredDataset(key)
+            entry.refs += 1
+        try:
+            with entry.lock:
+                if entry.df is None:
+                    entry.df = load()
+                    entry.base = self._base_for(entry)
+        except BaseException:
+            self._release(entry)
+            raise
+        return DatasetHandle(self, entry)
+
+    def _base_for(self, entry):
+        """
+        ``(cube, frame_hashes)`` of the largest open upload with the same
+        columns, fewer rows and a cube already built — a candidate for
+        ``entry`` to extend. Only the cube and hashes are kept, so the base
+        frame is still freed with its last handle.
+        """
+        with self._lock:
+            bases = [e.artifacts for e in self._entries.values()
+                     if e is not entry and e.df is not None and len(e.df) < len(entry.df)
+                     and "artifacts" in vars(e) and "cube" in vars(e.artifacts)
+                     and e.df.columns.equals(entry.df.columns)]
+        if not bases:
+            return None
+        base = max(bases, key=lambda a: len(a.df))
+        return base.cube, base.frame_hashes
+
+    def _release(self, entry):
+        with self._lock:
+            entry.refs -= 1
+            if entry.refs == 0 and self._entries.get(entry.key) is entry:
+                del self._entries[entry.key]
+
+    def stats(self):
+        """``{"datasets", "handles"}`` currently held."""
+        with self._lock:
+            return {"datasets": len(self._entries),
+                    "handles":  sum(e.refs for e in self._entries.values())}
+
+
+DATASETS = DatasetStore()
+
+
+def open_upload(file_bytes_dict, parse):
+    """
+    ``DatasetHandle`` on an upload through the shared store: bytes another
+    session already has open are hashed but not read again.
+    """
+    key = upload_key(file_bytes_dict)
+    return DATASETS.acquire(key, lambda: load_upload(file_bytes_dict, parse, key)[1])
+
+
+def open_csv(file_bytes):
+    """``DatasetHandle`` on an uploaded combined CSV (see ``load_csv``)."""
+    return open_upload({"csv": file_bytes}, _csv_parser(file_bytes))
@@ -0,0 +1,397 @@
+"""
+KPA Traffic Analytics — gate transaction log ingestion
+=======================================================
+Streams gate-in/gate-out event exports (CSV, optionally gzip-compressed) in
+bounded-memory chunks and keeps running traffic aggregates that the Executive
+and Traffic Patterns pages chart from.
+
+Expected columns (case-insensitive, common aliases accepted):
+
+    timestamp   event time            e.g. 2025-05-14 15:32:10
+    direction   gate-in / gate-out    IN, OUT, Entry, Exit, Gate In, ...
+    category    truck/cargo type      Transit, Local/CFS, Export, Loose Cargo, Empty
+
+Other columns are ignored.
+
+Every event is counted once into a small table keyed by
+(month, weekday, shift, direction, category); the monthly, weekday, shift and
+category views are sums over it. The table, plus how far each source has been
+read, is persisted under ``CACHE_DIR/gatelog`` so new files (or rows appended
+to files already seen) are the only thing read on the next update. A file
+that shrinks or is replaced (log rotation) is read again from the start.
+"""
+
+import gzip
+import hashlib
+import io
+import json
+import os
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from kpa_data import CACHE_DIR
+from kpa_perf import span
+
+GATE_LOG_STATE = CACHE_DIR / "gatelog" / "aggregates.json"
+GATE_LOG_DIR   = os.environ.get("KPA_GATE_LOG_DIR")
+# Seconds between checks of GATE_LOG_DIR from the app (each check stats every file)
+GATE_LOG_POLL  = float(os.environ.get("KPA_GATE_LOG_POLL", 30))
+
+CHUNK_ROWS = 500_000
+
+COLUMN_ALIASES = {
+    "timestamp": ["timestamp", "time", "datetime", "event_time", "eventtime", "date"],
+    "direction": ["direction", "movement", "event", "event_type", "in_out"],
+    "category" : ["category", "truck_type", "trucktype", "cargo_type", "cargo"],
+}
+DIRECTION_ALIASES = {
+    "in": "Entry", "gate in": "Entry", "gate-in": "Entry", "gatein": "Entry", "entry": "Entry",
+    "out": "Exit", "gate out": "Exit", "gate-out": "Exit", "gateout": "Exit", "exit": "Exit",
+}
+
+# Mombasa gate shifts: 1st 07:00–15:00, 2nd 15:00–23:00, 3rd 23:00–07:00
+SHIFT_LABELS  = ["1st Shift", "2nd Shift", "3rd Shift"]
+SHIFT_OF_HOUR = np.array([2]*7 + [0]*8 + [1]*8 + [2], dtype=np.int8)
+
+WEEKDAYS = ["Mon","Tue","Wed","Thu","Fri","Sat","Sun"]
+KEY = ("month", "weekday", "shift", "direction", "category")
+
+
+# ============================================================
+# CHUNKED READER
+# ============================================================
+class _BoundedReader(io.RawIOBase):
+    """Read-only view of ``[start, stop)`` of a binary file."""
+
+    def __init__(self, fh, start, stop):
+        self._fh, self._left = fh, stop - start
+        fh.seek(start)
+
+    def readable(self):
+        return True
+
+    def readinto(self, buf):
+        n = min(len(buf), self._left)
+        if n <= 0:
+            return 0
+        data = self._fh.read(n)
+        buf[:len(data)] = data
+        self._left -= len(data)
+        return len(data)
+
+
+def _resolve_columns(columns):
+    lower = {c.strip().lower(): c for c in columns}
+    found = {}
+    for name, aliases in COLUMN_ALIASES.items():
+        for alias in aliases:
+            if alias in lower:
+                found[name] = lower[alias]
+                break
+    missing = [c for c in COLUMN_ALIASES if c not in found]
+    if missing:
+        raise ValueError(f"gate log is missing column(s): {', '.join(missing)} "
+                         f"(found: {', '.join(columns)})")
+    return found
+
+
+def iter_gate_log_chunks(source, chunksize=CHUNK_ROWS, header=None):
+    """
+    Yield normalised event chunks (``timestamp``, ``direction``, ``category``)
+    from a CSV path or binary file object.
+
+    ``header`` supplies the column names when ``source`` starts mid-file
+    (incremental reads of an appended log).
+    """
+    read_kw = dict(chunksize=chunksize, dtype=str)
+    if header is not None:
+        read_kw.update(header=None, names=header)
+    for raw in pd.read_csv(source, **read_kw):
+        cols = _resolve_columns(list(raw.columns))
+        ts = pd.to_datetime(raw[cols["timestamp"]], errors="coerce")
+        direction = raw[cols["direction"]].str.strip().str.lower().map(DIRECTION_ALIASES)
+        chunk = pd.DataFrame({
+            "timestamp": ts,
+            "direction": direction,
+            "category" : raw[cols["category"]].str.strip(),
+        })
+        yield chunk.dropna()
+
+
+def _stat_key(stat):
+    """What identifies one version of a file: inode, size and mtime."""
+    return [stat.st_ino, stat.st_size, stat.st_mtime_ns]
+
+
+# ============================================================
+# RUNNING AGGREGATES
+# ============================================================
+class GateLogAggregates:
+    """
+    Running event counts keyed by ``KEY``; safe to share between sessions.
+
+    ``update`` folds in any iterable of normalised chunks. ``ingest_file`` /
+    ``ingest_dir`` remember how many bytes of each file were consumed, so
+    re-running them only reads files that are new or have grown. A source's
+    counts are merged together with its read position, only once the whole
+    read succeeded, so a file that fails half-way adds nothing.
+    """
+
+    def __init__(self, counts=None, sources=None, path=GATE_LOG_STATE):
+        self.counts  = Counter(counts or {})
+        # source id -> {"offset", "header", "inode", "rows"}, plus "error" and
+        # "stat" for a file ``ingest_dir`` could not read (skipped until it changes)
+        self.sources = dict(sources or {})
+        self.path    = Path(path) if path is not None else None
+        self._lock   = threading.Lock()     # guards ``counts``
+        self._ingest = threading.RLock()    # one reader per source at a time
+        self._polled = {}                   # directory -> monotonic time of last check
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["_lock"], state["_ingest"], state["_polled"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock, self._ingest = threading.Lock(), threading.RLock()
+        self._polled = {}
+
+    # ── persistence ─────────────────────────────────────────────────────────
+    @classmethod
+    def load(cls, path=GATE_LOG_STATE):
+        path = Path(path)
+        try:
+            state = json.loads(path.read_text())
+        except (OSError, ValueError):
+            return cls(path=path)
+        counts = {tuple(row[:-1]): row[-1] for row in state["counts"]}
+        return cls(counts, state["sources"], path)
+
+    def save(self):
+        if self.path is None:
+            return
+        state = {
+            "counts" : [[*k, n] for k, n in self.counts.items()],
+            "sources": self.sources,
+        }
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(f".{os.getpid()}.tmp")
+            tmp.write_text(json.dumps(state))
+            os.replace(tmp, self.path)
+        except OSError:
+            pass
+
+    # ── ingestion ───────────────────────────────────────────────────────────
+    def update(self, chunks):
+        """Fold normalised event chunks into the counts; returns events added."""
+        tally, added = self._tally(chunks)
+        with self._lock:
+            self.counts.update(tally)
+        return added
+
+    @staticmethod
+    @span("gatelog.tally")
+    def _tally(chunks):
+        """Count normalised event chunks by ``KEY``; returns ``(Counter, events)``."""
+        tally, added = Counter(), 0
+        for chunk in chunks:
+            ts = chunk["timestamp"]
+            keys = pd.DataFrame({
+                "month"    : (ts.dt.year * 100 + ts.dt.month).to_numpy(),
+                "weekday"  : ts.dt.dayofweek.to_numpy(),
+                "shift"    : SHIFT_OF_HOUR[ts.dt.hour.to_numpy()],
+                "direction": chunk["direction"].to_numpy(),
+                "category" : chunk["category"].to_numpy(),
+            })
+            part = keys.value_counts(sort=False)
+            for (m, w, s, d, c), n in part.items():
+                tally[(int(m), int(w), int(s), d, c)] += int(n)
+            added += len(chunk)
+        return tally, added
+
+    def _commit(self, source_id, record, tally=None):
+        """Merge a source's counts and its record in one step, then persist."""
+        with self._lock:
+            if tally:
+                self.counts.update(tally)
+            self.sources[source_id] = record
+        self.save()
+
+    def ingest_bytes(self, data, name=""):
+        """Ingest an uploaded log once per content hash; returns events added."""
+        source_id = "upload:" + hashlib.blake2b(data, digest_size=16).hexdigest()
+        with self._ingest:
+            if source_id in self.sources:
+                return 0
+            buf = io.BytesIO(data)
+            if name.endswith(".gz"):
+                buf = gzip.GzipFile(fileobj=buf)
+            tally, added = self._tally(iter_gate_log_chunks(buf))
+            self._commit(source_id, {"name": name, "rows": added}, tally)
+            return added
+
+    def ingest_file(self, path):
+        """
+        Ingest the unread tail of ``path``: the whole file the first time,
+        then only complete lines appended since. Gzip files are read once.
+        A file that is replaced (new inode) or shrinks is read from the start.
+        """
+        with self._ingest:
+            return self._ingest_file(str(path))
+
+    def _ingest_file(self, path):
+        with open(path, "rb") as fh:
+            stat = os.fstat(fh.fileno())
+            seen = self.sources.get(path)
+            rows = (seen or {}).get("rows", 0)
+            if seen is not None and "error" in seen:
+                if seen["stat"] == _stat_key(stat):
+                    return 0
+                # Changed since it failed: retry from where the last good read ended
+                seen = {k: v for k, v in seen.items() if k not in ("error", "stat")} or None
+            if seen is not None and seen.get("inode", stat.st_ino) != stat.st_ino:
+                seen = None                  # rotated: a new file under the old name
+
+            if path.endswith(".gz"):
+                if seen is not None:
+                    return 0
+                with gzip.GzipFile(fileobj=fh) as gz:
+                    tally, added = self._tally(iter_gate_log_chunks(gz))
+                self._commit(path, {"offset": None, "inode": stat.st_ino,
+                                    "rows": rows + added}, tally)
+                return added
+
+            size = stat.st_size
+            start = seen["offset"] if seen else 0
+            if size < start:                 # truncated (copytruncate rotation)
+                seen, start = None, 0
+            if size <= start:
+                return 0
+            # Only consume up to the last complete line; a writer may be mid-row
+            fh.seek(max(start, size - 65536))
+            tail = fh.read()
+            stop = size - (len(tail) - tail.rfind(b"\n") - 1) if b"\n" in tail else start
+            if stop <= start:
+                return 0
+            header = seen["header"] if seen else None
+            if header is None:
+                fh.seek(0)
+                first = fh.readline()
+                header = list(pd.read_csv(io.BytesIO(first), nrows=0).columns)
+                start = len(first)
+            reader = io.BufferedReader(_BoundedReader(fh, start, stop))
+            tally, added = self._tally(iter_gate_log_chunks(reader, header=header))
+
+        self._commit(path, {"offset": stop, "header": header, "inode": stat.st_ino,
+                            "rows": rows + added}, tally)
+        return added
+
+    def ingest_dir(self, directory, pattern="*.csv*"):
+        """
+        Ingest new files and appended rows under ``directory``. A file that
+        cannot be read is recorded in ``failed()`` and skipped until it changes.
+        """
+        added = 0
+        with span("gatelog.ingest_dir"):
+            for path in sorted(Path(directory).glob(pattern)):
+                try:
+                    added += self.ingest_file(path)
+                except (OSError, ValueError) as e:
+                    self._skip(str(path), e)
+        return added
+
+    def poll_dir(self, directory, every=GATE_LOG_POLL):
+        """``ingest_dir`` at most once per ``every`` seconds; returns events added."""
+        now = time.monotonic()
+        with self._lock:
+            last = self._polled.get(directory)
+            if last is not None and now - last < every:
+                return 0
+            self._polled[directory] = now
+        return self.ingest_dir(directory)
+
+    def _skip(self, path, error):
+        """Record ``path`` as unreadable, keeping how far it was read before."""
+        with self._ingest:
+            try:
+                stat = _stat_key(os.stat(path))
+            except OSError:
+                stat = None
+            self._commit(path, {**self.sources.get(path, {}), "error": str(error), "stat": stat})
+
+    def failed(self):
+        """``{path: error}`` of directory files skipped because they could not be read."""
+        return {k: v["error"] for k, v in self.sources.items() if "error" in v}
+
+    # ── views ───────────────────────────────────────────────────────────────
+    @property
+    def events(self):
+        return sum(self.counts.values())
+
+    def frame(self):
+        """Counts as a long DataFrame with one column per ``KEY`` field + ``count``."""
+        with self._lock:
+            items = list(self.counts.items())
+        if not items:
+            return pd.DataFrame(columns=[*KEY, "count"])
+        keys, counts = zip(*items)
+        df = pd.DataFrame(list(keys), columns=list(KEY))
+        df["count"] = counts
+        return df
+
+    def months(self):
+        return sorted({k[0] for k in self.counts})
+
+    @staticmethod
+    def month_label(month, with_year=False):
+        ts = pd.Timestamp(year=month // 100, month=month % 100, day=1)
+        return ts.strftime("%b %Y" if with_year else "%b")
+
+    def monthly(self, direction="Entry"):
+        """Month × category counts of ``direction`` events (rows in time order)."""
+        df = self.frame()
+        df = df[df["direction"] == direction]
+        table = df.pivot_table(index="month", columns="category", values="count",
+                               aggfunc="sum", fill_value=0).sort_index()
+        multi_year = len({m // 100 for m in table.index}) > 1
+        table.index = [self.month_label(m, multi_year) for m in table.index]
+        table.index.name = "Month"
+        return table
+
+    def weekly(self, month=None):
+        """Weekday Entry/Exit totals (optionally for one ``YYYYMM`` month)."""
+        df = self.frame()
+        if month is not None:
+            df = df[df["month"] == month]
+        table = df.pivot_table(index="weekday", columns="direction", values="count",
+                               aggfunc="sum", fill_value=0).reindex(range(7), fill_value=0)
+        table.index = WEEKDAYS
+        table.index.name = "Day"
+        return table.reindex(columns=["Entry", "Exit"], fill_value=0)
+
+    def shifts(self, month=None):
+        """Category × shift counts (optionally for one month)."""
+        df = self.frame()
+        if month is not None:
+            df = df[df["month"] == month]
+        table = df.pivot_table(index="category", columns="shift", values="count",
+                               aggfunc="sum", fill_value=0)
+        table = table.reindex(columns=range(len(SHIFT_LABELS)), fill_value=0)
+        table.columns = SHIFT_LABELS
+        table.index.name = "Category"
+        return table
+
+    def categories(self, month=None, direction="Entry"):
+        """Event counts per category (optionally for one month)."""
+        df = self.frame()
+        df = df[df["direction"] == direction]
+        if month is not None:
+            df = df[df["month"] == month]
+        return df.groupby("category")["count"].sum().sort_values(ascending=False)
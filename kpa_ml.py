@@ -0,0 +1,915 @@
+"""
+KPA Traffic Analytics — model training & caching
+=================================================
+Trains the four classifiers shown on the "ML Predictive Models" page and keeps
+the fitted results keyed on a content fingerprint of the feature frame, so the
+page only refits when the uploaded data actually changes.
+
+Nothing in here depends on Streamlit. ``kpa_app`` reaches it two ways:
+``current_training_job`` joins the background ``TrainingJob`` that trains (or
+loads) a dataset's models on the ``TRAINING_SLOTS`` queue, shared by every
+session on that dataset, and ``get_prediction_service`` wraps
+``load_or_fit_service`` in ``st.cache_resource``. The on-disk copy under
+``CACHE_DIR`` survives server restarts.
+"""
+
+import hashlib
+import json
+import math
+import multiprocessing
+import os
+import threading
+import time
+import warnings
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, TimeoutError, as_completed
+
+import joblib
+import numpy as np
+import pandas as pd
+import sklearn
+from scipy import sparse
+
+from kpa_data import (CACHE_DIR, delta_rows, encode_features, frame_fingerprint, row_hashes,
+                      spawn_safe_main)
+from kpa_perf import cache_miss, finish_run, record, span, start_run
+from kpa_trees import FlatTrees
+
+from sklearn.base import clone
+from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier
+from sklearn.exceptions import ConvergenceWarning
+from sklearn.linear_model import LogisticRegression, SGDClassifier
+from sklearn.tree import DecisionTreeClassifier
+from sklearn.utils.class_weight import compute_class_weight, compute_sample_weight
+from sklearn.model_selection import train_test_split, StratifiedKFold
+from sklearn.metrics import (classification_report, confusion_matrix,
+                             accuracy_score, roc_auc_score)
+from sklearn.inspection import permutation_importance
+
+# Bump when the layout of the cached results changes.
+CACHE_VERSION = 3
+
+TARGETS = {
+    "high_congestion": "High Congestion (Always/Often)",
+    "long_wait":       "Long Wait Time (>2 hrs)",
+}
+
+MODEL_SPECS = {
+    "Random Forest":         (RandomForestClassifier,     dict(n_estimators=150, random_state=42, class_weight="balanced")),
+    "Gradient Boosting":     (GradientBoostingClassifier, dict(n_estimators=100, random_state=42)),
+    "Logistic Regression":   (LogisticRegression,         dict(max_iter=500, random_state=42, class_weight="balanced")),
+    "Decision Tree":         (DecisionTreeClassifier,     dict(max_depth=6, random_state=42, class_weight="balanced")),
+}
+
+CV_FOLDS = 5
+
+# Process-pool size for training and per-estimator ``n_jobs``. One worker
+# runs every job in-process; results are identical either way.
+TRAIN_WORKERS = int(os.environ.get("KPA_TRAIN_WORKERS", 0)) or os.cpu_count() or 1
+TRAIN_N_JOBS  = int(os.environ.get("KPA_TRAIN_N_JOBS", 0)) or None
+
+# Incremental updates (see INCREMENTAL UPDATES below). A full retrain is due
+# once the rows added since the last one exceed STALE_FRACTION of it, after
+# MAX_INCREMENTAL_UPDATES updates, or when an update leaves the best hold-out
+# ROC-AUC more than AUC_DROP_TOLERANCE below the previous models'.
+STALE_FRACTION          = float(os.environ.get("KPA_STALE_FRACTION", 0.25))
+MAX_INCREMENTAL_UPDATES = 8
+AUC_DROP_TOLERANCE      = 0.02
+REPLAY_ROWS   = 5_000      # reservoir of past training rows replayed alongside new ones
+MIN_NEW_TREES = 10         # trees/stages added per update, at least
+SGD_ETA0      = 0.01       # step size of the linear model's partial fits
+
+
+def build_models(n_jobs=None, params=None):
+    """
+    Fresh, unfitted instances of the four models compared on the ML page.
+    ``params`` (``{model name: overrides}``, e.g. from ``kpa_tune``) replaces
+    the defaults in ``MODEL_SPECS`` per model.
+    """
+    params = params or {}
+    models = {}
+    for name, (cls, defaults) in MODEL_SPECS.items():
+        model = cls(**{**defaults, **params.get(name, {})})
+        if n_jobs is not None and "n_jobs" in model.get_params():
+            model.set_params(n_jobs=n_jobs)
+        models[name] = model
+    return models
+
+
+# ============================================================
+# TRAINING ENGINE
+# ============================================================
+# Training is split into independent jobs — one hold-out fit plus CV_FOLDS
+# cross-validation fits per (target, model) — so they can fan out over a
+# process pool. Each job rebuilds its estimator from MODEL_SPECS with the same
+# random_state and sees exactly the rows cross_val_score/train_test_split
+# would give it, so the assembled results match the serial path exactly.
+_JOB_DATA = {}
+
+
+def _init_jobs(data):
+    """Pool initializer: ship the per-target splits to a worker once."""
+    _JOB_DATA.clear()
+    _JOB_DATA.update(data)
+
+
+def _run_job(job):
+    """``(job, result, seconds)`` — the hold-out fit (``fold=None``) or one CV fold."""
+    t0 = time.perf_counter()
+    job, out = _fit_job(job)
+    return job, out, time.perf_counter() - t0
+
+
+def _fit_job(job):
+    target_col, name, fold = job
+    d = _JOB_DATA[target_col]
+    model = build_models(d["n_jobs"], d["params"])[name]
+    if fold is None:
+        model.fit(d["X_train"], d["y_train"])
+        return job, {"model": model, **_holdout(model, d["X_test"], d["y_test"])}
+    train_idx, test_idx = d["folds"][fold]
+    model.fit(d["X"].iloc[train_idx], d["y"].iloc[train_idx])
+    return job, accuracy_score(d["y"].iloc[test_idx], model.predict(d["X"].iloc[test_idx]))
+
+
+def _holdout(model, X_test, y_test):
+    """Hold-out predictions and ROC-AUC of a fitted model."""
+    y_pred = model.predict(X_test)
+    try:
+        auc = roc_auc_score(y_test, model.predict_proba(X_test)[:,1])
+    except ValueError:
+        auc = 0.0
+    return {"y_pred": y_pred, "auc": auc}
+
+
+def _split_target(X, y, n_jobs, params=None):
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, test_size=0.25, random_state=42, stratify=y)
+    # cross_val_score(cv=5) on a classifier uses unshuffled StratifiedKFold
+    folds = list(StratifiedKFold(n_splits=CV_FOLDS).split(X, y))
+    return {"X": X, "y": y, "X_train": X_train, "X_test": X_test,
+            "y_train": y_train, "y_test": y_test, "folds": folds, "n_jobs": n_jobs,
+            "params": params or {}}
+
+
+def _global_importances(model, d):
+    """Impurity importances for tree models, permutation importances otherwise."""
+    if hasattr(model, "feature_importances_"):
+        return np.asarray(model.feature_importances_)
+    pi = permutation_importance(model, d["X_test"], d["y_test"], n_repeats=5,
+                                random_state=42, n_jobs=d["n_jobs"])
+    return pi.importances_mean
+
+
+def _summarise_target(d, outputs, target_col):
+    results = {}
+    for name in MODEL_SPECS:
+        fit = outputs[(target_col, name, None)]
+        cv_scores = np.array([outputs[(target_col, name, k)] for k in range(CV_FOLDS)])
+        results[name] = {"model": fit["model"], "cv_mean": cv_scores.mean(), "cv_std": cv_scores.std(),
+                         "auc": fit["auc"], "y_pred": fit["y_pred"]}
+    summary = _score_summary(d, results, target_col)
+    summary["incremental"] = _incremental_state(d)
+    return summary
+
+
+def _score_summary(d, results, target_col):
+    """Accuracy, importances, best model, confusion matrix and report from hold-out predictions."""
+    for name, r in results.items():
+        r["acc"] = accuracy_score(d["y_test"], r["y_pred"])
+        with span("importances", model=name, target=target_col):
+            r["importances"] = _global_importances(r["model"], d)
+
+    best_name = max(results, key=lambda k: results[k]["auc"])
+    best = results[best_name]
+
+    return {
+        "models"     : results,
+        "best_name"  : best_name,
+        "cm"         : confusion_matrix(d["y_test"], best["y_pred"]),
+        "importances": best["importances"],
+        "report"     : classification_report(d["y_test"], best["y_pred"],
+                                             target_names=["Low/Moderate","High"],
+                                             output_dict=True),
+    }
+
+
+def train_all(df_ml, feature_cols, workers=None, n_jobs=None, params=None, progress=None):
+    """
+    Train every model for every target in ``TARGETS``.
+
+    Returns ``{target: {"models", "best_name", "cm", "importances", "report"}}``;
+    every entry of ``"models"`` carries its own global ``"importances"``.
+    ``workers`` (default ``TRAIN_WORKERS``) sets the process-pool size and
+    ``n_jobs`` (default ``TRAIN_N_JOBS``) is passed to estimators that accept it.
+    ``params`` (``{target: {model name: overrides}}``) swaps in tuned
+    hyperparameters. Each target also carries the ``"incremental"`` state
+    ``update_trained`` needs (hold-out rows, replay reservoir, lineage).
+    ``progress(done, total)`` is called as each fit finishes.
+    """
+    params = params or {}
+    workers = workers or TRAIN_WORKERS
+    n_jobs  = n_jobs if n_jobs is not None else TRAIN_N_JOBS
+
+    data = {}
+    for target_col in TARGETS:
+        model_df = df_ml[feature_cols + [target_col]].dropna()
+        data[target_col] = _split_target(model_df[feature_cols], model_df[target_col], n_jobs,
+                                         params.get(target_col))
+
+    # Slowest estimators first so the pool's tail is short
+    jobs = [(t, name, fold) for name in MODEL_SPECS for t in TARGETS
+            for fold in [None, *range(CV_FOLDS)]]
+    with span("train_all", workers=workers, jobs=len(jobs)):
+        finished = []
+        if workers <= 1:
+            _init_jobs(data)
+            try:
+                for job in jobs:
+                    finished.append(_run_job(job))
+                    if progress is not None:
+                        progress(len(finished), len(jobs))
+            finally:
+                _JOB_DATA.clear()
+        else:
+            # spawn, not fork: the Streamlit server is multi-threaded. Workers
+            # start while the jobs are submitted, so only that needs the main guard.
+            with ProcessPoolExecutor(max_workers=min(workers, len(jobs)),
+                                     mp_context=multiprocessing.get_context("spawn"),
+                                     initializer=_init_jobs, initargs=(data,)) as pool:
+                with spawn_safe_main():
+                    pending = [pool.submit(_run_job, job) for job in jobs]
+                for future in as_completed(pending):
+                    finished.append(future.result())
+                    if progress is not None:
+                        progress(len(finished), len(jobs))
+
+        outputs = {}
+        for (target_col, name, fold), out, seconds in finished:
+            outputs[(target_col, name, fold)] = out
+            step = "fit" if fold is None else f"cv fold {fold + 1}"
+            record(f"{name} {step}", seconds, target=target_col)
+        with span("summarise"):
+            return {t: _summarise_target(data[t], outputs, t) for t in TARGETS}
+
+
+# ============================================================
+# INCREMENTAL UPDATES
+# ============================================================
+# Every cached fit also stores the row hashes it was fitted on. When a new
+# upload contains all the rows of an earlier fit (the weekly survey export
+# with new responses appended), that fit is updated with just the delta:
+#
+#   random forests       warm start — add trees fitted on the new rows plus
+#                        an equal replay sample of old ones
+#   gradient boosting    warm start — add stages fitted on the replay
+#                        reservoir plus the new rows
+#   logistic regression  SGD log-loss partial fits, starting from the
+#                        current coefficients
+#   decision tree        refit on the replay reservoir plus the new rows
+#                        (a single tree cannot grow)
+#
+# The reservoir holds at most REPLAY_ROWS past training rows, so an update
+# costs in proportion to the new rows, not the history. The
+# staleness policy (``stale_reason``) sends everything else to a full retrain.
+def _incremental_state(d):
+    """Update state for a freshly trained target: hold-out rows, replay reservoir, lineage."""
+    n = len(d["X_train"])
+    keep = np.sort(np.random.default_rng(42).choice(n, min(n, REPLAY_ROWS), replace=False))
+    return {
+        "X_test"     : d["X_test"], "y_test": d["y_test"],
+        "replay_X"   : d["X_train"].iloc[keep], "replay_y": d["y_train"].iloc[keep],
+        "seen"       : n,
+        "full_rows"  : len(d["X"]),
+        "added_rows" : 0,
+        "updates"    : 0,
+    }
+
+
+def grow_ensemble(model, X, y, n_new, n_seen, y_all=None):
+    """
+    Warm-start a forest or boosting model with extra trees/stages fitted on
+    ``X, y``; the number added is proportional to ``n_new / n_seen``.
+    ``class_weight="balanced"`` is resolved on ``y_all`` (all known labels)
+    rather than on the update sample, as scikit-learn advises for warm starts.
+    """
+    current = len(model.estimators_)
+    added = max(MIN_NEW_TREES, math.ceil(current * n_new / max(n_seen, 1)))
+    params = {"warm_start": True, "n_estimators": current + added}
+    balanced = model.get_params().get("class_weight") == "balanced"
+    if balanced:
+        labels = y if y_all is None else y_all
+        params["class_weight"] = dict(zip(model.classes_, compute_class_weight(
+            "balanced", classes=model.classes_, y=labels)))
+    model.set_params(**params)
+    model.fit(X, y)
+    model.set_params(warm_start=False, **({"class_weight": "balanced"} if balanced else {}))
+    return model
+
+
+def partial_fit_linear(model, X, y, n_seen):
+    """
+    One SGD log-loss pass over ``X, y`` (class-balanced). A fitted
+    ``LogisticRegression`` becomes an ``SGDClassifier`` starting from its
+    coefficients, with the matching L2 penalty for ``n_seen`` rows.
+    """
+    weight = compute_sample_weight("balanced", y)
+    if isinstance(model, SGDClassifier):
+        return model.partial_fit(X, y, sample_weight=weight)
+    sgd = SGDClassifier(loss="log_loss", alpha=1 / (model.C * n_seen), learning_rate="constant",
+                        eta0=SGD_ETA0, max_iter=1, tol=None, random_state=42)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", ConvergenceWarning)
+        return sgd.fit(X, y, coef_init=model.coef_, intercept_init=model.intercept_,
+                       sample_weight=weight)
+
+
+def _reservoir_add(inc, X, y, rng):
+    """Reservoir-sample new training rows into the replay set (Algorithm R)."""
+    replay_X, replay_y = inc["replay_X"], inc["replay_y"]
+    room = REPLAY_ROWS - len(replay_X)
+    slots = {}
+    for i in range(max(room, 0), len(X)):
+        j = rng.integers(0, inc["seen"] + i + 1)
+        if j < REPLAY_ROWS:
+            slots[j] = i
+    if slots:
+        replay_X, replay_y = replay_X.copy(), replay_y.copy()
+        replay_X.iloc[list(slots)] = X.iloc[list(slots.values())].to_numpy()
+        replay_y.iloc[list(slots)] = y.iloc[list(slots.values())].to_numpy()
+    if room > 0:
+        replay_X = pd.concat([replay_X, X.iloc[:room]])
+        replay_y = pd.concat([replay_y, y.iloc[:room]])
+    inc["replay_X"], inc["replay_y"] = replay_X, replay_y
+
+
+def update_trained(trained, df_ml, feature_cols, delta):
+    """
+    Update ``train_all`` results with the rows of ``df_ml`` flagged in the
+    boolean mask ``delta``. New rows are split 75/25 like a full retrain:
+    the training part updates every model, the test part joins the hold-out
+    set all metrics are recomputed on. Cross-validation scores are kept from
+    the last full retrain. Returns ``None`` when a full retrain is needed,
+    including when the updated best model scores worse on the extended
+    hold-out set than the previous best did.
+    """
+    for target_col in TARGETS:
+        summary = trained[target_col]
+        inc = summary["incremental"]
+        new = df_ml.loc[delta, feature_cols + [target_col]].dropna()
+        if not len(new):
+            continue
+        X_new, y_new = new[feature_cols], new[target_col]
+        if len(new) >= 4 and y_new.value_counts().min() >= 2:
+            X_tr, X_te, y_tr, y_te = train_test_split(X_new, y_new, test_size=0.25, random_state=42,
+                                                      stratify=y_new)
+        else:
+            X_tr, X_te, y_tr, y_te = X_new, X_new.iloc[:0], y_new, y_new.iloc[:0]
+
+        rng = np.random.default_rng(42 + inc["updates"])
+        pick = rng.choice(len(inc["replay_X"]), min(len(inc["replay_X"]), len(X_tr)), replace=False)
+        X_fit = pd.concat([X_tr, inc["replay_X"].iloc[pick]])
+        y_fit = pd.concat([y_tr, inc["replay_y"].iloc[pick]])
+        if y_fit.nunique() < 2:
+            return None
+        n_seen = inc["seen"] + len(X_tr)
+        X_test = pd.concat([inc["X_test"], X_te])
+        y_test = pd.concat([inc["y_test"], y_te])
+        before = _holdout(summary["models"][summary["best_name"]]["model"], X_test, y_test)["auc"]
+        X_all = pd.concat([inc["replay_X"], X_tr])
+        y_all = pd.concat([inc["replay_y"], y_tr])
+
+        results = {}
+        for name, r in summary["models"].items():
+            model = r["model"]
+            with span("incremental update", model=name, target=target_col, rows=len(X_tr)):
+                if isinstance(model, RandomForestClassifier):
+                    model = grow_ensemble(model, X_fit, y_fit, len(X_tr), inc["seen"], y_all)
+                elif isinstance(model, GradientBoostingClassifier):
+                    # Stages correct the ensemble's residuals; fitting them on a
+                    # small sample overfits it, so they see the whole reservoir
+                    model = grow_ensemble(model, X_all, y_all, len(X_tr), inc["seen"])
+                elif isinstance(model, (LogisticRegression, SGDClassifier)):
+                    model = partial_fit_linear(model, X_fit, y_fit, n_seen)
+                else:
+                    model = clone(model).fit(X_all, y_all)
+            results[name] = {"model": model, "cv_mean": r["cv_mean"], "cv_std": r["cv_std"]}
+
+        inc["X_test"], inc["y_test"] = X_test, y_test
+        _reservoir_add(inc, X_tr, y_tr, rng)
+        inc["seen"] = n_seen
+        inc["added_rows"] += len(new)
+        inc["updates"] += 1
+
+        d = {"X_test": inc["X_test"], "y_test": inc["y_test"], "n_jobs": TRAIN_N_JOBS}
+        for r in results.values():
+            r.update(_holdout(r["model"], d["X_test"], d["y_test"]))
+        updated = _score_summary(d, results, target_col)
+        if updated["models"][updated["best_name"]]["auc"] < before - AUC_DROP_TOLERANCE:
+            return None
+        updated["incremental"] = inc
+        trained[target_col] = updated
+    return trained
+
+
+def _lineages(obj):
+    """Incremental state of a cached fit (one per target for ``train_all`` results)."""
+    if isinstance(obj, PredictionService):
+        return [getattr(obj, "lineage", None)]
+    return [summary.get("incremental") for summary in obj.values()]
+
+
+def stale_reason(lineages, n_new):
+    """Why ``n_new`` rows call for a full retrain rather than an update (``None`` if they don't)."""
+    for lineage in lineages:
+        if lineage is None:
+            return "no incremental state"
+        added = lineage["added_rows"] + n_new
+        if added > STALE_FRACTION * lineage["full_rows"]:
+            return f"{added:,} rows added since the last full retrain (over {STALE_FRACTION:.0%})"
+        if lineage["updates"] >= MAX_INCREMENTAL_UPDATES:
+            return f"{MAX_INCREMENTAL_UPDATES} incremental updates since the last full retrain"
+    return None
+
+
+def _rows_path(kind, key):
+    return _cache_path(kind, key).with_suffix(".rows.npy")
+
+
+def _find_base(kind, fingerprint, pkey, hashes, limit=8):
+    """
+    ``(cache path, delta mask)`` of the largest earlier fit (same kind and
+    hyperparameters) whose rows are all in ``hashes``.
+    """
+    own = _rows_path(kind, fingerprint + pkey)
+    suffix = own.name[len(fingerprint):]
+    candidates = []
+    for path in own.parent.glob(f"*{suffix}"):
+        if path == own or len(path.name) != len(own.name):
+            continue
+        try:
+            n = len(np.load(path, mmap_mode="r"))
+        except (OSError, ValueError):
+            continue
+        if n < len(hashes):
+            candidates.append((n, path))
+    for _, path in sorted(candidates, key=lambda c: c[0], reverse=True)[:limit]:
+        delta = delta_rows(np.load(path, mmap_mode="r"), hashes)
+        if delta is not None:
+            return path.with_name(path.name.replace(".rows.npy", ".joblib")), delta
+    return None
+
+
+def _fit_or_update(kind, fingerprint, pkey, df_ml, feature_cols, full, update):
+    """
+    ``update(base, delta)`` the largest earlier cached ``kind`` fit whose rows
+    ``df_ml`` extends, unless the staleness policy calls for ``full()``. The
+    result's ``"fit_reason"`` lineage entry says how and why its last fit ran.
+    """
+    hashes = row_hashes(df_ml[feature_cols + list(TARGETS)])
+    obj, reason = None, "no earlier fit whose rows this data extends"
+    found = _find_base(kind, fingerprint, pkey, hashes)
+    if found is not None:
+        base_path, delta = found
+        try:
+            base = joblib.load(base_path)
+        except Exception:
+            base = None
+        if base is not None:
+            reason = stale_reason(_lineages(base), int(delta.sum()))
+            if reason is None:
+                n_new = int(delta.sum())
+                with span(f"{kind} incremental update", rows=n_new):
+                    obj = update(base, delta) if n_new else base
+                if obj is None:
+                    reason = "update not possible (single-class rows or hold-out AUC dropped)"
+                elif n_new:
+                    for lineage in _lineages(obj):
+                        lineage.pop("full_reason", None)     # carried over from older caches
+                        lineage["fit_reason"] = f"incremental update with {n_new:,} new rows"
+    if obj is None:
+        obj = full()
+        for lineage in _lineages(obj):
+            lineage["fit_reason"] = f"full retrain: {reason}"
+    try:
+        path = _rows_path(kind, fingerprint + pkey)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        np.save(path, hashes)
+    except OSError:
+        pass
+    return obj
+
+
+def params_key(params):
+    """Short stable digest of a hyperparameter override dict ("" for none)."""
+    if not params:
+        return ""
+    blob = json.dumps(params, sort_keys=True, default=str).encode()
+    return "-p" + hashlib.blake2b(blob, digest_size=6).hexdigest()
+
+
+def _cache_path(kind, fingerprint):
+    return CACHE_DIR / kind / f"{fingerprint}-v{CACHE_VERSION}-sk{sklearn.__version__}.joblib"
+
+
+def persisted(kind):
+    """``kind`` cache files this version can load, newest first."""
+    pattern = _cache_path(kind, "*")
+    return sorted(pattern.parent.glob(pattern.name), key=lambda p: p.stat().st_mtime, reverse=True)
+
+
+def _disk_cached(kind, fingerprint, build):
+    """Load ``kind/fingerprint`` from ``CACHE_DIR`` or ``build()`` and persist it."""
+    path = _cache_path(kind, fingerprint)
+    with span(f"{kind} disk cache", cache="hit"):
+        if path.exists():
+            try:
+                return joblib.load(path)
+            except Exception:
+                pass  # corrupt or partial file — rebuild and overwrite
+
+        cache_miss()
+        obj = build()
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(f".{os.getpid()}.tmp")
+            joblib.dump(obj, tmp)
+            os.replace(tmp, path)
+        except OSError:
+            pass  # read-only deployments still get the in-process cache
+        return obj
+
+
+def load_or_train(df_ml, feature_cols, fingerprint=None, params=None, progress=None):
+    """
+    Return trained results for ``df_ml``, reusing the on-disk copy when one
+    exists for the same feature/target content and hyperparameters, or
+    updating an earlier fit when ``df_ml`` only adds rows to it.
+    ``progress`` is passed to ``train_all`` when a full retrain runs.
+    """
+    if fingerprint is None:
+        fingerprint = frame_fingerprint(df_ml[feature_cols + list(TARGETS)])
+    pkey = params_key(params)
+    return _disk_cached("models", fingerprint + pkey, lambda: _fit_or_update(
+        "models", fingerprint, pkey, df_ml, feature_cols,
+        full=lambda: train_all(df_ml, feature_cols, params=params, progress=progress),
+        update=lambda base, delta: update_trained(base, df_ml, feature_cols, delta)))
+
+
+# ============================================================
+# BACKGROUND TRAINING
+# ============================================================
+# The ML page trains through a queue of TRAINING_SLOTS threads (each fans its
+# fits out over the process pool) and polls the job's progress instead of
+# blocking the session. Jobs are keyed by dataset fingerprint and
+# hyperparameters, so every session asking for the same models joins one
+# job, and the last TRAINED_CACHE_ENTRIES finished jobs double as the
+# in-memory results cache in front of the disk cache.
+TRAINING_SLOTS = max(1, int(os.environ.get("KPA_TRAINING_SLOTS", "1")))
+TRAINED_CACHE_ENTRIES = 8
+
+
+class TrainingJob:
+    """``load_or_train`` for one dataset and hyperparameter set, run on the training queue."""
+
+    def __init__(self, key, df_ml, feature_cols, fingerprint, params):
+        self.key      = key
+        self.result   = None
+        self.error    = None
+        self.queued   = time.monotonic()
+        self.started  = None
+        self.finished = None
+        self.perf     = None            # kpa_perf summary of the finished job
+        self._lock     = threading.Lock()
+        self._progress = (0, None)
+        self._future = _training_pool().submit(self._run, df_ml, feature_cols, fingerprint, params)
+
+    def _run(self, df_ml, feature_cols, fingerprint, params):
+        self.started = time.monotonic()
+        # Spans only record inside a run, and this thread has none of its own
+        run = start_run("training", dataset=fingerprint)
+        try:
+            self.result = load_or_train(df_ml, feature_cols, fingerprint, params, self._update)
+        except Exception as e:           # surfaced through status() on the page
+            self.error = f"{type(e).__name__}: {e}"
+        finally:
+            self.perf = finish_run(run, error=self.error)
+            self.finished = time.monotonic()
+
+    def _update(self, done, total):
+        with self._lock:
+            self._progress = (done, total)
+
+    @property
+    def done(self):
+        return self.finished is not None
+
+    def wait(self, timeout=None):
+        """The trained results, or ``None`` if not ready within ``timeout`` seconds or failed."""
+        try:
+            self._future.result(timeout)
+        except TimeoutError:
+            return None
+        return self.result
+
+    def status(self):
+        """Snapshot for a progress readout."""
+        with self._lock:
+            done, total = self._progress
+        if self.error is not None:
+            state = "failed"
+        elif self.done:
+            state = "done"
+        else:
+            state = "running" if self.started is not None else "queued"
+        with _TRAINING_LOCK:
+            ahead = sum(not j.done and j.queued < self.queued for j in _TRAINING_JOBS.values())
+        return {"state": state, "done": done, "total": total, "queued_ahead": ahead,
+                "elapsed_s": time.monotonic() - self.started if self.started is not None else 0.0}
+
+
+_TRAINING_JOBS = OrderedDict()
+_TRAINING_LOCK = threading.Lock()
+_TRAINING_POOL = None
+
+
+def _training_pool():
+    global _TRAINING_POOL
+    if _TRAINING_POOL is None:
+        _TRAINING_POOL = ThreadPoolExecutor(max_workers=TRAINING_SLOTS, thread_name_prefix="kpa-train")
+    return _TRAINING_POOL
+
+
+def start_training(df_ml, feature_cols, fingerprint, params=None, retry=False):
+    """
+    The job for ``fingerprint`` and ``params``: a queued, running or finished
+    one is joined, a failed one is kept (so its error can be shown) unless
+    ``retry`` is set, and otherwise a new job is queued.
+    """
+    key = fingerprint + params_key(params)
+    with _TRAINING_LOCK:
+        job = _TRAINING_JOBS.get(key)
+        if job is None or (retry and job.error is not None):
+            job = _TRAINING_JOBS[key] = TrainingJob(key, df_ml, feature_cols, fingerprint, params)
+        _TRAINING_JOBS.move_to_end(key)
+        finished = [k for k, j in _TRAINING_JOBS.items() if j.done]
+        for k in finished[:-TRAINED_CACHE_ENTRIES]:
+            del _TRAINING_JOBS[k]
+        return job
+
+
+# ============================================================
+# PREDICTION SERVICE
+# ============================================================
+class PathContributions:
+    """
+    Path-based feature contributions for a fitted forest.
+
+    Walking a tree from the root to a leaf, every split moves the
+    positive-class probability from the parent node's value to the child's;
+    that change is credited to the parent's split feature. Summed over the
+    path and averaged over the trees, a prediction decomposes exactly into
+    ``bias`` (the trees' mean root probability) plus one contribution per
+    feature.
+
+    A leaf fixes its path, so each leaf's contribution row is computed once
+    up front and stored in a sparse ``(nodes, features)`` matrix. Explaining
+    a batch is then one ``apply`` per tree and one sparse product — about a
+    millisecond per forest for a single driver. The matrix grows with leaves
+    times the features on their paths: a few MB for the survey, hundreds of
+    MB for forests grown on tens of thousands of rows.
+    """
+
+    def __init__(self, forest, n_features):
+        self.pos = list(forest.classes_).index(1) if 1 in forest.classes_ else None
+        self.n_features = n_features
+        self.trees = [est.tree_ for est in forest.estimators_]
+        blocks, roots = zip(*map(self._tree_block, self.trees))
+        self.offsets = np.cumsum([0] + [t.node_count for t in self.trees[:-1]])
+        self.matrix = sparse.vstack(blocks, format="csr") / len(blocks)
+        self.bias = float(np.mean(roots))
+
+    def _tree_block(self, t):
+        """``(leaf contribution rows, root probability)`` for one tree."""
+        value = t.value[:, 0, :]
+        p = value[:, self.pos] / value.sum(axis=1) if self.pos is not None else np.zeros(t.node_count)
+        internal = np.flatnonzero(t.children_left >= 0)
+        # Cumulative contributions root -> node, one tree level at a time
+        contrib = np.zeros((t.node_count, self.n_features))
+        level = np.array([0])
+        while True:
+            parents = level[t.children_left[level] >= 0]
+            if not len(parents):
+                break
+            for children in (t.children_left[parents], t.children_right[parents]):
+                contrib[children] = contrib[parents]
+                contrib[children, t.feature[parents]] += p[children] - p[parents]
+            level = np.concatenate([t.children_left[parents], t.children_right[parents]])
+        contrib[internal] = 0                    # only leaves are looked up
+        return sparse.csr_matrix(contrib), p[0]
+
+    def extend(self, estimators):
+        """Add trees appended to the forest by a warm-start update."""
+        n_old = len(self.trees)
+        new = [est.tree_ for est in estimators]
+        blocks, roots = zip(*map(self._tree_block, new))
+        self.trees += new
+        n = len(self.trees)
+        self.offsets = np.cumsum([0] + [t.node_count for t in self.trees[:-1]])
+        self.matrix = sparse.vstack([self.matrix * (n_old / n), *(b / n for b in blocks)], format="csr")
+        self.bias = (self.bias * n_old + float(np.sum(roots))) / n
+
+    def __call__(self, X, leaves=None):
+        """
+        ``(n_samples, n_features)`` contributions for a C-contiguous float32
+        ``X``, or for its flat leaf ids (``FlatTrees.apply``) when given.
+        """
+        if leaves is None:
+            leaves = np.column_stack([t.apply(X) for t in self.trees]) + self.offsets
+        n, n_trees = leaves.shape
+        hits = sparse.csr_matrix((np.ones(leaves.size), leaves.ravel(),
+                                  np.arange(0, n * n_trees + 1, n_trees)),
+                                 shape=(n, self.matrix.shape[0]))
+        return (hits @ self.matrix).toarray()
+
+
+class PredictionService:
+    """
+    Congestion and wait-time forests fitted once on the full truck dataset.
+
+    The Predict page scores one driver at a time, so the service works on
+    plain float32 arrays and scores through flat-array copies of the forests
+    (``kpa_trees.FlatTrees``), skipping scikit-learn's per-call validation and
+    per-tree dispatch; probabilities are identical to ``predict_proba``.
+    Scoring latencies are recorded for the page's p50/p99 readout.
+    """
+
+    def __init__(self, feature_cols, models, lineage=None):
+        self.feature_cols = list(feature_cols)
+        self.models = models                    # {target: fitted forest}
+        self.lineage = lineage                  # rows since the last full fit (see stale_reason)
+        self._latencies = deque(maxlen=1000)
+        self._explainers = self._build_explainers()
+        self._flat = self._compile()
+
+    def _build_explainers(self):
+        with span("path contributions"):
+            return {t: PathContributions(m, len(self.feature_cols)) for t, m in self.models.items()}
+
+    def _compile(self):
+        with span("compile trees"):
+            return {t: FlatTrees.from_model(m) for t, m in self.models.items()}
+
+    def _flat_trees(self):
+        if getattr(self, "_flat", None) is None:        # pickled before flat-array scoring
+            self._flat = self._compile()
+        return self._flat
+
+    @classmethod
+    def fit(cls, df_ml, feature_cols, params=None):
+        """``params``: optional ``{target: forest overrides}`` from tuning."""
+        params = params or {}
+        model_df = df_ml[feature_cols + list(TARGETS)].dropna()
+        X_all = model_df[feature_cols].to_numpy(dtype=np.float64)
+        forest_cls, defaults = MODEL_SPECS["Random Forest"]
+        models = {}
+        for target_col in TARGETS:
+            rf = forest_cls(**{**defaults, **params.get(target_col, {})}, n_jobs=TRAIN_N_JOBS)
+            with span("service forest fit", target=target_col):
+                rf.fit(X_all, model_df[target_col].to_numpy())
+            models[target_col] = rf
+        return cls(feature_cols, models, {"full_rows": len(model_df), "added_rows": 0, "updates": 0})
+
+    def update(self, df_ml, delta):
+        """
+        Grow each forest (warm start) with trees fitted on the rows of
+        ``df_ml`` flagged in ``delta`` plus an equal-sized random sample of
+        the others. Returns ``self``, or ``None`` if a full refit is needed.
+        """
+        rng = np.random.default_rng(42 + self.lineage["updates"])
+        old_rows = np.flatnonzero(~delta)
+        added = 0
+        for target_col, forest in self.models.items():
+            cols = self.feature_cols + [target_col]
+            new = df_ml.loc[delta, cols].dropna()
+            if not len(new):
+                continue
+            replay = df_ml.iloc[rng.choice(old_rows, min(len(old_rows), len(new)), replace=False)][cols].dropna()
+            fit_df = pd.concat([new, replay])
+            if fit_df[target_col].nunique() < 2:
+                return None
+            n_trees = len(forest.estimators_)
+            with span("service forest update", target=target_col, rows=len(new)):
+                grow_ensemble(forest, fit_df[self.feature_cols].to_numpy(dtype=np.float64),
+                              fit_df[target_col].to_numpy(), len(new), len(old_rows),
+                              df_ml[target_col].dropna().to_numpy())
+                self._explainers[target_col].extend(forest.estimators_[n_trees:])
+                self._flat_trees()[target_col] = FlatTrees.from_model(forest)
+            added = max(added, len(new))
+        self.lineage = {**self.lineage, "added_rows": self.lineage["added_rows"] + added,
+                        "updates": self.lineage["updates"] + 1}
+        return self
+
+    def to_matrix(self, rows):
+        """Feature matrix in ``feature_cols`` order from a DataFrame or list of dicts."""
+        if not isinstance(rows, pd.DataFrame):
+            rows = pd.DataFrame(list(rows))
+        return np.ascontiguousarray(rows[self.feature_cols].to_numpy(dtype=np.float32))
+
+    def predict_proba(self, X, record=True):
+        """
+        Positive-class probability per target: ``{target: ndarray}``.
+        ``record=False`` keeps bulk calls out of the latency percentiles.
+        """
+        t0 = time.perf_counter()
+        out = {t: f.predict_proba(X) for t, f in self._flat_trees().items()}
+        if record:
+            self._latencies.append(time.perf_counter() - t0)
+        return out
+
+    def score_one(self, row):
+        """Probabilities for a single feature dict: ``{target: float}``."""
+        X = np.array([[row[c] for c in self.feature_cols]], dtype=np.float32)
+        return {t: float(p[0]) for t, p in self.predict_proba(X).items()}
+
+    def explain(self, X):
+        """
+        ``{target: (bias, contributions)}`` for a feature matrix from
+        ``to_matrix``; ``bias + contributions.sum(axis=1)`` equals the
+        positive-class probability.
+        """
+        if getattr(self, "_explainers", None) is None:   # pickled before explanations existed
+            self._explainers = self._build_explainers()
+        flat = self._flat_trees()
+        with span("explain", rows=len(X)):
+            return {t: (e.bias, e(X, flat[t].apply(X))) for t, e in self._explainers.items()}
+
+    def top_drivers(self, row, k=5):
+        """
+        The ``k`` features that moved a single feature dict's probabilities
+        most: ``{target: [(feature, contribution), ...]}`` by absolute size.
+        """
+        X = np.array([[row[c] for c in self.feature_cols]], dtype=np.float32)
+        drivers = {}
+        for t, (_, contrib) in self.explain(X).items():
+            order = np.argsort(-np.abs(contrib[0]), kind="stable")[:k]
+            drivers[t] = [(self.feature_cols[i], float(contrib[0, i])) for i in order
+                          if contrib[0, i] != 0]
+        return drivers
+
+    def latency_ms(self):
+        """``(p50, p99, n)`` of recorded scoring calls in milliseconds."""
+        if not self._latencies:
+            return 0.0, 0.0, 0
+        lat = np.fromiter(self._latencies, dtype=np.float64) * 1000
+        return float(np.percentile(lat, 50)), float(np.percentile(lat, 99)), len(lat)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_latencies"] = deque(maxlen=1000)
+        return state
+
+
+def score_batches(service, chunks, id_col=None):
+    """
+    Score an iterable of raw roster chunks through ``service``.
+
+    Yields one result frame per chunk with the congestion/wait probabilities,
+    the 0/1 predictions and the overall risk score (0–100) shown on the
+    Predict page. Rows whose answers fall outside the survey vocabulary get
+    NaN scores rather than aborting the whole batch.
+    """
+    row_offset = 0
+    for chunk in chunks:
+        enc = encode_features(chunk)
+        valid = enc.notna().all(axis=1).to_numpy()
+        out = pd.DataFrame(index=range(row_offset, row_offset + len(chunk)))
+        out.index.name = "row"
+        if id_col is not None:
+            out[id_col] = chunk[id_col].to_numpy()
+
+        probs = {t: np.full(len(chunk), np.nan) for t in TARGETS}
+        if valid.any():
+            X = np.ascontiguousarray(enc.to_numpy(dtype=np.float32)[valid])
+            for t, p in service.predict_proba(X, record=False).items():
+                probs[t][valid] = p
+
+        cong, wait = probs["high_congestion"], probs["long_wait"]
+        out["congestion_prob"] = cong.round(4)
+        out["wait_prob"]       = wait.round(4)
+        out["high_congestion_risk"] = pd.array(np.where(valid, cong > 0.5, pd.NA), dtype="Int8")
+        out["long_wait_risk"]       = pd.array(np.where(valid, wait > 0.5, pd.NA), dtype="Int8")
+        out["risk_score"]      = ((cong + wait) / 2 * 100).round(1)
+        row_offset += len(chunk)
+        yield out
+
+
+def load_or_fit_service(df_ml, feature_cols, fingerprint=None, params=None):
+    """Prediction service for ``df_ml``, reusing the on-disk copy when present."""
+    if fingerprint is None:
+        fingerprint = frame_fingerprint(df_ml[feature_cols + list(TARGETS)])
+    pkey = params_key(params)
+    return _disk_cached("service", fingerprint + pkey, lambda: _fit_or_update(
+        "service", fingerprint, pkey, df_ml, feature_cols,
+        full=lambda: PredictionService.fit(df_ml, feature_cols, params),
+        update=lambda base, delta: base.update(df_ml, delta)))
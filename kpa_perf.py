@@ -0,0 +1,207 @@
+"""
+KPA Traffic Analytics — performance instrumentation
+====================================================
+Lightweight spans around the hot paths (loaders, feature prep, model fits,
+chart builds) that record wall time, peak Python memory and cache hit/miss
+for the current dashboard rerun.
+
+    run = start_run("Executive Dashboard")
+    with span("load_upload", cache="hit"):
+        ...                           # cache_miss() inside flips it to "miss"
+    finish_run(run)                   # one JSON log line on "kpa.perf"
+
+Spans opened outside a run (CLI report, benchmarks, pool workers) cost one
+attribute lookup and record nothing. Peak memory comes from ``tracemalloc``
+and is only measured while tracing is on (``set_memory_tracing(True)`` or
+``KPA_PERF_MEMORY=1``), since tracing slows allocation-heavy code.
+
+Log lines go to stderr by default; set ``KPA_PERF_LOG`` to a file path to
+append them there instead, or to ``off`` to disable them.
+"""
+
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from functools import wraps
+
+try:
+    import resource
+except ImportError:       # Windows
+    resource = None
+
+PERF_LOG = os.environ.get("KPA_PERF_LOG", "stderr")
+
+logger = logging.getLogger("kpa.perf")
+logger.propagate = False
+if PERF_LOG.lower() != "off":
+    _handler = (logging.StreamHandler(sys.stderr) if PERF_LOG.lower() == "stderr"
+                else logging.FileHandler(PERF_LOG))
+    _handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(_handler)
+    logger.setLevel(logging.INFO)
+
+_local = threading.local()
+
+
+def _rss_peak_mb():
+    """Process resident-set high-water mark in MB (``None`` where unsupported)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1 << 20 if sys.platform == "darwin" else 1 << 10), 1)
+
+
+def set_memory_tracing(on):
+    """Start or stop ``tracemalloc`` (per-span peak memory)."""
+    if on and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    elif not on and tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+
+if os.environ.get("KPA_PERF_MEMORY") == "1":
+    set_memory_tracing(True)
+
+
+# ============================================================
+# RUNS & SPANS
+# ============================================================
+class Run:
+    """Spans recorded during one script rerun (or fragment rerun)."""
+
+    def __init__(self, label, **fields):
+        self.label   = label
+        self.fields  = fields
+        self.spans   = []
+        self.stack   = []
+        self.t0      = time.perf_counter()
+        self.seconds = None
+
+    def summary(self):
+        """The log record: run totals plus one entry per span, in start order."""
+        return {
+            "event"       : "rerun",
+            "label"       : self.label,
+            **self.fields,
+            "ts"          : round(time.time(), 3),
+            "wall_ms"     : round((self.seconds or time.perf_counter() - self.t0) * 1000, 2),
+            "rss_peak_mb" : _rss_peak_mb(),
+            "cache_hits"  : sum(s["cache"] == "hit" for s in self.spans),
+            "cache_misses": sum(s["cache"] == "miss" for s in self.spans),
+            "spans"       : self.spans,
+        }
+
+
+class _Span:
+    __slots__ = ("run", "record", "t0", "base", "peak")
+
+    def __init__(self, run, name, depth, cache, fields):
+        self.run = run
+        self.record = {"name": name, "depth": depth, "ms": None, "peak_mb": None,
+                       "cache": cache, **fields}
+
+
+def current_run():
+    return getattr(_local, "run", None)
+
+
+def start_run(label, **fields):
+    """
+    Begin collecting spans for this thread. Callers end the run with
+    ``finish_run`` in a ``finally``; one left open anyway is logged first.
+    """
+    stale = current_run()
+    if stale is not None:
+        finish_run(stale, complete=False)
+    _local.run = Run(label, **fields)
+    return _local.run
+
+
+def finish_run(run, **fields):
+    """Stop collecting, log the run as one JSON line and return its summary."""
+    if current_run() is run:
+        _local.run = None
+    run.seconds = time.perf_counter() - run.t0
+    summary = run.summary()
+    summary.update(fields)
+    logger.info(json.dumps(summary, default=str))
+    return summary
+
+
+class span:
+    """
+    Context manager (and decorator) timing a block within the current run.
+
+    ``cache="hit"`` marks a cached lookup; ``cache_miss()`` called inside the
+    block (typically from the cached function's body) flips it to ``"miss"``.
+    """
+
+    def __init__(self, name, cache=None, **fields):
+        self.name, self.cache, self.fields = name, cache, fields
+        self._span = None
+
+    def __enter__(self):
+        run = current_run()
+        if run is None:
+            return self
+        s = _Span(run, self.name, len(run.stack), self.cache, self.fields)
+        if tracemalloc.is_tracing():
+            cur, peak = tracemalloc.get_traced_memory()
+            if run.stack:
+                parent = run.stack[-1]
+                parent.peak = max(parent.peak, peak)
+            tracemalloc.reset_peak()
+            s.base = s.peak = cur
+        else:
+            s.base = None
+        run.spans.append(s.record)
+        run.stack.append(s)
+        self._span = s
+        s.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        s, self._span = self._span, None
+        if s is None:
+            return False
+        s.record["ms"] = round((time.perf_counter() - s.t0) * 1000, 3)
+        run = s.run
+        if s.base is not None and tracemalloc.is_tracing():
+            s.peak = max(s.peak, tracemalloc.get_traced_memory()[1])
+            s.record["peak_mb"] = round((s.peak - s.base) / 1e6, 3)
+            if len(run.stack) > 1:
+                run.stack[-2].peak = max(run.stack[-2].peak, s.peak)
+        if run.stack and run.stack[-1] is s:
+            run.stack.pop()
+        return False
+
+    def __call__(self, fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(self.name, self.cache, **self.fields):
+                return fn(*args, **kwargs)
+        return wrapper
+
+
+def cache_miss():
+    """Mark the innermost open span that tracks a cache as a miss."""
+    run = current_run()
+    if run is None:
+        return
+    for s in reversed(run.stack):
+        if s.record["cache"] is not None:
+            s.record["cache"] = "miss"
+            return
+
+
+def record(name, seconds, cache=None, **fields):
+    """Add an already-timed step (e.g. a pool job) to the current run."""
+    run = current_run()
+    if run is None:
+        return
+    run.spans.append({"name": name, "depth": len(run.stack), "ms": round(seconds * 1000, 3),
+                      "peak_mb": None, "cache": cache, **fields})
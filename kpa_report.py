@@ -0,0 +1,171 @@
+"""
+KPA Traffic Analytics — headless report
+========================================
+Renders every dashboard page's figures to a static HTML bundle (plus one PNG
+per figure when ``kaleido`` is installed) without a Streamlit server.
+
+    python kpa_report.py COMBINED_DATASETS.csv -o report/ [--png] [--workers N]
+
+Pages are built and exported in parallel worker processes. Trained models
+and the parsed upload come from the same on-disk caches the app uses, so a
+dataset already opened in the dashboard renders without retraining; models
+use the dataset's tuned hyperparameters when a search has been saved.
+"""
+
+import argparse
+import html
+import importlib.util
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+
+import kpa_charts as charts
+from kpa_data import DatasetArtifacts, load_csv, spawn_safe_main
+from kpa_gatelog import GATE_LOG_DIR, GateLogAggregates
+from kpa_ml import TARGETS, load_or_train
+from kpa_tune import best_params, load_tuned
+
+REPORT_WORKERS = int(os.environ.get("KPA_REPORT_WORKERS", os.cpu_count() or 1))
+
+REPORT_CSS = """
+body   { font-family: system-ui, sans-serif; margin: 0 auto; max-width: 1200px; padding: 1rem 2rem; color: #222; }
+header { background: linear-gradient(135deg, #003087 0%, #0056b3 100%); color: white;
+         border-radius: 12px; padding: 1.2rem 2rem; text-align: center; }
+h2     { color: #003087; border-bottom: 2px solid #003087; padding-bottom: 6px; margin-top: 2.5rem; }
+h3     { color: #003087; font-size: 1rem; margin: 1.5rem 0 0.3rem; }
+nav a  { margin-right: 1rem; color: #0056b3; }
+table  { border-collapse: collapse; font-size: 0.85rem; }
+td, th { border: 1px solid #ddd; padding: 4px 8px; text-align: left; }
+.note  { background: #f0f6ff; border-left: 4px solid #003087; padding: 0.6rem 1rem; border-radius: 6px; }
+"""
+
+
+def load_dataset(path):
+    """Parse (or fetch from the columnar cache) a combined survey CSV."""
+    return load_csv(Path(path).read_bytes())
+
+
+def _model_summary(summary):
+    """The parts of a ``train_all`` entry the ML charts read (no fitted models)."""
+    return {
+        "models"     : {name: {k: r[k] for k in ("acc", "cv_mean", "auc")}
+                        for name, r in summary["models"].items()},
+        "cm"         : summary["cm"],
+        "importances": summary["importances"],
+    }
+
+
+def page_tasks(artifacts, trained, gate_logs):
+    """``(slug, heading, builder, args)`` per report section, in page order."""
+    survey = artifacts.cube
+    df_ml, feature_cols = artifacts.ml
+    tasks = [
+        ("executive",    "📊 Executive Dashboard", "executive_figures",    (artifacts.trucks, gate_logs)),
+        ("demographics", "👥 Demographics",        "demographics_figures", (survey,)),
+        ("traffic",      "🚦 Traffic Patterns",    "traffic_figures",      (survey, gate_logs)),
+        ("causes",       "⚠️ Congestion Causes",   "causes_figures",       (survey,)),
+    ]
+    for target_col, target_label in TARGETS.items():
+        tasks.append((f"models-{target_col}", f"🤖 ML Models — {target_label}", "model_figures",
+                      (_model_summary(trained[target_col]), feature_cols, target_label)))
+    tasks.append(("recommendations", "📋 Recommendations", "recommendations_figures",
+                  (pd.DataFrame(charts.RECOMMENDATIONS),)))
+    return tasks
+
+
+def _write_bundle(out_dir, sections, title):
+    from plotly.offline import get_plotlyjs
+
+    nav = " ".join(f'<a href="#{slug}">{html.escape(heading)}</a>' for slug, heading, _ in sections)
+    body = []
+    for slug, heading, rendered in sections:
+        body.append(f'<h2 id="{slug}">{html.escape(heading)}</h2>')
+        if slug == "recommendations":
+            table = pd.DataFrame(charts.RECOMMENDATIONS).to_html(index=False, border=0)
+            body.append(table)
+        for _, fig_title, div, _ in rendered:
+            body.append(f"<h3>{html.escape(fig_title)}</h3>\n{div}")
+    body.append('<p class="note">🔍 <b>Predict for New Driver</b> is interactive and scores one '
+                'profile at a time; open the dashboard to use it.</p>')
+
+    page = f"""<!DOCTYPE html>
+<html lang="en"><head><meta charset="utf-8"><title>{html.escape(title)}</title>
+<style>{REPORT_CSS}</style>
+<script type="text/javascript">{get_plotlyjs()}</script></head>
+<body>
+<header><h1>KPA Vehicle Traffic &amp; Congestion Analytics</h1>
+<p>{html.escape(title)}</p></header>
+<nav>{nav}</nav>
+{chr(10).join(body)}
+</body></html>"""
+    index = out_dir / "index.html"
+    index.write_text(page, encoding="utf-8")
+    return index
+
+
+def render_report(dataset_path, out_dir, png=False, workers=None):
+    """Render the report for ``dataset_path`` into ``out_dir``; returns the index path."""
+    if png and importlib.util.find_spec("kaleido") is None:
+        raise RuntimeError("PNG export needs the optional 'kaleido' package (pip install kaleido)")
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    workers = workers or REPORT_WORKERS
+
+    key, df = load_dataset(dataset_path)
+    artifacts = DatasetArtifacts(key, df)
+    df_ml, feature_cols = artifacts.ml
+    trained = load_or_train(df_ml, feature_cols, artifacts.ml_fingerprint,
+                            best_params(load_tuned(artifacts.ml_fingerprint)))
+    gate_logs = GateLogAggregates.load()
+    if GATE_LOG_DIR:
+        gate_logs.ingest_dir(GATE_LOG_DIR)
+
+    tasks = page_tasks(artifacts, trained, gate_logs)
+    builders = [builder for _, _, builder, _ in tasks]
+    args = [a for _, _, _, a in tasks]
+    pngs = [png] * len(tasks)
+    if workers <= 1:
+        rendered = list(map(charts.export_figures, builders, args, pngs))
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks)),
+                                 mp_context=multiprocessing.get_context("spawn")) as pool:
+            with spawn_safe_main():
+                pending = pool.map(charts.export_figures, builders, args, pngs)
+            rendered = list(pending)
+    sections = [(slug, heading, r) for (slug, heading, _, _), r in zip(tasks, rendered)]
+
+    if png:
+        png_dir = out_dir / "png"
+        png_dir.mkdir(exist_ok=True)
+        for slug, _, rendered in sections:
+            for key, _, _, image in rendered:
+                (png_dir / f"{slug}-{key}.png").write_bytes(image)
+
+    title = f"Report generated {time.strftime('%Y-%m-%d %H:%M')} from {Path(dataset_path).name}"
+    return _write_bundle(out_dir, sections, title)
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("dataset", help="combined survey CSV (COMBINED_DATASETS.csv)")
+    ap.add_argument("-o", "--out", default="report", help="output directory (default: report/)")
+    ap.add_argument("--png", action="store_true", help="also export one PNG per figure (needs kaleido)")
+    ap.add_argument("--workers", type=int, default=None,
+                    help=f"worker processes (default: KPA_REPORT_WORKERS or {REPORT_WORKERS})")
+    args = ap.parse_args()
+
+    t0 = time.perf_counter()
+    try:
+        index = render_report(args.dataset, args.out, png=args.png, workers=args.workers)
+    except RuntimeError as e:
+        sys.exit(str(e))
+    print(f"Wrote {index} in {time.perf_counter() - t0:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
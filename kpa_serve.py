@@ -0,0 +1,338 @@
+"""
+KPA Traffic Analytics — HTTP scoring service
+=============================================
+Serves the Predict page's congestion/wait forests to other systems (the
+gate booking system calls it once per truck arrival) without Streamlit:
+
+    python kpa_serve.py --dataset COMBINED_DATASETS.csv   # load (or fit) the dataset's forests
+    python kpa_serve.py --model .kpa_cache/service/<file>.joblib
+    python kpa_serve.py                                   # newest persisted forests
+
+    POST /score  {"Nationality": "Kenya", "Gender": "Male", "Yearsexperience": "1-5 years",
+                  "Visitfrequency": "Daily", "Gate18": "Selected", "Afternoon": "Selected"}
+    -> {"congestion_prob": 0.7133, "wait_prob": 0.64, "high_congestion_risk": 1,
+        "long_wait_risk": 1, "risk_score": 67.7}
+
+A record is either survey answers in the upload vocabulary, encoded with
+the maps ``prepare_ml_features`` uses for training rows (``encode_records``;
+options left out count as not selected; ``true``/``1`` mark one selected), or ``{"features": {...}}`` with
+the encoded feature dict the Predict page scores (its ``input_vec``).
+``{"records": [...]}`` scores several records in one request.
+
+Requests are not scored one at a time: connection handlers queue their
+records and a batcher task on the same event loop scores whatever has
+accumulated — up to ``MAX_BATCH`` records, waiting at most ``MAX_WAIT_MS``
+for more — in a single vectorised ``predict_proba``, so throughput grows
+with concurrency instead of collapsing under it. ``GET /health`` reports the model and batch sizes.
+"""
+
+import asyncio
+import json
+import os
+
+import numpy as np
+
+from kpa_data import ROSTER_REQUIRED, encode_records
+
+MAX_BATCH   = int(os.environ.get("KPA_SERVE_MAX_BATCH", "256"))
+MAX_WAIT_MS = float(os.environ.get("KPA_SERVE_MAX_WAIT_MS", "0"))
+REQUEST_TIMEOUT_S = 30
+
+
+# ============================================================
+# MODEL
+# ============================================================
+def load_service(model=None, dataset=None):
+    """
+    ``(PredictionService, description)`` from a persisted service file, from
+    a combined CSV (the forests the dashboard would use for it, fitted and
+    persisted if not cached yet), or from the newest persisted service.
+    """
+    import joblib
+    from kpa_ml import load_or_fit_service, persisted
+
+    if dataset is not None:
+        from pathlib import Path
+        from kpa_data import DatasetArtifacts, load_csv
+        from kpa_tune import forest_params, load_tuned
+        key, df = load_csv(Path(dataset).read_bytes())
+        artifacts = DatasetArtifacts(key, df)
+        df_ml, feature_cols = artifacts.ml
+        fp = artifacts.ml_fingerprint
+        service = load_or_fit_service(df_ml, feature_cols, fp, forest_params(load_tuned(fp)))
+        return service, f"{os.path.basename(dataset)} ({fp[:12]})"
+    if model is None:
+        paths = persisted("service")
+        if not paths:
+            raise SystemExit("no persisted prediction service in the cache; pass --dataset or --model")
+        model = paths[0]
+    return joblib.load(model), os.path.basename(model)
+
+
+class Scorer:
+    """Request records -> Predict-page outputs, a batch at a time."""
+
+    def __init__(self, service):
+        self.service = service
+        self.feature_cols = service.feature_cols
+
+    def parse(self, record):
+        """``(kind, payload)`` for one request record; ``ValueError`` explains a bad one."""
+        if not isinstance(record, dict):
+            raise ValueError("each record must be a JSON object")
+        if "features" in record:
+            features = record["features"]
+            if not isinstance(features, dict):
+                raise ValueError('"features" must be an object of feature values')
+            missing = [c for c in self.feature_cols if c not in features]
+            if missing:
+                raise ValueError(f"missing feature(s): {', '.join(missing)}")
+            try:
+                return "features", [float(features[c]) for c in self.feature_cols]
+            except (TypeError, ValueError):
+                raise ValueError("features must be numbers") from None
+        missing = [c for c in ROSTER_REQUIRED if c not in record]
+        if missing:
+            raise ValueError(f"missing required answer(s): {', '.join(missing)}")
+        answers = {}
+        for c, v in record.items():
+            if isinstance(v, (int, float)) and not isinstance(v, bool):
+                # 1/0 for an option, as in the encoded features; other numbers mean nothing
+                if c in ROSTER_REQUIRED or v not in (0, 1):
+                    raise ValueError(f"answer {c!r} must be a survey label, not {v!r}")
+                v = bool(v)
+            elif not (v is None or isinstance(v, (str, bool))):
+                raise ValueError("answers must be strings, booleans, 0/1 or null")
+            answers[c] = v
+        return "answers", answers
+
+    def __call__(self, parsed):
+        """Scores for a list of ``parse`` results, in order."""
+        X = np.empty((len(parsed), len(self.feature_cols)), dtype=np.float32)
+        answers = []
+        for i, (kind, payload) in enumerate(parsed):
+            if kind == "features":
+                X[i] = payload
+            else:
+                answers.append(i)
+        if answers:
+            X[answers] = encode_records([parsed[i][1] for i in answers], self.feature_cols)
+
+        valid = ~np.isnan(X).any(axis=1)
+        probs = self.service.predict_proba(np.ascontiguousarray(X[valid]), record=False)
+        cong, wait = iter(probs["high_congestion"].tolist()), iter(probs["long_wait"].tolist())
+        results = []
+        for ok in valid:
+            if not ok:
+                results.append({"error": "answer outside the survey vocabulary"})
+                continue
+            c, w = next(cong), next(wait)
+            results.append({"congestion_prob": round(c, 4), "wait_prob": round(w, 4),
+                            "high_congestion_risk": int(c > 0.5), "long_wait_risk": int(w > 0.5),
+                            "risk_score": round((c + w) / 2 * 100, 1)})
+        return results
+
+
+# ============================================================
+# MICRO-BATCHING
+# ============================================================
+class MicroBatcher:
+    """
+    Coalesces records submitted by concurrent requests into batches for
+    ``score`` (a list of records -> a list of results, in order).
+
+    Runs as a task on the server's event loop. After the first queued
+    request it yields to the loop once, so every request that arrived in
+    the same poll joins the batch, then waits up to ``max_wait_ms`` for
+    more while the batch is below ``max_batch``. Scoring runs on the loop
+    itself: requests arriving meanwhile buffer in their sockets and make up
+    the next batch, so batches grow with load without any waiting.
+    """
+
+    def __init__(self, score, max_batch=MAX_BATCH, max_wait_ms=MAX_WAIT_MS):
+        self.score     = score
+        self.max_batch = max_batch
+        self.max_wait  = max_wait_ms / 1000
+        self.batches   = 0
+        self.records   = 0
+        self.largest   = 0
+        self._queue = asyncio.Queue()
+
+    async def submit(self, records):
+        """Results for ``records`` (a list), once their batch is scored."""
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((records, future))
+        return await future
+
+    async def _collect(self):
+        items = [await self._queue.get()]
+        n = len(items[0][0])
+        await asyncio.sleep(0)
+        deadline = asyncio.get_running_loop().time() + self.max_wait
+        while n < self.max_batch:
+            if self._queue.empty():
+                timeout = deadline - asyncio.get_running_loop().time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+            else:
+                item = self._queue.get_nowait()
+            items.append(item)
+            n += len(item[0])
+        return items, n
+
+    async def run(self):
+        while True:
+            items, n = await self._collect()
+            try:
+                results = self.score([r for records, _ in items for r in records])
+            except Exception as e:       # fail this batch's requests, keep serving
+                for _, future in items:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            start = 0
+            for records, future in items:
+                if not future.done():    # its client may have gone
+                    future.set_result(results[start:start + len(records)])
+                start += len(records)
+            self.batches += 1
+            self.records += n
+            self.largest = max(self.largest, n)
+
+    def stats(self):
+        return {"batches": self.batches, "records": self.records, "largest_batch": self.largest,
+                "mean_batch": round(self.records / self.batches, 2) if self.batches else 0.0}
+
+
+# ============================================================
+# HTTP
+# ============================================================
+# A minimal HTTP/1.1 server on asyncio streams: keep-alive connections,
+# Content-Length bodies, JSON in and out. One event loop serves every
+# connection, so concurrent requests cost no thread switches and reach the
+# batcher together.
+STATUS_TEXT = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+               413: "Payload Too Large", 422: "Unprocessable Entity", 500: "Internal Server Error",
+               501: "Not Implemented"}
+MAX_BODY_BYTES = 1 << 20
+
+
+class ScoringServer:
+    """``POST /score`` and ``GET /health`` over one asyncio event loop."""
+
+    def __init__(self, service, description="", max_batch=MAX_BATCH, max_wait_ms=MAX_WAIT_MS):
+        self.description = description
+        self.scorer = Scorer(service)
+        self.max_batch, self.max_wait_ms = max_batch, max_wait_ms
+        self.batcher = None
+
+    async def score(self, body):
+        """``(status, response)`` for a ``/score`` request body."""
+        try:
+            payload = json.loads(body)
+            many = isinstance(payload, dict) and "records" in payload
+            records = payload["records"] if many else [payload]
+            if not isinstance(records, list):
+                raise ValueError('"records" must be a list')
+            parsed = [self.scorer.parse(r) for r in records]
+        except ValueError as e:          # includes malformed JSON
+            return 400, {"error": str(e)}
+        try:
+            results = await asyncio.wait_for(self.batcher.submit(parsed), REQUEST_TIMEOUT_S)
+        except Exception as e:
+            return 500, {"error": f"{type(e).__name__}: {e}"}
+        if many:
+            return 200, {"results": results}
+        return (422 if "error" in results[0] else 200), results[0]
+
+    def health(self):
+        return {"status": "ok", "model": self.description, "features": self.scorer.feature_cols,
+                "lineage": getattr(self.scorer.service, "lineage", None), **self.batcher.stats()}
+
+    async def respond(self, method, path, body):
+        if path == "/score":
+            return await self.score(body) if method == "POST" else (405, {"error": "use POST"})
+        if path == "/health":
+            return (200, self.health()) if method == "GET" else (405, {"error": "use GET"})
+        return 404, {"error": f"unknown path {path}"}
+
+    async def handle(self, reader, writer):
+        """One client connection: requests in order until it closes."""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                method, path, _ = request_line.decode("latin-1").split(" ", 2)
+                headers = {}
+                while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                length = int(headers.get("content-length", 0))
+                if "transfer-encoding" in headers:
+                    status, response = 501, {"error": "send a Content-Length body"}
+                elif length > MAX_BODY_BYTES:
+                    status, response = 413, {"error": f"body over {MAX_BODY_BYTES:,} bytes"}
+                else:
+                    body = await reader.readexactly(length)
+                    try:
+                        status, response = await self.respond(method, path.split("?")[0], body)
+                    except Exception as e:   # a bug, not a bad request: answer instead of hanging up
+                        status, response = 500, {"error": f"{type(e).__name__}: {e}"}
+                close = status in (413, 501) or headers.get("connection", "").lower() == "close"
+                data = json.dumps(response).encode()
+                writer.write(f"HTTP/1.1 {status} {STATUS_TEXT[status]}\r\n"
+                             f"Content-Type: application/json\r\nContent-Length: {len(data)}\r\n"
+                             f"{'Connection: close' if close else 'Keep-Alive: timeout=60'}\r\n\r\n"
+                             .encode() + data)
+                await writer.drain()
+                if close:
+                    break
+        except (ValueError, asyncio.IncompleteReadError, ConnectionError):
+            pass                         # malformed request or client gone: drop the connection
+        finally:
+            writer.close()
+
+    async def serve(self, host, port, started=None):
+        """Serve until cancelled; ``started(port)`` is called once listening."""
+        self.batcher = MicroBatcher(self.scorer, self.max_batch, self.max_wait_ms)
+        batching = asyncio.create_task(self.batcher.run())
+        server = await asyncio.start_server(self.handle, host, port, backlog=1024)
+        if started is not None:
+            started(server.sockets[0].getsockname()[1])
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            batching.cancel()
+
+
+def main():
+    import argparse
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--dataset", help="combined survey CSV whose forests to serve")
+    ap.add_argument("--model", help="persisted prediction service (.joblib)")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--max-batch", type=int, default=MAX_BATCH, help="records per scoring call")
+    ap.add_argument("--max-wait-ms", type=float, default=MAX_WAIT_MS,
+                    help="longest a request waits for a batch to fill")
+    args = ap.parse_args()
+
+    service, description = load_service(args.model, args.dataset)
+    server = ScoringServer(service, description, args.max_batch, args.max_wait_ms)
+    started = lambda port: print(f"Serving {description} on http://{args.host}:{port} "
+                                 f"(batches up to {args.max_batch}, {args.max_wait_ms:g} ms wait)",
+                                 flush=True)
+    try:
+        asyncio.run(server.serve(args.host, args.port, started))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+KPA Traffic Analytics — flat-array tree inference
+==================================================
+Fitted scikit-learn tree models (the Predict page's forests, the ML page's
+depth-6 decision tree) exported to contiguous NumPy arrays and scored by a
+vectorised traversal: every tree steps one level per iteration for every
+row at once, so a single driver costs one pass of array operations per tree
+level instead of one validated ``predict_proba`` call per tree. Blocks of
+more than ``VECTOR_ROWS`` rows walk the trees one at a time with each tree's
+compiled ``apply`` (the C traversal scikit-learn itself uses) and read the
+leaf values from the flat arrays; past a few dozen rows NumPy's random
+gathers cannot keep up with it.
+
+    flat = FlatTrees.from_model(forest)
+    flat.predict_proba(X)        # == forest.predict_proba(X)[:, 1], bit for bit
+
+Agreement is exact, not approximate: splits compare the float32 input with
+the float64 threshold as scikit-learn does, missing values follow each
+node's ``missing_go_to_left``, and leaf probabilities are summed tree by tree
+in estimator order before the one division by the tree count.
+"""
+
+import numpy as np
+
+# Largest block scored by the level-by-level NumPy traversal (measured
+# crossover with per-tree ``apply`` on a 150-tree forest: 16-64 rows)
+VECTOR_ROWS = 32
+
+
+class FlatTrees:
+    """
+    Every node of a tree ensemble in flat arrays, trees laid out one after
+    another (node ``j`` of tree ``i`` is ``offsets[i] + j``, the numbering
+    ``PathContributions`` uses). Children are interleaved — ``children[2k]``
+    is node ``k``'s left child, ``children[2k + 1]`` its right — and leaves
+    point to themselves, so a row that reaches a shallow leaf stays there
+    while deeper trees keep descending.
+    """
+
+    def __init__(self, trees, column=1, average=True):
+        sizes = [t.node_count for t in trees]
+        self.trees     = trees
+        self.offsets   = np.cumsum([0] + sizes[:-1]).astype(np.intp)
+        self.n_trees   = len(trees)
+        self.average   = average
+        self.depth     = max(t.max_depth for t in trees)
+        self.feature   = np.concatenate([t.feature for t in trees]).astype(np.intp)
+        self.threshold = np.concatenate([t.threshold for t in trees])
+        self.value     = np.ascontiguousarray(np.concatenate([t.value[:, 0, column] for t in trees]))
+        self.missing_left = np.concatenate([t.missing_go_to_left for t in trees]).astype(bool)
+
+        nodes = np.arange(sum(sizes), dtype=np.intp)
+        left  = np.concatenate([np.where(t.children_left >= 0, t.children_left + o, -1)
+                                for t, o in zip(trees, self.offsets)])
+        right = np.concatenate([np.where(t.children_right >= 0, t.children_right + o, -1)
+                                for t, o in zip(trees, self.offsets)])
+        leaf = left < 0
+        self.feature[leaf] = 0
+        self.children = np.empty(2 * len(nodes), dtype=np.intp)
+        self.children[0::2] = np.where(leaf, nodes, left)
+        self.children[1::2] = np.where(leaf, nodes, right)
+
+    @classmethod
+    def from_model(cls, model, column=1):
+        """
+        Flat copy of a fitted forest or single decision tree scoring
+        ``predict_proba(X)[:, column]``.
+        """
+        estimators = getattr(model, "estimators_", None)
+        if estimators is None:
+            return cls([model.tree_], column, average=False)
+        return cls([est.tree_ for est in estimators], column)
+
+    @property
+    def nbytes(self):
+        return sum(a.nbytes for a in (self.offsets, self.feature, self.threshold,
+                                      self.value, self.missing_left, self.children))
+
+    def _descend(self, X):
+        """Leaf ids for a few rows, all trees stepped together: ``(rows, trees)``."""
+        n, n_features = X.shape
+        cells = X.ravel()
+        base = (np.arange(n, dtype=np.intp) * n_features)[:, None]
+        node = np.repeat(self.offsets[None, :], n, axis=0)
+        missing = np.isnan(cells).any()
+        for _ in range(self.depth):
+            x = cells[base + self.feature[node]]
+            right = x > self.threshold[node]
+            if missing:
+                right |= np.isnan(x) & ~self.missing_left[node]
+            node = self.children[2 * node + right]
+        return node
+
+    def apply(self, X):
+        """Leaf node ids, ``(n_samples, n_trees)``, in the flat numbering."""
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        if len(X) <= VECTOR_ROWS:
+            return self._descend(X)
+        return np.column_stack([t.apply(X) for t in self.trees]) + self.offsets
+
+    def predict_proba(self, X):
+        """Probability of the exported class column for each row of ``X``."""
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        if len(X) <= VECTOR_ROWS:
+            # accumulate, unlike sum, adds strictly in tree order
+            out = np.add.accumulate(self.value[self._descend(X)], axis=1)[:, -1]
+        else:
+            out = np.zeros(len(X), dtype=np.float64)
+            for t, offset in zip(self.trees, self.offsets):
+                out += self.value[t.apply(X) + offset]
+        if self.average:
+            out /= self.n_trees
+        return out
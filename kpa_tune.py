@@ -0,0 +1,410 @@
+"""
+KPA Traffic Analytics — hyperparameter search
+==============================================
+Optional tuning for the four model families on the ML page. Each
+(target, family) pair runs its own successive-halving bracket: a sample of
+configurations from ``SEARCH_SPACES`` (plus the ``MODEL_SPECS`` defaults) is
+scored by cross-validated ROC-AUC on a slice of the training split, the best
+third moves on to a slice three times larger, and so on until the survivors
+are scored on the whole training split. Gradient boosting stops adding trees
+early once its validation loss stalls.
+
+Trials from every bracket fan out over the same spawn process pool as
+``kpa_ml.train_all`` and the search stops at a wall-clock budget, keeping the
+best configuration of the last round each bracket finished. The hold-out
+test split the ML page reports on is never seen by the search.
+
+Results are persisted per feature-frame fingerprint under
+``CACHE_DIR/tuning``; the ML page, the Predict page and ``kpa_report`` read
+them back with ``load_tuned`` instead of searching again.
+
+    python kpa_tune.py COMBINED_DATASETS.csv --budget 300
+
+Nothing in here depends on Streamlit, and scikit-learn is only imported once
+a search starts, so reading persisted results stays cheap.
+"""
+
+import json
+import math
+import multiprocessing
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from functools import lru_cache
+
+import numpy as np
+
+from kpa_data import CACHE_DIR, spawn_safe_main
+
+TUNING_DIR = CACHE_DIR / "tuning"
+
+DEFAULT_BUDGET_S = 120
+ETA = 3                     # keep the best 1/ETA of each round, ETA x the rows next round
+SEARCH_CANDIDATES = 27      # configurations per bracket (fewer when the grid is smaller)
+MIN_ROWS = 90               # smallest training slice a first round is scored on
+TUNE_CV_FOLDS = 3
+
+SEARCH_SPACES = {
+    "Random Forest": {
+        "n_estimators"    : [100, 150, 300],
+        "max_depth"       : [None, 8, 12, 16],
+        "min_samples_leaf": [1, 2, 4, 8],
+        "max_features"    : ["sqrt", 0.5, None],
+    },
+    "Gradient Boosting": {
+        "n_estimators"    : [100, 200, 400],
+        "learning_rate"   : [0.03, 0.1, 0.2],
+        "max_depth"       : [2, 3, 4],
+        "subsample"       : [0.8, 1.0],
+        "n_iter_no_change": [10],
+    },
+    "Logistic Regression": {
+        "C": [0.01, 0.03, 0.1, 0.3, 1.0, 3.0, 10.0],
+    },
+    "Decision Tree": {
+        "max_depth"       : [3, 4, 6, 8, 10, None],
+        "min_samples_leaf": [1, 2, 5, 10, 20],
+        "criterion"       : ["gini", "entropy"],
+    },
+}
+
+
+# ============================================================
+# PERSISTED RESULTS
+# ============================================================
+def _tuning_path(fingerprint):
+    return TUNING_DIR / f"{fingerprint}.json"
+
+
+@lru_cache(maxsize=32)
+def _read_tuned(path, mtime_ns):
+    return json.loads(path.read_text())
+
+
+def load_tuned(fingerprint):
+    """The persisted search result for ``fingerprint``, or ``None``."""
+    path = _tuning_path(fingerprint)
+    try:
+        return _read_tuned(path, path.stat().st_mtime_ns)
+    except (OSError, ValueError):
+        return None
+
+
+def merge_tuned(saved, result):
+    """
+    ``result`` with any of ``saved``'s configurations that got further
+    through their bracket, so a short re-search never undoes a longer one.
+    """
+    if not saved:
+        return result
+    merged = {t: dict(families) for t, families in saved["targets"].items()}
+    for t, families in result["targets"].items():
+        for name, best in families.items():
+            old = merged.setdefault(t, {}).get(name)
+            if old is None or best["round"] / best["rounds"] >= old["round"] / old["rounds"]:
+                merged[t][name] = best
+    return {**result, "targets": merged}
+
+
+def save_tuned(fingerprint, result):
+    """Persist ``result`` (merged with what is already saved) for ``fingerprint``."""
+    result = merge_tuned(load_tuned(fingerprint), result)
+    try:
+        TUNING_DIR.mkdir(parents=True, exist_ok=True)
+        path = _tuning_path(fingerprint)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(result, indent=1))
+        os.replace(tmp, path)
+    except OSError:
+        pass  # read-only deployments keep the result for this process only
+
+
+def best_params(tuned):
+    """``{target: {model name: params}}`` for ``kpa_ml.train_all`` (``None`` if untuned)."""
+    if not tuned:
+        return None
+    return {t: {name: b["params"] for name, b in families.items()}
+            for t, families in tuned["targets"].items()}
+
+
+def forest_params(tuned):
+    """``{target: params}`` of the tuned random forests, for the Predict page."""
+    params = best_params(tuned)
+    return params and {t: p["Random Forest"] for t, p in params.items() if "Random Forest" in p}
+
+
+# ============================================================
+# SUCCESSIVE HALVING
+# ============================================================
+_TRIAL_DATA = {}
+
+
+def _init_trials(data):
+    """Pool initializer: ship the per-target training splits to a worker once."""
+    _TRIAL_DATA.clear()
+    _TRIAL_DATA.update(data)
+
+
+def _run_trial(trial):
+    """``(trial, mean CV ROC-AUC, seconds)`` for one configuration on one slice."""
+    from sklearn.metrics import roc_auc_score
+    from sklearn.model_selection import StratifiedKFold
+    from kpa_ml import MODEL_SPECS
+
+    t0 = time.perf_counter()
+    target_col, name, _, params, rows = trial
+    X, y = _TRIAL_DATA[target_col]
+    X, y = X[:rows], y[:rows]
+    cls, defaults = MODEL_SPECS[name]
+    scores = []
+    for train_idx, test_idx in StratifiedKFold(TUNE_CV_FOLDS, shuffle=True, random_state=42).split(X, y):
+        model = cls(**{**defaults, **params}).fit(X[train_idx], y[train_idx])
+        try:
+            scores.append(roc_auc_score(y[test_idx], model.predict_proba(X[test_idx])[:, 1]))
+        except ValueError:
+            scores.append(0.0)
+    return trial, float(np.mean(scores)), time.perf_counter() - t0
+
+
+class _Bracket:
+    """One (target, family) successive-halving run."""
+
+    def __init__(self, target_col, name, n_rows):
+        from sklearn.model_selection import ParameterGrid, ParameterSampler
+        from kpa_ml import MODEL_SPECS
+
+        space = SEARCH_SPACES[name]
+        n = min(SEARCH_CANDIDATES, len(ParameterGrid(space)))
+        # The untuned defaults always compete, so tuning never does worse on CV
+        defaults = {k: MODEL_SPECS[name][1][k] for k in space if k in MODEL_SPECS[name][1]}
+        sampled = [p for p in ParameterSampler(space, n, random_state=42) if p != defaults]
+        self.target_col, self.name = target_col, name
+        self.candidates = [defaults, *sampled][:max(n, 1)]
+        rounds = max(1, math.ceil(math.log(len(self.candidates), ETA)))
+        self.rows = [max(min(MIN_ROWS, n_rows), n_rows // ETA ** (rounds - 1 - i)) for i in range(rounds)]
+        self.survivors = list(range(len(self.candidates)))
+        self.round = 0
+        self.best = None
+
+    @property
+    def done(self):
+        return self.round >= len(self.rows)
+
+    def planned(self):
+        """Trials still to run if every round completes."""
+        n, total = len(self.survivors), 0
+        for _ in range(self.round, len(self.rows)):
+            total += n
+            n = max(1, math.ceil(n / ETA))
+        return total
+
+    def trials(self):
+        rows = self.rows[self.round]
+        return [(self.target_col, self.name, i, self.candidates[i], rows) for i in self.survivors]
+
+    def advance(self, scores):
+        """Record a finished round (``{candidate: score}``) and keep the best 1/ETA."""
+        ranked = sorted(self.survivors, key=lambda i: (-scores[i], i))
+        self.best = {"params": self.candidates[ranked[0]], "cv_auc": round(scores[ranked[0]], 4),
+                     "rows": self.rows[self.round], "round": self.round + 1,
+                     "rounds": len(self.rows), "candidates": len(self.candidates)}
+        self.survivors = ranked[:max(1, math.ceil(len(ranked) / ETA))]
+        self.round += 1
+
+
+def search(df_ml, feature_cols, budget_s=DEFAULT_BUDGET_S, workers=None, stop=None, progress=None):
+    """
+    Successive-halving search over ``SEARCH_SPACES`` for every target in
+    ``kpa_ml.TARGETS``, stopping after ``budget_s`` seconds or when ``stop``
+    (a ``threading.Event``) is set.
+
+    Returns ``{"targets": {target: {model name: best}}, "complete", ...}``;
+    each ``best`` holds the winning ``"params"`` and its ``"cv_auc"``.
+    ``progress(evaluated, planned, brackets)`` is called after every trial.
+    """
+    from sklearn.model_selection import train_test_split
+    from kpa_ml import MODEL_SPECS, TARGETS, TRAIN_WORKERS
+
+    t0 = time.monotonic()
+    deadline = t0 + budget_s
+    workers = workers or TRAIN_WORKERS
+    stop = stop or threading.Event()
+
+    # Same hold-out split as train_all; the search only sees its training side,
+    # shuffled once so every slice is a random sample of it
+    data, brackets = {}, []
+    for target_col in TARGETS:
+        model_df = df_ml[feature_cols + [target_col]].dropna()
+        X_train, _, y_train, _ = train_test_split(
+            model_df[feature_cols], model_df[target_col], test_size=0.25, random_state=42,
+            stratify=model_df[target_col])
+        order = np.random.default_rng(42).permutation(len(X_train))
+        data[target_col] = (X_train.to_numpy(dtype=np.float64)[order], y_train.to_numpy()[order])
+        brackets += [_Bracket(target_col, name, len(X_train)) for name in MODEL_SPECS]
+
+    evaluated = 0
+    planned = sum(b.planned() for b in brackets)
+    by_key = {(b.target_col, b.name): b for b in brackets}
+    round_scores = {key: {} for key in by_key}
+    # Cheapest brackets first, so even a short budget finishes some of them
+    queue = deque(t for b in sorted(brackets, key=lambda b: len(b.survivors)) for t in b.trials())
+
+    def finish(trial, score):
+        """Record a trial; a bracket whose round is complete advances and queues the next."""
+        nonlocal evaluated
+        key = trial[:2]
+        bracket, scores = by_key[key], round_scores[key]
+        scores[trial[2]] = score
+        evaluated += 1
+        if len(scores) == len(bracket.survivors):
+            bracket.advance(scores)
+            round_scores[key] = {}
+            if not bracket.done:
+                queue.extend(bracket.trials())
+        if progress is not None:
+            progress(evaluated, planned, brackets)
+
+    if workers <= 1:
+        _init_trials(data)
+        try:
+            while queue and time.monotonic() < deadline and not stop.is_set():
+                trial, score, _ = _run_trial(queue.popleft())
+                finish(trial, score)
+        finally:
+            _TRIAL_DATA.clear()
+    else:
+        pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                                   initializer=_init_trials, initargs=(data,))
+        timed_out = False
+        try:
+            # A short in-flight window lets a bracket's next round start as soon
+            # as its current one is scored, and bounds the work lost at the deadline
+            in_flight = set()
+            while queue or in_flight:
+                left = deadline - time.monotonic()
+                if left <= 0 or stop.is_set():
+                    timed_out = True
+                    break
+                with spawn_safe_main():
+                    while queue and len(in_flight) < 2 * workers:
+                        in_flight.add(pool.submit(_run_trial, queue.popleft()))
+                done, in_flight = wait(in_flight, timeout=min(left, 0.5), return_when=FIRST_COMPLETED)
+                for f in done:
+                    trial, score, _ = f.result()
+                    finish(trial, score)
+        finally:
+            # Trials already running finish in the background; queued ones are dropped
+            pool.shutdown(wait=not timed_out, cancel_futures=True)
+
+    targets = {}
+    for b in brackets:
+        if b.best is not None:
+            targets.setdefault(b.target_col, {})[b.name] = b.best
+    return {
+        "targets"   : targets,
+        "complete"  : all(b.done for b in brackets),
+        "evaluated" : evaluated,
+        "planned"   : planned,
+        "budget_s"  : budget_s,
+        "seconds"   : round(time.monotonic() - t0, 1),
+        "finished"  : time.strftime("%Y-%m-%d %H:%M"),
+    }
+
+
+# ============================================================
+# BACKGROUND JOBS
+# ============================================================
+class TuningJob:
+    """A ``search`` running on a daemon thread; results are saved when it ends."""
+
+    def __init__(self, df_ml, feature_cols, fingerprint, budget_s=DEFAULT_BUDGET_S, workers=None):
+        self.fingerprint = fingerprint
+        self.budget_s    = budget_s
+        self.started     = time.monotonic()
+        self.result      = None
+        self.error       = None
+        self._stop       = threading.Event()
+        self._lock       = threading.Lock()
+        self._progress   = {"evaluated": 0, "planned": 0, "best": {}}
+        self._thread = threading.Thread(target=self._run, args=(df_ml, feature_cols, workers),
+                                        name=f"kpa-tune-{fingerprint[:8]}", daemon=True)
+        self._thread.start()
+
+    def _run(self, df_ml, feature_cols, workers):
+        try:
+            self.result = search(df_ml, feature_cols, self.budget_s, workers, self._stop, self._update)
+            if self.result["targets"]:
+                save_tuned(self.fingerprint, self.result)
+        except Exception as e:           # surfaced through status() on the page
+            self.error = f"{type(e).__name__}: {e}"
+
+    def _update(self, evaluated, planned, brackets):
+        best = {(b.target_col, b.name): b.best["cv_auc"] for b in brackets if b.best is not None}
+        with self._lock:
+            self._progress = {"evaluated": evaluated, "planned": planned, "best": best}
+
+    @property
+    def running(self):
+        return self._thread.is_alive()
+
+    def cancel(self):
+        """Stop after the trials in flight; completed rounds are still saved."""
+        self._stop.set()
+
+    def status(self):
+        """Snapshot for a progress readout."""
+        with self._lock:
+            progress = dict(self._progress)
+        return {**progress, "running": self.running, "error": self.error,
+                "elapsed_s": time.monotonic() - self.started, "budget_s": self.budget_s,
+                "complete": bool(self.result and self.result["complete"])}
+
+
+_JOBS = {}
+_JOBS_LOCK = threading.Lock()
+
+
+def start_tuning(df_ml, feature_cols, fingerprint, budget_s=DEFAULT_BUDGET_S, workers=None):
+    """Start a background search for ``fingerprint`` unless one is already running."""
+    with _JOBS_LOCK:
+        job = _JOBS.get(fingerprint)
+        if job is None or not job.running:
+            job = _JOBS[fingerprint] = TuningJob(df_ml, feature_cols, fingerprint, budget_s, workers)
+        return job
+
+
+def tuning_job(fingerprint):
+    """The most recent search for ``fingerprint`` in this process, if any."""
+    return _JOBS.get(fingerprint)
+
+
+def main():
+    import argparse
+    from kpa_data import DatasetArtifacts, load_csv
+    from pathlib import Path
+
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("dataset", help="combined survey CSV (COMBINED_DATASETS.csv)")
+    ap.add_argument("--budget", type=float, default=DEFAULT_BUDGET_S, help="wall-clock budget in seconds")
+    ap.add_argument("--workers", type=int, default=None, help="process-pool size (default: KPA_TRAIN_WORKERS)")
+    args = ap.parse_args()
+
+    key, df = load_csv(Path(args.dataset).read_bytes())
+    artifacts = DatasetArtifacts(key, df)
+    df_ml, feature_cols = artifacts.ml
+    result = search(df_ml, feature_cols, args.budget, args.workers)
+    if result["targets"]:
+        save_tuned(artifacts.ml_fingerprint, result)
+    print(f"{result['evaluated']}/{result['planned']} trials in {result['seconds']}s"
+          + ("" if result["complete"] else " (budget reached)"))
+    for target_col, families in result["targets"].items():
+        for name, best in families.items():
+            print(f"  {target_col:<16} {name:<20} CV AUC {best['cv_auc']:.4f}  {best['params']}")
+
+
+if __name__ == "__main__":
+    # Run from the importable module so pool workers can find the trial functions
+    import kpa_tune
+    kpa_tune.main()